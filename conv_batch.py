@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Vectorized Convolution Output Dimension Calculator
+
+Applies the same formula as conv_output_calculator to whole NumPy arrays
+of configurations in one pass, for architecture sweeps where calling
+calculate_output_dimension in a Python loop is too slow.
+
+Formula:
+Output = ((Input - Filter + 2 * Padding) / Stride) + 1
+
+output_sizes and transposed_output_sizes are the vectorized forms of the
+integer core in conv_output_calculator (rounding modes, dilation,
+asymmetric and "same"/"valid" padding, transposed convolution).
+"""
+
+import numpy as np
+
+
+def calculate_output_dimensions(input_dim, filter_dim, stride, padding):
+    """
+    Calculate output dimensions for many convolutional layers at once.
+
+    Args:
+        input_dim: Input dimensions (scalar or array-like)
+        filter_dim: Filter/kernel dimensions (scalar or array-like)
+        stride: Stride values (scalar or array-like)
+        padding: Padding values (scalar or array-like)
+
+    All arguments are broadcast against each other.
+
+    Returns:
+        Float array of output dimensions, matching calculate_output_dimension
+        element for element
+    """
+    input_dim = np.asarray(input_dim, dtype=np.int64)
+    filter_dim = np.asarray(filter_dim, dtype=np.int64)
+    stride = np.asarray(stride, dtype=np.int64)
+    padding = np.asarray(padding, dtype=np.int64)
+
+    return ((input_dim - filter_dim + 2 * padding) / stride) + 1
+
+
+def _padding_arrays(padding, padding_after, input_dim, filter_dim, stride,
+                    dilation):
+    """Resolve padding to (before, after) int64 arrays."""
+    if isinstance(padding, str):
+        if padding == "valid":
+            return np.int64(0), np.int64(0)
+        if padding == "same":
+            output = -(-input_dim // stride)
+            total = np.maximum(0, (output - 1) * stride
+                               + dilation * (filter_dim - 1) + 1 - input_dim)
+            return total // 2, total - total // 2
+        raise ValueError(f"unknown padding: {padding}")
+
+    before = np.asarray(padding, dtype=np.int64)
+    after = before if padding_after is None else np.asarray(padding_after,
+                                                            dtype=np.int64)
+    return before, after
+
+
+def output_sizes(input_dim, filter_dim, stride=1, padding=0, dilation=1,
+                 ceil_mode=False, padding_after=None):
+    """
+    Calculate output dimensions in exact integer arithmetic, vectorized.
+
+    Array counterpart of conv_output_calculator.output_size.
+
+    Args:
+        input_dim, filter_dim, stride, dilation: Scalars or arrays
+        padding: Padding before (and after, unless padding_after is given),
+            or "same" / "valid"
+        ceil_mode: Round partial last windows up instead of down
+        padding_after: Separate padding after, for asymmetric padding
+
+    Returns:
+        (output, remainder) int64 arrays; a configuration is exact when
+        remainder == 0 and output > 0
+    """
+    input_dim = np.asarray(input_dim, dtype=np.int64)
+    filter_dim = np.asarray(filter_dim, dtype=np.int64)
+    stride = np.asarray(stride, dtype=np.int64)
+    dilation = np.asarray(dilation, dtype=np.int64)
+    before, after = _padding_arrays(padding, padding_after, input_dim,
+                                    filter_dim, stride, dilation)
+
+    span = input_dim + before + after - (dilation * (filter_dim - 1) + 1)
+    quotient, remainder = np.divmod(span, stride)
+    output = quotient + 1
+
+    if ceil_mode:
+        output = output + (remainder != 0)
+        # The last window must start inside the input or leading padding
+        output = output - ((remainder != 0)
+                           & ((output - 1) * stride >= input_dim + before))
+
+    return output, remainder
+
+
+def transposed_output_sizes(input_dim, filter_dim, stride=1, padding=0,
+                            dilation=1, output_padding=0, padding_after=None):
+    """
+    Calculate transposed-convolution output dimensions, vectorized.
+
+    Array counterpart of conv_output_calculator.transposed_output_size.
+
+    Raises:
+        ValueError: If any output_padding is not smaller than its stride
+            or dilation
+    """
+    input_dim = np.asarray(input_dim, dtype=np.int64)
+    filter_dim = np.asarray(filter_dim, dtype=np.int64)
+    stride = np.asarray(stride, dtype=np.int64)
+    dilation = np.asarray(dilation, dtype=np.int64)
+    output_padding = np.asarray(output_padding, dtype=np.int64)
+    before = np.asarray(padding, dtype=np.int64)
+    after = before if padding_after is None else np.asarray(padding_after,
+                                                            dtype=np.int64)
+
+    if np.any((output_padding < 0)
+              | (output_padding >= np.maximum(stride, dilation))):
+        raise ValueError("output_padding must be smaller than stride or dilation")
+
+    return ((input_dim - 1) * stride - before - after
+            + dilation * (filter_dim - 1) + 1 + output_padding)
+
+
+def valid_output_mask(input_dim, filter_dim, stride, padding, dilation=1):
+    """
+    Check which configurations give a positive integer output dimension.
+
+    The check is done in integer arithmetic with output_sizes: the output
+    is a positive integer exactly when the padded span is non-negative and
+    divisible by Stride.
+
+    Returns:
+        Boolean array, broadcast from the arguments
+    """
+    output, remainder = output_sizes(input_dim, filter_dim, stride, padding,
+                                     dilation)
+    return (remainder == 0) & (output > 0)
+
+
+def batch_calculate(input_h, input_w, filter_h, filter_w, stride, padding,
+                    dilation=1):
+    """
+    Calculate output dimensions for a batch of 2D convolution configurations.
+
+    Vectorized counterpart of visualize_calculation: a configuration is valid
+    when both output dimensions are positive integers.
+
+    Args:
+        input_h, input_w: Input image heights and widths
+        filter_h, filter_w: Filter/kernel heights and widths
+        stride: Stride values
+        padding: Padding values
+        dilation: Dilation values (default: 1)
+
+    All arguments may be scalars or arrays and are broadcast together.
+
+    Returns:
+        Dictionary of arrays with keys:
+          "output_h", "output_w": float output dimensions
+          "valid":                boolean validity mask
+          "features":             total output features (0 where invalid)
+    """
+    input_h, input_w, filter_h, filter_w, stride, padding, dilation = (
+        np.broadcast_arrays(*(
+            np.asarray(a, dtype=np.int64)
+            for a in (input_h, input_w, filter_h, filter_w, stride, padding,
+                      dilation)
+        ))
+    )
+
+    sizes_h, rem_h = output_sizes(input_h, filter_h, stride, padding, dilation)
+    sizes_w, rem_w = output_sizes(input_w, filter_w, stride, padding, dilation)
+
+    # Rounded as calculate_output_dimension rounds: exact quotients are
+    # converted once, fractional outputs computed from the padded span
+    span_h = (sizes_h - 1) * stride + rem_h
+    span_w = (sizes_w - 1) * stride + rem_w
+    output_h = np.where(rem_h == 0, sizes_h, span_h / stride + 1)
+    output_w = np.where(rem_w == 0, sizes_w, span_w / stride + 1)
+
+    valid = (rem_h == 0) & (sizes_h > 0) & (rem_w == 0) & (sizes_w > 0)
+    features = np.where(valid, sizes_h * sizes_w, 0)
+
+    return {
+        "output_h": output_h,
+        "output_w": output_w,
+        "valid": valid,
+        "features": features,
+    }
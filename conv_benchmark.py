@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Convolution Calculator
+
+Times the hot paths of the calculator and GUI:
+  - calculate_output_dimension
+  - visualize_calculation (output written to a buffer)
+  - write_report for 1000 configurations in each report format
+  - ConvCalculatorGUI.update_calculation, draw_visualization and
+    draw_windows
+  - the cold import of the stdlib-only modules behind the CLI: the startup
+    time of a fresh interpreter that imports the module, less that of a
+    bare "python -c pass"
+
+The GUI runs on a real Tk root when a display is available, and otherwise
+on stub widgets that accept and discard every Tk call, so the benchmarks
+also run headless.
+
+Results can be saved as a JSON baseline and later runs compared against it;
+any benchmark slower than the baseline by more than the threshold is flagged
+and the script exits with status 1. So is a stdlib-only module that takes
+longer than IMPORT_BUDGET to import or pulls in NumPy or tkinter, with or
+without a baseline. Everything runs locally.
+
+Usage:
+    python3 conv_benchmark.py --save          # record a baseline
+    python3 conv_benchmark.py                 # compare against it
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+
+from conv_output_calculator import calculate_output_dimension, visualize_calculation
+from conv_report import REPORT_FORMATS, report_record, write_report
+
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+DEFAULT_THRESHOLD = 0.20
+
+# Modules the CLI, scalar and streaming batch calculators need; they must
+# import with the standard library only
+LIGHT_MODULES = [
+    "conv_output_calculator",
+    "conv_stream",
+    "conv_network",
+    "conv_receptive",
+    "conv_solver",
+]
+HEAVY_MODULES = ["numpy", "tkinter"]
+
+# Largest cold import time allowed for a light module, over a bare
+# interpreter startup
+IMPORT_BUDGET = 0.010
+
+# Configurations matching the GUI presets
+PRESETS = [
+    (28, 28, 5, 5, 1, 0),
+    (32, 32, 3, 3, 1, 1),
+    (224, 224, 8, 8, 2, 3),
+    (720, 1280, 7, 7, 2, 3),
+]
+
+
+class _StubWidget:
+    """Stands in for any Tk widget or variable: every call is a no-op."""
+
+    def __init__(self, value=0):
+        self._value = value
+        self._ids = itertools.count(1)
+
+    def get(self):
+        return self._value
+
+    def set(self, value):
+        self._value = value
+
+    def winfo_width(self):
+        return 700
+
+    def winfo_height(self):
+        return 300
+
+    def __getattr__(self, name):
+        # create_* return new item IDs, like a real canvas
+        def call(*args, **kwargs):
+            return next(self._ids)
+        return call
+
+
+def make_headless_gui():
+    """
+    Create a ConvCalculatorGUI wired to stub widgets (no display needed).
+
+    The widgets that update_calculation and draw_visualization touch are
+    replaced by _StubWidget instances; the GUI code itself runs unchanged.
+    """
+    from conv_calculator_gui import ConvCalculatorGUI
+
+    gui = ConvCalculatorGUI.__new__(ConvCalculatorGUI)
+    gui.root = _StubWidget()
+    gui.canvas = _StubWidget()
+    gui.window_canvas = _StubWidget()
+    gui.formula_text = _StubWidget()
+    gui.result_label = _StubWidget()
+    gui.result_frame = _StubWidget()
+    for name, value in zip(
+            ["input_h", "input_w", "filter_h", "filter_w", "stride", "padding"],
+            PRESETS[2]):
+        setattr(gui, name, _StubWidget(value))
+    return gui
+
+
+def make_gui():
+    """
+    Create a GUI on a real (withdrawn) Tk root if possible.
+
+    Returns:
+        (gui, root) where root is None for the headless stub GUI
+    """
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception:
+        return make_headless_gui(), None
+
+    from conv_calculator_gui import ConvCalculatorGUI
+
+    root.withdraw()
+    gui = ConvCalculatorGUI(root)
+    root.update()
+    return gui, root
+
+
+def _time(func, repeat):
+    """Best time per call in seconds over repeat rounds."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def _startup(code, env):
+    """Run code in a fresh interpreter; return (wall seconds, modules loaded)."""
+    start = timeit.default_timer()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True, env=env,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    seconds = timeit.default_timer() - start
+
+    # "import time: self [us] | cumulative | imported package"
+    loaded = {line.rsplit("|", 1)[1].strip()
+              for line in proc.stderr.splitlines()
+              if line.startswith("import time:")}
+    return seconds, loaded
+
+
+def import_time(module, repeat=3):
+    """
+    Measure the cold import of a module in fresh interpreters.
+
+    The import is timed as the startup of an interpreter that imports the
+    module, less the startup of one that doesn't, so everything the import
+    costs counts, not just what importtime attributes to the module.
+
+    Returns:
+        (seconds, heavy): the best import time, and the HEAVY_MODULES the
+        import loaded
+    """
+    # Measure with compiled bytecode, as an installed CLI runs: allow it to
+    # be written, and leave the first (compiling) run out of the timing
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    best = bare = None
+    loaded = set()
+    for run in range(repeat + 1):
+        # Alternate the two so that they see the same system load
+        seconds, modules = _startup(f"import {module}", env)
+        baseline, _ = _startup("pass", env)
+        if run == 0:
+            continue
+        loaded |= modules
+        best = seconds if best is None else min(best, seconds)
+        bare = baseline if bare is None else min(bare, baseline)
+
+    heavy = [name for name in HEAVY_MODULES if name in loaded]
+    return max(best - bare, 0.0), heavy
+
+
+def run_benchmarks(repeat=5, headless=False):
+    """
+    Run every benchmark.
+
+    Args:
+        repeat: Timing rounds per benchmark (the best one is kept)
+        headless: Use the stub GUI even when a display is available
+
+    Returns:
+        Dictionary mapping benchmark name to seconds per call
+    """
+    results = {}
+
+    configs = itertools.cycle(PRESETS)
+
+    def calc():
+        ih, iw, fh, fw, s, p = next(configs)
+        calculate_output_dimension(ih, fh, s, p)
+        calculate_output_dimension(iw, fw, s, p)
+
+    results["calculate_output_dimension"] = _time(calc, repeat)
+
+    sink = io.StringIO()
+
+    def visualize():
+        sink.seek(0)
+        sink.truncate()
+        with contextlib.redirect_stdout(sink):
+            visualize_calculation(*next(configs))
+
+    results["visualize_calculation"] = _time(visualize, repeat)
+
+    records = [report_record(*config)
+               for config in itertools.islice(configs, 1000)]
+    for format in REPORT_FORMATS:
+        def report():
+            sink.seek(0)
+            sink.truncate()
+            write_report(records, format, sink)
+
+        results[f"write_report {format} ×1000"] = _time(report, repeat)
+
+    if headless:
+        gui, root = make_headless_gui(), None
+    else:
+        gui, root = make_gui()
+
+    try:
+        def update():
+            gui.set_preset(*next(configs))
+
+        def draw():
+            ih, iw, fh, fw, s, p = next(configs)
+            oh = calculate_output_dimension(ih, fh, s, p)
+            ow = calculate_output_dimension(iw, fw, s, p)
+            valid = oh > 0 and ow > 0 and oh == int(oh) and ow == int(ow)
+            gui.draw_visualization(ih, iw, fh, fw, s, p, oh, ow, valid)
+
+        def draw_windows():
+            gui.set_preset(*next(configs))
+            gui.draw_windows()
+
+        results["gui.update_calculation"] = _time(update, repeat)
+        results["gui.draw_visualization"] = _time(draw, repeat)
+        results["gui.draw_windows"] = _time(draw_windows, repeat)
+    finally:
+        if root is not None:
+            root.destroy()
+
+    for module in LIGHT_MODULES:
+        results[f"import {module}"], _ = import_time(module, repeat)
+
+    return results
+
+
+def check_imports(results=None):
+    """
+    Check that every light module imports quickly and without heavy modules.
+
+    Args:
+        results: run_benchmarks results to take the import times from
+            (measured here if omitted)
+
+    Returns:
+        List of problem descriptions, empty if all is well
+    """
+    problems = []
+    for module in LIGHT_MODULES:
+        seconds, heavy = import_time(module)
+        if results is not None:
+            seconds = results.get(f"import {module}", seconds)
+        if heavy:
+            problems.append(f"import {module} loads {', '.join(heavy)}")
+        if seconds > IMPORT_BUDGET:
+            problems.append(f"import {module} takes {_format_time(seconds).strip()}"
+                            f" (budget {_format_time(IMPORT_BUDGET).strip()})")
+    return problems
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare results with a baseline.
+
+    Returns:
+        List of (name, current, baseline, ratio, regressed) tuples for the
+        benchmarks present in both
+    """
+    rows = []
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        ratio = current / baseline[name] if baseline[name] else float("inf")
+        rows.append((name, current, baseline[name], ratio,
+                     ratio > 1 + threshold))
+    return rows
+
+
+def load_baseline(path):
+    """Load the benchmark timings from a baseline file."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def save_baseline(path, results):
+    """Write benchmark timings and the machine they ran on to path."""
+    data = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def _format_time(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:9.2f} µs"
+    return f"{seconds * 1e3:9.2f} ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the convolution calculator hot paths."
+    )
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help=f"baseline JSON file (default: {DEFAULT_BASELINE})")
+    parser.add_argument("--save", action="store_true",
+                        help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before flagging a regression "
+                             f"(default: {DEFAULT_THRESHOLD:.2f})")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="timing rounds per benchmark (default: 5)")
+    parser.add_argument("--headless", action="store_true",
+                        help="always use stub widgets for the GUI benchmarks")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(repeat=args.repeat, headless=args.headless)
+
+    baseline = None
+    if not args.save and os.path.exists(args.baseline):
+        baseline = load_baseline(args.baseline)
+
+    print("\n" + "="*60)
+    print("CONVOLUTION CALCULATOR BENCHMARKS")
+    print("="*60 + "\n")
+
+    regressions = 0
+    if baseline is None:
+        for name, seconds in results.items():
+            print(f"  {name:<30}{_format_time(seconds)}")
+    else:
+        compared = {row[0]: row for row in compare(results, baseline,
+                                                   args.threshold)}
+        for name, seconds in results.items():
+            line = f"  {name:<30}{_format_time(seconds)}"
+            if name in compared:
+                _, _, _, ratio, regressed = compared[name]
+                line += f"   {ratio:5.2f}× baseline"
+                if regressed:
+                    line += "   ⚠ REGRESSION"
+                    regressions += 1
+            print(line)
+
+    problems = check_imports(results)
+    for problem in problems:
+        print(f"  ⚠ {problem}")
+
+    print("\n" + "="*60)
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"✓ Baseline saved to {args.baseline}")
+    elif baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save to create one.")
+    elif regressions:
+        print(f"✗ {regressions} benchmark(s) slower than baseline "
+              f"by more than {args.threshold:.0%}")
+    else:
+        print("✓ No regressions")
+    if problems:
+        print(f"✗ {len(problems)} import problem(s)")
+    print("="*60 + "\n")
+
+    return 1 if regressions or problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
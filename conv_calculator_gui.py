@@ -3,7 +3,8 @@
 Interactive GUI for Convolution Output Dimension Calculator
 Features:
 - Visual representation of input, filter, and output
-- Real-time updates with sliders
+- Zoomable view of every filter window (heatmap when zoomed out)
+- Real-time updates with sliders (coalesced to one redraw per frame)
 - Color-coded results (valid/invalid)
 - Step-by-step calculation display
 """
@@ -12,8 +13,33 @@ import tkinter as tk
 from tkinter import ttk
 import math
 
+from conv_diagram import Label, diagram_layout
+from conv_lod import plan_frame
+from conv_output_calculator import calculate_output_dimension, is_valid_output
+
+
+# Slider events arriving within one frame (~60 fps) share a single update
+UPDATE_DELAY_MS = 16
+
+# Closest zoom in the filter window view, in screen pixels per input pixel
+MAX_PIXELS_PER_UNIT = 40
+
 
 class ConvCalculatorGUI:
+    # Pending after() callback for a coalesced update
+    _pending_update = None
+    # Parameters last shown, to skip updates that change nothing
+    _last_params = None
+    # Persistent canvas item IDs, created on the first draw
+    _items = None
+    # Filter window view: zoom (1 = whole plane), center on the padded
+    # plane (None = plane center) and the last pan position
+    _view_zoom = 1.0
+    _view_center = None
+    _pan_anchor = None
+    _pending_window_redraw = None
+    _window_items = None
+
     def __init__(self, root):
         self.root = root
         self.root.title("Interactive Convolution Output Calculator")
@@ -62,6 +88,7 @@ class ConvCalculatorGUI:
         right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
 
         self.create_visualization(right_panel)
+        self.create_window_view(right_panel)
         self.create_results(right_panel)
 
     def create_controls(self, parent):
@@ -192,7 +219,7 @@ class ConvCalculatorGUI:
             to=to,
             orient=tk.HORIZONTAL,
             variable=variable,
-            command=lambda x: self.update_calculation()
+            command=lambda x: self.schedule_update()
         )
         slider.grid(row=row, column=2, sticky='ew', pady=5)
 
@@ -217,6 +244,36 @@ class ConvCalculatorGUI:
             highlightthickness=0
         )
         self.canvas.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.canvas.bind('<Configure>', lambda e: self.schedule_update(force=True))
+
+    def create_window_view(self, parent):
+        """Create the zoomable view of individual filter windows."""
+        window_frame = tk.LabelFrame(
+            parent,
+            text="🔎 Filter Windows (scroll to zoom, drag to pan, double-click to reset)",
+            font=('Arial', 12, 'bold'),
+            bg='white',
+            fg='#2c3e50',
+            padx=10,
+            pady=5
+        )
+        window_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        self.window_canvas = tk.Canvas(
+            window_frame,
+            bg='white',
+            height=200,
+            highlightthickness=0
+        )
+        self.window_canvas.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        self.window_canvas.bind('<Configure>', lambda e: self.schedule_window_redraw())
+        self.window_canvas.bind('<MouseWheel>', self.on_window_zoom)
+        self.window_canvas.bind('<Button-4>', self.on_window_zoom)
+        self.window_canvas.bind('<Button-5>', self.on_window_zoom)
+        self.window_canvas.bind('<ButtonPress-1>', self.on_window_pan_start)
+        self.window_canvas.bind('<B1-Motion>', self.on_window_pan)
+        self.window_canvas.bind('<Double-Button-1>', lambda e: self.reset_window_view())
 
     def create_results(self, parent):
         """Create results display."""
@@ -268,7 +325,26 @@ class ConvCalculatorGUI:
 
     def calculate_output(self, input_dim, filter_dim, stride, padding):
         """Calculate output dimension."""
-        return ((input_dim - filter_dim + 2 * padding) / stride) + 1
+        return calculate_output_dimension(input_dim, filter_dim, stride, padding)
+
+    def schedule_update(self, force=False):
+        """
+        Request an update on the next frame.
+
+        Any number of calls within one frame result in a single
+        update_calculation. With force, the update runs even if the
+        parameters are unchanged (e.g. after the canvas was resized).
+        """
+        if force:
+            self._last_params = None
+        if self._pending_update is None:
+            self._pending_update = self.root.after(
+                UPDATE_DELAY_MS, self._run_scheduled_update
+            )
+
+    def _run_scheduled_update(self):
+        self._pending_update = None
+        self.update_calculation()
 
     def update_calculation(self):
         """Update all calculations and visualizations."""
@@ -280,6 +356,12 @@ class ConvCalculatorGUI:
         s = self.stride.get()
         p = self.padding.get()
 
+        # Nothing to redraw if the slider moved within the same integer value
+        params = (ih, iw, fh, fw, s, p)
+        if params == self._last_params:
+            return
+        self._last_params = params
+
         # Calculate outputs
         oh = self.calculate_output(ih, fh, s, p)
         ow = self.calculate_output(iw, fw, s, p)
@@ -297,7 +379,7 @@ class ConvCalculatorGUI:
         self.formula_text.insert(tk.END, f"  = {ow}")
 
         # Check validity
-        is_valid = (oh > 0 and ow > 0 and oh == int(oh) and ow == int(ow))
+        is_valid = (is_valid_output(ih, fh, s, p) and is_valid_output(iw, fw, s, p))
 
         # Update result label
         if is_valid:
@@ -317,10 +399,64 @@ class ConvCalculatorGUI:
 
         # Update visualization
         self.draw_visualization(ih, iw, fh, fw, s, p, oh, ow, is_valid)
+        self.draw_windows()
+
+    def create_canvas_items(self):
+        """Create the canvas items once; later draws only move them."""
+        c = self.canvas
+        label_font = ('Arial', 12, 'bold')
+        small_font = ('Arial', 10, 'bold')
+
+        self._items = {
+            'padding': c.create_rectangle(
+                0, 0, 0, 0, outline='#9b59b6', width=3, dash=(5, 5)
+            ),
+            'padding_label': c.create_text(
+                0, 0, font=small_font, fill='#9b59b6'
+            ),
+            'input': c.create_rectangle(
+                0, 0, 0, 0, fill='#3498db', outline='#2c3e50', width=2
+            ),
+            'input_label': c.create_text(
+                0, 0, font=label_font, fill='white', justify=tk.CENTER
+            ),
+            'filter': c.create_rectangle(
+                0, 0, 0, 0, fill='#e74c3c', outline='#2c3e50', width=2
+            ),
+            'filter_label': c.create_text(
+                0, 0, font=label_font, fill='white', justify=tk.CENTER
+            ),
+            'stride': c.create_line(
+                0, 0, 0, 0, arrow=tk.LAST, width=3, fill='#f39c12'
+            ),
+            'stride_label': c.create_text(
+                0, 0, font=small_font, fill='#f39c12'
+            ),
+            'arrow': c.create_text(
+                0, 0, text='⟹', font=('Arial', 30), fill='#2c3e50'
+            ),
+            'output': c.create_rectangle(
+                0, 0, 0, 0, fill='#27ae60', outline='#2c3e50', width=2
+            ),
+            'output_label': c.create_text(
+                0, 0, font=label_font, fill='white', justify=tk.CENTER
+            ),
+            'invalid': c.create_text(
+                0, 0, text='❌\nInvalid\nConfiguration',
+                font=('Arial', 14, 'bold'), fill='#c0392b', justify=tk.CENTER
+            ),
+        }
+
+    def show_item(self, name, visible=True):
+        """Show or hide a persistent canvas item."""
+        self.canvas.itemconfigure(
+            self._items[name], state=tk.NORMAL if visible else tk.HIDDEN
+        )
 
     def draw_visualization(self, ih, iw, fh, fw, s, p, oh, ow, is_valid):
-        """Draw the visualization."""
-        self.canvas.delete('all')
+        """Draw the visualization by moving the persistent canvas items."""
+        if self._items is None:
+            self.create_canvas_items()
 
         # Get canvas size
         canvas_width = self.canvas.winfo_width()
@@ -330,104 +466,195 @@ class ConvCalculatorGUI:
             canvas_width = 700
             canvas_height = 300
 
-        # Calculate scaling
-        max_dim = max(ih, iw, oh, ow) if is_valid else max(ih, iw)
-        scale = min(100, 200 / max_dim) if max_dim > 0 else 1
-
-        # Positions
-        input_x = 100
-        filter_x = input_x + iw * scale + 80
-        output_x = filter_x + fw * scale + 80
-        y_center = canvas_height // 2
-
-        # Draw input image
-        input_y = y_center - (ih * scale) // 2
-        self.draw_rectangle(
-            self.canvas, input_x, input_y,
-            iw * scale, ih * scale,
-            '#3498db', f'Input\n{ih}×{iw}'
-        )
-
-        # Draw padding if exists
-        if p > 0:
-            pad_scale = p * scale
-            self.canvas.create_rectangle(
-                input_x - pad_scale, input_y - pad_scale,
-                input_x + iw * scale + pad_scale, input_y + ih * scale + pad_scale,
-                outline='#9b59b6', width=3, dash=(5, 5)
-            )
-            self.canvas.create_text(
-                input_x + iw * scale // 2, input_y - pad_scale - 15,
-                text=f'Padding: {p}',
-                font=('Arial', 10, 'bold'),
-                fill='#9b59b6'
-            )
-
-        # Draw filter
-        filter_y = y_center - (fh * scale) // 2
-        self.draw_rectangle(
-            self.canvas, filter_x, filter_y,
-            fw * scale, fh * scale,
-            '#e74c3c', f'Filter\n{fh}×{fw}'
-        )
-
-        # Draw stride indicator
-        if s > 1:
-            stride_y = filter_y + fh * scale + 30
-            arrow_length = s * scale
-            self.canvas.create_line(
-                filter_x, stride_y,
-                filter_x + arrow_length, stride_y,
-                arrow=tk.LAST, width=3, fill='#f39c12'
-            )
-            self.canvas.create_text(
-                filter_x + arrow_length // 2, stride_y - 15,
-                text=f'Stride: {s}',
-                font=('Arial', 10, 'bold'),
-                fill='#f39c12'
+        # Same layout as the headless SVG/PNG diagrams
+        layout = diagram_layout(ih, iw, fh, fw, s, p, oh, ow, is_valid,
+                                canvas_width, canvas_height)
+
+        for name in ('padding', 'padding_label', 'stride', 'stride_label',
+                     'output', 'output_label', 'invalid'):
+            self.show_item(name, layout[name] is not None)
+
+        for name, item in layout.items():
+            if item is None:
+                continue
+            if isinstance(item, Label):
+                self.canvas.coords(self._items[name], item.x, item.y)
+                if name not in ('arrow', 'invalid'):
+                    self.canvas.itemconfigure(self._items[name], text=item.text)
+            else:
+                self.canvas.coords(self._items[name], *item)
+
+    def schedule_window_redraw(self):
+        """Redraw the filter window view on the next frame."""
+        if self._pending_window_redraw is None:
+            self._pending_window_redraw = self.root.after(
+                UPDATE_DELAY_MS, self._run_window_redraw
             )
 
-        # Draw arrow
-        self.canvas.create_text(
-            (filter_x + output_x) // 2, y_center,
-            text='⟹',
-            font=('Arial', 30),
-            fill='#2c3e50'
-        )
-
-        # Draw output
-        if is_valid:
-            output_y = y_center - (oh * scale) // 2
-            self.draw_rectangle(
-                self.canvas, output_x, output_y,
-                ow * scale, oh * scale,
-                '#27ae60', f'Output\n{int(oh)}×{int(ow)}'
-            )
+    def _run_window_redraw(self):
+        self._pending_window_redraw = None
+        self.draw_windows()
+
+    def window_transform(self):
+        """
+        Map the padded plane to the window canvas.
+
+        Returns:
+            (center_x, center_y, units_per_pixel, width, height), or None
+            if the canvas is not ready yet
+        """
+        if self._last_params is None:
+            return None
+        width = self.window_canvas.winfo_width()
+        height = self.window_canvas.winfo_height()
+        if width < 100:  # Canvas not ready yet
+            return None
+
+        ih, iw, fh, fw, s, p = self._last_params
+        plane_w, plane_h = iw + 2 * p, ih + 2 * p
+
+        fit = max(plane_w / (width - 20), plane_h / (height - 20))
+        units_per_pixel = fit / self._view_zoom
+
+        if self._view_center is None:
+            center_x, center_y = plane_w / 2, plane_h / 2
         else:
-            self.canvas.create_text(
-                output_x, y_center,
-                text='❌\nInvalid\nConfiguration',
-                font=('Arial', 14, 'bold'),
-                fill='#c0392b',
-                justify=tk.CENTER
-            )
-
-    def draw_rectangle(self, canvas, x, y, w, h, color, label):
-        """Draw a labeled rectangle."""
-        # Draw rectangle
-        canvas.create_rectangle(
-            x, y, x + w, y + h,
-            fill=color, outline='#2c3e50', width=2
+            center_x = min(max(self._view_center[0], 0), plane_w)
+            center_y = min(max(self._view_center[1], 0), plane_h)
+        return center_x, center_y, units_per_pixel, width, height
+
+    def reset_window_view(self):
+        """Zoom the filter window view out to the whole plane."""
+        self._view_zoom = 1.0
+        self._view_center = None
+        self.schedule_window_redraw()
+
+    def on_window_zoom(self, event):
+        """Zoom the filter window view around the mouse pointer."""
+        transform = self.window_transform()
+        if transform is None:
+            return
+        cx, cy, upp, width, height = transform
+
+        zoom_in = event.num == 4 or event.delta > 0
+        factor = 1.25 if zoom_in else 0.8
+        max_zoom = max(1.0, upp * self._view_zoom * MAX_PIXELS_PER_UNIT)
+        new_zoom = min(max(self._view_zoom * factor, 1.0), max_zoom)
+
+        # Keep the plane point under the pointer where it is
+        px = cx + (event.x - width / 2) * upp
+        py = cy + (event.y - height / 2) * upp
+        ratio = self._view_zoom / new_zoom
+        self._view_center = (px - (px - cx) * ratio, py - (py - cy) * ratio)
+        self._view_zoom = new_zoom
+        self.schedule_window_redraw()
+
+    def on_window_pan_start(self, event):
+        self._pan_anchor = (event.x, event.y)
+
+    def on_window_pan(self, event):
+        """Drag the filter window view."""
+        transform = self.window_transform()
+        if transform is None or self._pan_anchor is None:
+            return
+        cx, cy, upp, _, _ = transform
+
+        dx = event.x - self._pan_anchor[0]
+        dy = event.y - self._pan_anchor[1]
+        self._pan_anchor = (event.x, event.y)
+        self._view_center = (cx - dx * upp, cy - dy * upp)
+        self.schedule_window_redraw()
+
+    def _window_item_pool(self, name, count, create):
+        """Return count reusable canvas items, creating more as needed."""
+        pool = self._window_items[name]
+        while len(pool) < count:
+            pool.append(create())
+        return pool
+
+    def draw_windows(self):
+        """
+        Draw the filter windows in view.
+
+        Individual windows are drawn when few enough are visible, and a
+        coverage heatmap otherwise (see conv_lod.plan_frame), so the number
+        of canvas items per frame is bounded whatever the input size.
+        Items are pooled and reused between frames.
+        """
+        transform = self.window_transform()
+        if transform is None:
+            return
+        cx, cy, upp, width, height = transform
+        ih, iw, fh, fw, s, p = self._last_params
+        c = self.window_canvas
+
+        if self._window_items is None:
+            self._window_items = {
+                'plane': c.create_rectangle(
+                    0, 0, 0, 0, outline='#9b59b6', width=2, dash=(5, 5)
+                ),
+                'input': c.create_rectangle(
+                    0, 0, 0, 0, fill='#d6eaf8', outline='#3498db', width=2
+                ),
+                'cells': [],
+                'windows': [],
+                'info': c.create_text(
+                    8, 8, anchor=tk.NW, font=('Arial', 10, 'bold'),
+                    fill='#2c3e50'
+                ),
+            }
+        items = self._window_items
+
+        def to_screen(x, y):
+            return width / 2 + (x - cx) / upp, height / 2 + (y - cy) / upp
+
+        c.coords(items['plane'], *to_screen(0, 0),
+                 *to_screen(iw + 2 * p, ih + 2 * p))
+        c.coords(items['input'], *to_screen(p, p), *to_screen(p + iw, p + ih))
+
+        viewport = (cx - width / 2 * upp, cy - height / 2 * upp,
+                    cx + width / 2 * upp, cy + height / 2 * upp)
+        plan = plan_frame(ih, iw, fh, fw, s, p, viewport, (width, height))
+
+        cells = plan['cells']
+        pool = self._window_item_pool(
+            'cells', len(cells),
+            lambda: c.create_rectangle(0, 0, 0, 0, outline='')
         )
-
-        # Draw label
-        canvas.create_text(
-            x + w // 2, y + h // 2,
-            text=label,
-            font=('Arial', 12, 'bold'),
-            fill='white',
-            justify=tk.CENTER
+        for item, (x0, y0, x1, y1, density) in zip(pool, cells):
+            c.coords(item, *to_screen(x0, y0), *to_screen(x1, y1))
+            c.itemconfigure(item, fill=self.heat_color(density),
+                            state=tk.NORMAL if density > 0 else tk.HIDDEN)
+        for item in pool[len(cells):]:
+            c.itemconfigure(item, state=tk.HIDDEN)
+
+        windows = plan['windows']
+        pool = self._window_item_pool(
+            'windows', len(windows),
+            lambda: c.create_rectangle(0, 0, 0, 0, outline='#e74c3c', width=1)
         )
+        for item, (x0, y0, x1, y1) in zip(pool, windows):
+            c.coords(item, *to_screen(x0, y0), *to_screen(x1, y1))
+            c.itemconfigure(item, state=tk.NORMAL)
+        for item in pool[len(windows):]:
+            c.itemconfigure(item, state=tk.HIDDEN)
+
+        if plan['mode'] == 'heatmap':
+            info = (f"{plan['visible']:,} of {plan['total']:,} windows in view "
+                    f"— coverage heatmap, zoom in for individual windows")
+        else:
+            info = f"{plan['visible']:,} of {plan['total']:,} windows in view"
+        c.itemconfigure(items['info'], text=info)
+        c.tag_raise(items['info'])
+
+    @staticmethod
+    def heat_color(density):
+        """Heatmap color from white (no windows) to the filter color."""
+        level = round(density * 15) / 15
+        r = round(255 - (255 - 0xe7) * level)
+        g = round(255 - (255 - 0x4c) * level)
+        b = round(255 - (255 - 0x3c) * level)
+        return f'#{r:02x}{g:02x}{b:02x}'
 
 
 def main():
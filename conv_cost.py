@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Convolution Cost Model
+
+Estimates the compute and memory cost of convolutional layers:
+multiply-accumulate operations (MACs), parameter counts, activation and
+weight memory for a given dtype, and arithmetic intensity (flops per byte
+moved). All calculations are vectorized over NumPy arrays, so millions of
+candidate configurations can be scored at once.
+
+Per layer:
+    MACs       = Batch × OutH × OutW × FilterH × FilterW × InChannels × OutChannels
+    Parameters = FilterH × FilterW × InChannels × OutChannels (+ OutChannels bias)
+    Intensity  = 2 × MACs / (input + output + weight bytes)
+"""
+
+import numpy as np
+
+from conv_batch import batch_calculate
+from conv_output_calculator import resolve_padding
+
+
+DTYPE_BYTES = {
+    "float64": 8,
+    "float32": 4,
+    "float16": 2,
+    "bfloat16": 2,
+    "int8": 1,
+}
+
+
+def _dtype_bytes(dtype):
+    if isinstance(dtype, str):
+        if dtype not in DTYPE_BYTES:
+            raise ValueError(f"unknown dtype: {dtype}")
+        return DTYPE_BYTES[dtype]
+    return np.dtype(dtype).itemsize
+
+
+def layer_costs(input_h, input_w, filter_h, filter_w, stride, padding,
+                in_channels, out_channels, batch=1, dtype="float32",
+                bias=True, dilation=1):
+    """
+    Estimate the cost of many convolutional layers at once.
+
+    Args:
+        input_h, input_w: Input heights and widths
+        filter_h, filter_w: Filter/kernel heights and widths
+        stride, padding: Stride and padding values
+        in_channels, out_channels: Channel counts
+        batch: Batch size
+        dtype: Element type, a name in DTYPE_BYTES or a NumPy dtype
+        bias: Whether each output channel has a bias parameter
+        dilation: Spacing between filter elements (default: 1)
+
+    All numeric arguments may be scalars or arrays and are broadcast
+    together.
+
+    Returns:
+        Dictionary of arrays with the keys of batch_calculate plus:
+          "macs":          multiply-accumulate operations
+          "params":        weight (and bias) parameters
+          "input_bytes":   input activation memory
+          "output_bytes":  output activation memory
+          "weight_bytes":  parameter memory
+          "intensity":     flops per byte moved (2 flops per MAC)
+        Costs of invalid configurations are 0 (intensity NaN).
+    """
+    result = batch_calculate(input_h, input_w, filter_h, filter_w,
+                             stride, padding, dilation)
+    valid = result["valid"]
+    itemsize = _dtype_bytes(dtype)
+
+    in_channels = np.asarray(in_channels, dtype=np.int64)
+    out_channels = np.asarray(out_channels, dtype=np.int64)
+    batch = np.asarray(batch, dtype=np.int64)
+    kernel = (np.asarray(filter_h, dtype=np.int64)
+              * np.asarray(filter_w, dtype=np.int64))
+
+    output_pixels = np.where(valid, result["features"], 0)
+    input_pixels = (np.asarray(input_h, dtype=np.int64)
+                    * np.asarray(input_w, dtype=np.int64))
+
+    macs = batch * output_pixels * kernel * in_channels * out_channels
+    params = kernel * in_channels * out_channels
+    if bias:
+        params = params + out_channels
+    params = np.where(valid, params, 0)
+
+    input_bytes = np.where(valid, batch * in_channels * input_pixels * itemsize, 0)
+    output_bytes = batch * out_channels * output_pixels * itemsize
+    weight_bytes = params * itemsize
+
+    moved = input_bytes + output_bytes + weight_bytes
+    with np.errstate(divide="ignore", invalid="ignore"):
+        intensity = np.where(valid, 2 * macs / moved, np.nan)
+
+    result.update({
+        "macs": macs,
+        "params": params,
+        "input_bytes": input_bytes,
+        "output_bytes": output_bytes,
+        "weight_bytes": weight_bytes,
+        "intensity": intensity,
+    })
+    return result
+
+
+def network_costs(network, batch=1, dtype="float32", bias=True):
+    """
+    Estimate the cost of every layer of a ConvNetwork and the totals.
+
+    Pooling layers have no parameters or MACs but still count towards
+    activation memory. Layers after the first invalid one are left out.
+
+    Args:
+        network: conv_network.ConvNetwork
+        batch: Batch size
+        dtype: Element type, a name in DTYPE_BYTES or a NumPy dtype
+        bias: Whether conv layers have a bias
+
+    Returns:
+        (per_layer, totals): per_layer is the layer_costs dictionary with
+        one entry per valid layer; totals sums "macs", "params",
+        "output_bytes" and "weight_bytes" over the network and adds the
+        network-wide "intensity"
+    """
+    shapes = network.shapes()
+    rows = []
+    for layer, shape, out in zip(network.layers, shapes, shapes[1:]):
+        if out is None:
+            break
+        # layer_costs takes one symmetric padding for both axes, so pass
+        # the padded input (padding "same" or a pair may differ per side
+        # and per axis) and count the input bytes of the real one below
+        pad_h = sum(resolve_padding(layer.padding, shape[1], layer.filter_h,
+                                    layer.stride, layer.dilation))
+        pad_w = sum(resolve_padding(layer.padding, shape[2], layer.filter_w,
+                                    layer.stride, layer.dilation))
+        rows.append((shape[1] + pad_h, shape[2] + pad_w, layer.filter_h,
+                     layer.filter_w, layer.stride, 0, shape[0], out[0],
+                     layer.dilation, layer.kind == "conv",
+                     shape[1] * shape[2]))
+    columns = np.array(rows, dtype=np.int64).reshape(-1, 11)
+
+    is_conv = columns[:, 9].astype(bool)
+    per_layer = layer_costs(*columns[:, :8].T, batch=batch, dtype=dtype,
+                            bias=bias, dilation=columns[:, 8])
+    per_layer["input_bytes"] = (np.int64(batch) * columns[:, 6]
+                                * columns[:, 10] * _dtype_bytes(dtype))
+
+    # Pooling layers move activations but have no weights or MACs
+    for key in ("macs", "params", "weight_bytes"):
+        per_layer[key] = np.where(is_conv, per_layer[key], 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_layer["intensity"] = np.where(
+            is_conv,
+            2 * per_layer["macs"] / (per_layer["input_bytes"]
+                                     + per_layer["output_bytes"]
+                                     + per_layer["weight_bytes"]),
+            0.0,
+        )
+
+    totals = {key: int(per_layer[key].sum())
+              for key in ("macs", "params", "output_bytes", "weight_bytes")}
+    input_bytes = int(per_layer["input_bytes"][0]) if rows else 0
+    moved = input_bytes + totals["output_bytes"] + totals["weight_bytes"]
+    totals["intensity"] = 2 * totals["macs"] / moved if moved else 0.0
+
+    return per_layer, totals
+
+
+def print_network_costs(network, batch=1, dtype="float32"):
+    """Print a per-layer cost table for a ConvNetwork."""
+    per_layer, totals = network_costs(network, batch=batch, dtype=dtype)
+
+    print("\n" + "="*60)
+    print(f"NETWORK COST ({dtype}, batch {batch})")
+    print("="*60)
+    print(f"\n  {'#':>3}  {'MACs':>14}  {'Params':>11}  {'Act. MB':>9}  {'Flops/B':>7}")
+    print("-"*60)
+    for i in range(len(per_layer["macs"])):
+        print(f"  {i:>3}  {per_layer['macs'][i]:>14,}"
+              f"  {per_layer['params'][i]:>11,}"
+              f"  {per_layer['output_bytes'][i] / 1e6:>9.2f}"
+              f"  {per_layer['intensity'][i]:>7.1f}")
+    print("-"*60)
+    print(f"  {'Σ':>3}  {totals['macs']:>14,}  {totals['params']:>11,}"
+          f"  {totals['output_bytes'] / 1e6:>9.2f}  {totals['intensity']:>7.1f}")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    from conv_network import ConvNetwork, conv_layer, pool_layer
+
+    print_network_costs(ConvNetwork((3, 224, 224), [
+        conv_layer(3, padding=1, out_channels=64),
+        conv_layer(3, padding=1, out_channels=64),
+        pool_layer(2),
+        conv_layer(3, padding=1, out_channels=128),
+        conv_layer(3, padding=1, out_channels=128),
+        pool_layer(2),
+    ]))
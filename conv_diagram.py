@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Layer Diagrams Without a Display
+
+Lays out the input / filter / output diagram of the GUI and renders it as
+SVG (standard library only) or PNG (with Pillow), so diagrams can be
+produced for every layer of many models, e.g. in CI reports.
+
+diagram_layout computes where everything goes, exactly as the GUI canvas
+shows it: the input, the dashed padding outline, the filter, the stride
+arrow, the "⟹" arrow, and the output or the invalid marker. The GUI draws
+from the same layout, so both pictures always agree.
+
+render_diagrams fans the work out over a process pool. Each worker renders
+a batch of configurations and writes their files, so only the batch of
+records and a count travel between processes.
+
+Usage:
+    python3 conv_diagram.py configs.csv --out diagrams/ [--format png]
+"""
+
+import argparse
+import io
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from xml.sax.saxutils import escape
+
+
+DEFAULT_WIDTH = 700
+DEFAULT_HEIGHT = 300
+DEFAULT_BATCH_SIZE = 64
+
+DIAGRAM_FORMATS = ["svg", "png"]
+
+
+Box = namedtuple("Box", ["x0", "y0", "x1", "y1"])
+Line = namedtuple("Line", ["x0", "y0", "x1", "y1"])
+Label = namedtuple("Label", ["x", "y", "text"])
+
+
+# Colors and fonts of the GUI canvas items
+STYLES = {
+    "padding": {"outline": "#9b59b6", "width": 3, "dash": (5, 5)},
+    "padding_label": {"fill": "#9b59b6", "size": 10, "bold": True},
+    "input": {"fill": "#3498db", "outline": "#2c3e50", "width": 2},
+    "input_label": {"fill": "white", "size": 12, "bold": True},
+    "filter": {"fill": "#e74c3c", "outline": "#2c3e50", "width": 2},
+    "filter_label": {"fill": "white", "size": 12, "bold": True},
+    "stride": {"fill": "#f39c12", "width": 3},
+    "stride_label": {"fill": "#f39c12", "size": 10, "bold": True},
+    "arrow": {"fill": "#2c3e50", "size": 30, "bold": False},
+    "output": {"fill": "#27ae60", "outline": "#2c3e50", "width": 2},
+    "output_label": {"fill": "white", "size": 12, "bold": True},
+    "invalid": {"fill": "#c0392b", "size": 14, "bold": True},
+}
+
+
+def _labeled_box(layout, name, x, y, w, h, text):
+    layout[name] = Box(x, y, x + w, y + h)
+    layout[name + "_label"] = Label(x + w // 2, y + h // 2, text)
+
+
+def diagram_layout(ih, iw, fh, fw, s, p, oh, ow, is_valid,
+                   width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT):
+    """
+    Place the items of a layer diagram.
+
+    Args:
+        ih, iw, fh, fw, s, p: Input size, filter size, stride and padding
+        oh, ow: Output size (as from calculate_output_dimension)
+        is_valid: Whether the configuration is valid
+        width, height: Drawing size in pixels
+
+    Returns:
+        Dictionary mapping each name in STYLES to a Box, Line or Label, or
+        to None when the item is not shown (no padding, stride 1, or the
+        output of an invalid configuration)
+    """
+    layout = dict.fromkeys(STYLES)
+
+    # Calculate scaling
+    max_dim = max(ih, iw, oh, ow) if is_valid else max(ih, iw)
+    scale = min(100, 200 / max_dim) if max_dim > 0 else 1
+
+    # Positions
+    input_x = 100
+    filter_x = input_x + iw * scale + 80
+    output_x = filter_x + fw * scale + 80
+    y_center = height // 2
+
+    input_y = y_center - (ih * scale) // 2
+    _labeled_box(layout, "input", input_x, input_y,
+                 iw * scale, ih * scale, f"Input\n{ih}×{iw}")
+
+    if p > 0:
+        pad_scale = p * scale
+        layout["padding"] = Box(
+            input_x - pad_scale, input_y - pad_scale,
+            input_x + iw * scale + pad_scale, input_y + ih * scale + pad_scale
+        )
+        layout["padding_label"] = Label(
+            input_x + iw * scale // 2, input_y - pad_scale - 15, f"Padding: {p}"
+        )
+
+    filter_y = y_center - (fh * scale) // 2
+    _labeled_box(layout, "filter", filter_x, filter_y,
+                 fw * scale, fh * scale, f"Filter\n{fh}×{fw}")
+
+    if s > 1:
+        stride_y = filter_y + fh * scale + 30
+        arrow_length = s * scale
+        layout["stride"] = Line(filter_x, stride_y,
+                                filter_x + arrow_length, stride_y)
+        layout["stride_label"] = Label(filter_x + arrow_length // 2,
+                                       stride_y - 15, f"Stride: {s}")
+
+    layout["arrow"] = Label((filter_x + output_x) // 2, y_center, "⟹")
+
+    if is_valid:
+        output_y = y_center - (oh * scale) // 2
+        _labeled_box(layout, "output", output_x, output_y,
+                     ow * scale, oh * scale, f"Output\n{int(oh)}×{int(ow)}")
+    else:
+        layout["invalid"] = Label(output_x, y_center,
+                                  "❌\nInvalid\nConfiguration")
+
+    return layout
+
+
+def record_layout(record, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT):
+    """diagram_layout for a conv_stream result record."""
+    return diagram_layout(
+        record["input_h"], record["input_w"], record["filter_h"],
+        record["filter_w"], record["stride"], record["padding"],
+        record["output_h"], record["output_w"], record["valid"],
+        width, height,
+    )
+
+
+def render_svg(layout, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT):
+    """Render a layout as an SVG document string."""
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" '
+        f'height="{height}" viewBox="0 0 {width} {height}">',
+        '<defs><marker id="head" markerWidth="8" markerHeight="8" refX="6" '
+        'refY="4" orient="auto"><path d="M0,0 L8,4 L0,8 z" fill="#f39c12"/>'
+        '</marker></defs>',
+        f'<rect width="{width}" height="{height}" fill="white"/>',
+    ]
+
+    for name, item in layout.items():
+        if item is None:
+            continue
+        style = STYLES[name]
+        if isinstance(item, Box):
+            fill = style.get("fill", "none")
+            dash = (f' stroke-dasharray="{",".join(map(str, style["dash"]))}"'
+                    if "dash" in style else "")
+            parts.append(
+                f'<rect x="{item.x0:g}" y="{item.y0:g}" '
+                f'width="{item.x1 - item.x0:g}" height="{item.y1 - item.y0:g}" '
+                f'fill="{fill}" stroke="{style["outline"]}" '
+                f'stroke-width="{style["width"]}"{dash}/>'
+            )
+        elif isinstance(item, Line):
+            parts.append(
+                f'<line x1="{item.x0:g}" y1="{item.y0:g}" x2="{item.x1:g}" '
+                f'y2="{item.y1:g}" stroke="{style["fill"]}" '
+                f'stroke-width="{style["width"]}" marker-end="url(#head)"/>'
+            )
+        else:
+            lines = item.text.split("\n")
+            size = style["size"]
+            weight = "bold" if style["bold"] else "normal"
+            # Center the block of lines on (x, y), like a Tk text item
+            first = item.y - (len(lines) - 1) * size * 0.6
+            tspans = "".join(
+                f'<tspan x="{item.x:g}" y="{first + i * size * 1.2:g}">'
+                f'{escape(line)}</tspan>'
+                for i, line in enumerate(lines)
+            )
+            parts.append(
+                f'<text font-family="Arial, sans-serif" font-size="{size}" '
+                f'font-weight="{weight}" fill="{style["fill"]}" '
+                f'text-anchor="middle" dominant-baseline="central">'
+                f'{tspans}</text>'
+            )
+
+    parts.append("</svg>")
+    return "\n".join(parts) + "\n"
+
+
+def _pillow():
+    """Import Pillow, which only PNG output needs."""
+    try:
+        from PIL import Image, ImageDraw, ImageFont
+    except ImportError:
+        raise ImportError("PNG diagrams need Pillow (pip install pillow); "
+                          "SVG diagrams need nothing extra")
+    return Image, ImageDraw, ImageFont
+
+
+# Fonts for PNG labels (regular, bold); Pillow looks them up in the system
+# font directories. DejaVu has every symbol of the layouts but the emoji.
+PNG_FONTS = ("DejaVuSans.ttf", "DejaVuSans-Bold.ttf")
+
+_SYMBOL_TEXT = str.maketrans({"❌": "✗"})
+# Pillow's built-in fonts only cover ASCII
+_ASCII_TEXT = str.maketrans({"×": "x", "⟹": "=>", "❌": "X", "✗": "X"})
+
+
+@lru_cache(maxsize=None)
+def _png_font(size, bold):
+    """Return (font, str.translate table for its missing symbols)."""
+    _, _, ImageFont = _pillow()
+    try:
+        return ImageFont.truetype(PNG_FONTS[bold], size), _SYMBOL_TEXT
+    except OSError:
+        pass
+    try:
+        return ImageFont.load_default(size=size), _ASCII_TEXT
+    except TypeError:
+        # Pillow before 10.1 has one fixed-size bitmap font
+        return ImageFont.load_default(), _ASCII_TEXT
+
+
+def render_png(layout, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT):
+    """
+    Render a layout as PNG bytes.
+
+    Raises:
+        ImportError: If Pillow is not installed
+    """
+    Image, ImageDraw, ImageFont = _pillow()
+
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+
+    for name, item in layout.items():
+        if item is None:
+            continue
+        style = STYLES[name]
+        if isinstance(item, Box):
+            if "dash" in style:
+                _dashed_rectangle(draw, item, style)
+            else:
+                draw.rectangle(item, fill=style["fill"],
+                               outline=style["outline"], width=style["width"])
+        elif isinstance(item, Line):
+            draw.line(item, fill=style["fill"], width=style["width"])
+            # Arrow head at the end, as Tk's arrow=LAST
+            draw.polygon([(item.x1, item.y1 - 5), (item.x1 + 8, item.y1),
+                          (item.x1, item.y1 + 5)], fill=style["fill"])
+        else:
+            font, table = _png_font(style["size"], style["bold"])
+            text = item.text.translate(table)
+            # Center the text block on (x, y), like a Tk text item
+            left, top, right, bottom = draw.multiline_textbbox(
+                (0, 0), text, font=font, align="center"
+            )
+            draw.multiline_text(
+                (item.x - (left + right) / 2, item.y - (top + bottom) / 2),
+                text, fill=style["fill"], font=font, align="center"
+            )
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _dashed_rectangle(draw, box, style):
+    dash, gap = style["dash"]
+    x0, y0, x1, y1 = box
+    for ax, ay, bx, by in ((x0, y0, x1, y0), (x1, y0, x1, y1),
+                           (x1, y1, x0, y1), (x0, y1, x0, y0)):
+        length = abs(bx - ax) + abs(by - ay)
+        position = 0
+        while position < length:
+            end = min(position + dash, length)
+            draw.line([(ax + (bx - ax) * position / length,
+                        ay + (by - ay) * position / length),
+                       (ax + (bx - ax) * end / length,
+                        ay + (by - ay) * end / length)],
+                      fill=style["outline"], width=style["width"])
+            position += dash + gap
+
+
+RENDERERS = {
+    "svg": render_svg,
+    "png": render_png,
+}
+
+
+def _render_batch(batch, out_dir, format, width, height):
+    """Render and write one batch of (name, record) pairs."""
+    render = RENDERERS[format]
+    for name, record in batch:
+        data = render(record_layout(record, width, height), width, height)
+        mode = "w" if isinstance(data, str) else "wb"
+        encoding = "utf-8" if mode == "w" else None
+        with open(os.path.join(out_dir, f"{name}.{format}"), mode,
+                  encoding=encoding) as f:
+            f.write(data)
+    return len(batch)
+
+
+def render_diagrams(records, out_dir, format="svg", names=None, workers=None,
+                    batch_size=DEFAULT_BATCH_SIZE, width=DEFAULT_WIDTH,
+                    height=DEFAULT_HEIGHT, progress=None):
+    """
+    Render a diagram file for every configuration.
+
+    Args:
+        records: conv_stream result records (records with an error are
+            skipped)
+        out_dir: Directory for the files (created if needed)
+        format: "svg" or "png"
+        names: File names without extension, one per record (default:
+            layer_00000, layer_00001, ...)
+        workers: Worker processes (default: CPU count; 1 renders in the
+            current process)
+        batch_size: Records rendered and written per task
+        width, height: Diagram size in pixels
+        progress: Callable progress(done, total) called as batches finish
+
+    Returns:
+        Number of files written
+    """
+    if format not in RENDERERS:
+        raise ValueError(f"unknown diagram format: {format}")
+    if format == "png":
+        # Fail before starting any workers
+        _pillow()
+
+    records = list(records)
+    if names is None:
+        names = (f"layer_{i:05d}" for i in range(len(records)))
+    jobs = [(name, record) for name, record in zip(names, records)
+            if record["error"] is None]
+    batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+    os.makedirs(out_dir, exist_ok=True)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    done = 0
+    if workers == 1 or len(batches) <= 1:
+        for batch in batches:
+            done += _render_batch(batch, out_dir, format, width, height)
+            if progress:
+                progress(done, len(jobs))
+    else:
+        render = partial(_render_batch, out_dir=out_dir, format=format,
+                         width=width, height=height)
+        with ProcessPoolExecutor(workers) as pool:
+            for count in pool.map(render, batches):
+                done += count
+                if progress:
+                    progress(done, len(jobs))
+
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render layer diagrams for a file of configurations."
+    )
+    parser.add_argument("source", help="CSV or JSON Lines file ('-' for stdin)")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"],
+                        default="csv")
+    parser.add_argument("--out", default="diagrams",
+                        help="output directory (default: diagrams)")
+    parser.add_argument("--format", choices=DIAGRAM_FORMATS, default="svg")
+    parser.add_argument("--workers", type=int,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--width", type=int, default=DEFAULT_WIDTH)
+    parser.add_argument("--height", type=int, default=DEFAULT_HEIGHT)
+    args = parser.parse_args(argv)
+
+    if args.format == "png":
+        try:
+            _pillow()
+        except ImportError as e:
+            parser.exit(2, f"{parser.prog}: error: {e}\n")
+
+    from conv_stream import stream_results
+
+    if args.source == "-":
+        records = list(stream_results(sys.stdin, args.input_format))
+    else:
+        with open(args.source, newline="", encoding="utf-8") as f:
+            records = list(stream_results(f, args.input_format))
+
+    written = render_diagrams(records, args.out, args.format,
+                              workers=args.workers, width=args.width,
+                              height=args.height)
+    skipped = len(records) - written
+
+    print(f"Wrote {written} {args.format.upper()} diagram(s) to {args.out}"
+          + (f" ({skipped} row(s) with errors skipped)" if skipped else ""))
+
+
+if __name__ == "__main__":
+    main()
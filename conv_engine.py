@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+"""
+Convolution Execution Engine
+
+Performs the convolution that conv_output_calculator describes, so output
+shapes can be checked against real data and the operation can be timed.
+
+Three algorithms are available:
+  direct:   the padded input is viewed as a grid of filter windows with
+            as_strided (no copy), and all windows are multiplied with the
+            kernel in a single tensordot (im2col + matmul)
+  fft:      the convolution is done as a product in the frequency domain,
+            which is much cheaper for large filters on large inputs
+  winograd: Winograd minimal filtering F(2×2, 3×3) or F(4×4, 3×3) for 3×3
+            filters with stride 1, which needs 2.25× or 4× fewer
+            multiplies than direct
+
+convolve() picks one per call from a cost model; select_algorithm() shows
+which one it would pick and why.
+
+Layouts:
+    image:  (H, W), (C, H, W) or (N, C, H, W)
+    kernel: (FH, FW), (C, FH, FW) or (C_out, C, FH, FW)
+    output: (OH, OW), (C_out, OH, OW) or (N, C_out, OH, OW), following
+            the image layout (a 2D or 3D kernel gives C_out = 1)
+"""
+
+from collections import namedtuple
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+from conv_output_calculator import calculate_output_dimension
+
+
+def output_shape(input_h, input_w, filter_h, filter_w, stride, padding):
+    """
+    Calculate the integer output size, checking it is a valid configuration.
+
+    Returns:
+        (output_h, output_w)
+
+    Raises:
+        ValueError: If either output dimension is not a positive integer
+    """
+    output_h = calculate_output_dimension(input_h, filter_h, stride, padding)
+    output_w = calculate_output_dimension(input_w, filter_w, stride, padding)
+
+    if not (output_h > 0 and output_w > 0
+            and output_h == int(output_h) and output_w == int(output_w)):
+        raise ValueError(
+            f"Invalid configuration: output dimensions {output_h} × {output_w} "
+            f"are not positive integers"
+        )
+
+    return int(output_h), int(output_w)
+
+
+def _as_batch(image, kernel):
+    """Bring image and kernel to 4D (N, C, H, W) / (C_out, C, FH, FW)."""
+    image = np.asarray(image)
+    kernel = np.asarray(kernel)
+
+    if image.ndim not in (2, 3, 4):
+        raise ValueError(f"image must be 2D, 3D or 4D, got {image.ndim}D")
+    if kernel.ndim not in (2, 3, 4):
+        raise ValueError(f"kernel must be 2D, 3D or 4D, got {kernel.ndim}D")
+
+    image_ndim = image.ndim
+    while image.ndim < 4:
+        image = image[np.newaxis]
+    while kernel.ndim < 4:
+        kernel = kernel[np.newaxis]
+
+    if image.shape[1] != kernel.shape[1]:
+        raise ValueError(
+            f"image has {image.shape[1]} channels but kernel expects "
+            f"{kernel.shape[1]}"
+        )
+
+    return image, kernel, image_ndim
+
+
+def _from_batch(output, image_ndim):
+    """Drop the leading axes that _as_batch added."""
+    if image_ndim == 3:
+        return output[0]
+    if image_ndim == 2:
+        return output[0, 0]
+    return output
+
+
+def pad_image(image, padding):
+    """Zero-pad the last two axes of a (N, C, H, W) array."""
+    if padding == 0:
+        return image
+    return np.pad(image, ((0, 0), (0, 0), (padding, padding), (padding, padding)))
+
+
+def window_view(image, filter_h, filter_w, stride, output_h, output_w):
+    """
+    View a padded (N, C, H, W) array as filter windows without copying.
+
+    Returns:
+        Read-only array of shape (N, C, OH, OW, FH, FW) where
+        [n, c, i, j] is the window under output position (i, j)
+    """
+    sn, sc, sh, sw = image.strides
+    return as_strided(
+        image,
+        shape=(image.shape[0], image.shape[1], output_h, output_w,
+               filter_h, filter_w),
+        strides=(sn, sc, sh * stride, sw * stride, sh, sw),
+        writeable=False,
+    )
+
+
+def conv2d(image, kernel, stride=1, padding=0, bias=None):
+    """
+    Convolve an image with a kernel (cross-correlation, as in CNNs).
+
+    Args:
+        image: Input array, see the module docstring for layouts
+        kernel: Filter weights
+        stride: Stride value
+        padding: Zero padding on every side
+        bias: Optional per-output-channel bias of shape (C_out,)
+
+    Returns:
+        Output array whose spatial size matches calculate_output_dimension
+
+    Raises:
+        ValueError: If the shapes do not fit together or the configuration
+            gives non-integer output dimensions
+    """
+    x, w, image_ndim = _as_batch(image, kernel)
+    filter_h, filter_w = w.shape[2:]
+
+    output_h, output_w = output_shape(
+        x.shape[2], x.shape[3], filter_h, filter_w, stride, padding
+    )
+
+    dtype = np.result_type(x.dtype, w.dtype, np.float32)
+    x = pad_image(x.astype(dtype, copy=False), padding)
+    windows = window_view(x, filter_h, filter_w, stride, output_h, output_w)
+
+    # (N, C, OH, OW, FH, FW) · (C_out, C, FH, FW) -> (N, OH, OW, C_out)
+    out = np.tensordot(windows, w.astype(dtype, copy=False),
+                       axes=([1, 4, 5], [1, 2, 3]))
+    if bias is not None:
+        out += np.asarray(bias, dtype=dtype)
+
+    out = np.ascontiguousarray(out.transpose(0, 3, 1, 2))
+    return _from_batch(out, image_ndim)
+
+
+def _next_fast_len(n):
+    """Smallest 5-smooth number >= n (sizes the FFT handles quickly)."""
+    best = None
+    p5 = 1
+    while p5 < 2 * n:
+        p35 = p5
+        while p35 < 2 * n:
+            p235 = p35
+            while p235 < n:
+                p235 *= 2
+            if best is None or p235 < best:
+                best = p235
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
+def conv2d_fft(image, kernel, stride=1, padding=0, bias=None):
+    """
+    Convolve an image with a kernel in the frequency domain.
+
+    Same arguments, result and errors as conv2d. The full stride-1
+    correlation is computed and then subsampled by the stride, so this
+    pays off for large filters rather than large strides.
+    """
+    x, w, image_ndim = _as_batch(image, kernel)
+    filter_h, filter_w = w.shape[2:]
+
+    output_h, output_w = output_shape(
+        x.shape[2], x.shape[3], filter_h, filter_w, stride, padding
+    )
+
+    dtype = np.result_type(x.dtype, w.dtype, np.float32)
+    x = pad_image(x.astype(dtype, copy=False), padding)
+    n, c, padded_h, padded_w = x.shape
+    c_out = w.shape[0]
+
+    # Circular correlation of size >= padded input never wraps into the
+    # valid region, so no extra padding is needed beyond fast FFT sizes
+    fft_h = _next_fast_len(padded_h)
+    fft_w = _next_fast_len(padded_w)
+
+    x_freq = np.fft.rfft2(x, s=(fft_h, fft_w))
+    # Correlation is convolution with the flipped kernel
+    w_freq = np.fft.rfft2(w[:, :, ::-1, ::-1].astype(dtype, copy=False),
+                          s=(fft_h, fft_w))
+
+    # Sum over input channels for every frequency as one batched matmul:
+    # (F, N, C) @ (F, C, C_out) -> (F, N, C_out)
+    freqs = x_freq.shape[2] * x_freq.shape[3]
+    x_mat = x_freq.reshape(n, c, freqs).transpose(2, 0, 1)
+    w_mat = w_freq.reshape(c_out, c, freqs).transpose(2, 1, 0)
+    y_freq = np.matmul(x_mat, w_mat).transpose(1, 2, 0).reshape(
+        n, c_out, x_freq.shape[2], x_freq.shape[3]
+    )
+
+    full = np.fft.irfft2(y_freq, s=(fft_h, fft_w))
+    out = full[:, :,
+               filter_h - 1:filter_h - 1 + (output_h - 1) * stride + 1:stride,
+               filter_w - 1:filter_w - 1 + (output_w - 1) * stride + 1:stride]
+    out = out.astype(dtype, copy=False)
+
+    if bias is not None:
+        out = out + np.asarray(bias, dtype=dtype)[:, np.newaxis, np.newaxis]
+
+    return _from_batch(np.ascontiguousarray(out), image_ndim)
+
+
+# Winograd transforms (Lavin & Gray, "Fast Algorithms for Convolutional
+# Neural Networks") for output tiles of m × m: (A^T, G, B^T), with
+# Y = A^T [(G g G^T) ⊙ (B^T d B)] A for a filter g and an input tile d of
+# (m + 2) × (m + 2)
+WINOGRAD_TRANSFORMS = {
+    2: (
+        np.array([[1, 1, 1, 0],
+                  [0, 1, -1, -1]]),
+        np.array([[1, 0, 0],
+                  [1 / 2, 1 / 2, 1 / 2],
+                  [1 / 2, -1 / 2, 1 / 2],
+                  [0, 0, 1]]),
+        np.array([[1, 0, -1, 0],
+                  [0, 1, 1, 0],
+                  [0, -1, 1, 0],
+                  [0, 1, 0, -1]]),
+    ),
+    4: (
+        np.array([[1, 1, 1, 1, 1, 0],
+                  [0, 1, -1, 2, -2, 0],
+                  [0, 1, 1, 4, 4, 0],
+                  [0, 1, -1, 8, -8, 1]]),
+        np.array([[1 / 4, 0, 0],
+                  [-1 / 6, -1 / 6, -1 / 6],
+                  [-1 / 6, 1 / 6, -1 / 6],
+                  [1 / 24, 1 / 12, 1 / 6],
+                  [1 / 24, -1 / 12, 1 / 6],
+                  [0, 0, 1]]),
+        np.array([[4, 0, -5, 0, 1, 0],
+                  [0, -4, -4, 1, 1, 0],
+                  [0, 4, -4, -1, 1, 0],
+                  [0, -2, -1, 2, 1, 0],
+                  [0, 2, -1, -2, 1, 0],
+                  [0, 4, 0, -5, 0, 1]]),
+    ),
+}
+
+# Largest error allowed against a float64 direct reference, relative to the
+# largest output magnitude, in units of the computation dtype's epsilon.
+# The bigger F(4×4, 3×3) transforms lose about a decimal digit more.
+WINOGRAD_TOLERANCE = {2: 100, 4: 1000}
+
+
+def winograd_applies(filter_h, filter_w, stride):
+    """Whether the Winograd algorithm can run a convolution."""
+    return filter_h == 3 and filter_w == 3 and stride == 1
+
+
+def conv2d_winograd(image, kernel, stride=1, padding=0, bias=None, tile=None):
+    """
+    Convolve with a 3×3 kernel at stride 1 by Winograd minimal filtering.
+
+    Same arguments, result and errors as conv2d. The output is split into
+    tile × tile blocks; each (tile + 2)² input block and the kernel are
+    transformed, multiplied element by element (summed over input channels
+    as one batched matmul per element), and transformed back.
+
+    Args:
+        tile: Output tile size, 2 for F(2×2, 3×3) or 4 for F(4×4, 3×3);
+            by default the one with the lower estimated cost
+
+    Raises:
+        ValueError: Also if the kernel is not 3×3 or the stride is not 1
+    """
+    x, w, image_ndim = _as_batch(image, kernel)
+    filter_h, filter_w = w.shape[2:]
+    if not winograd_applies(filter_h, filter_w, stride):
+        raise ValueError("Winograd convolution needs a 3×3 filter and stride 1")
+
+    output_h, output_w = output_shape(
+        x.shape[2], x.shape[3], filter_h, filter_w, stride, padding
+    )
+
+    n, c = x.shape[:2]
+    c_out = w.shape[0]
+    if tile is None:
+        tile = winograd_tile(n, c, c_out, output_h, output_w)
+    if tile not in WINOGRAD_TRANSFORMS:
+        raise ValueError(f"Winograd tile must be one of "
+                         f"{sorted(WINOGRAD_TRANSFORMS)}, got {tile}")
+
+    dtype = np.result_type(x.dtype, w.dtype, np.float32)
+    at, g, bt = (t.astype(dtype) for t in WINOGRAD_TRANSFORMS[tile])
+    size = tile + 2
+    tiles_h = -(-output_h // tile)
+    tiles_w = -(-output_w // tile)
+
+    # Extra zeros at the bottom and right make the tiles cover the output
+    x = np.pad(x.astype(dtype, copy=False),
+               ((0, 0), (0, 0),
+                (padding, padding + tiles_h * tile - output_h),
+                (padding, padding + tiles_w * tile - output_w)))
+    sn, sc, sh, sw = x.strides
+    blocks = as_strided(x, shape=(n, c, tiles_h, tiles_w, size, size),
+                        strides=(sn, sc, sh * tile, sw * tile, sh, sw),
+                        writeable=False)
+
+    # B^T d B for every block, laid out as (size², C, blocks)
+    v = np.tensordot(bt, blocks, axes=([1], [4]))
+    v = np.tensordot(v, bt, axes=([5], [1]))
+    v = v.transpose(0, 5, 2, 1, 3, 4).reshape(size * size, c, -1)
+
+    # G g G^T for every filter, laid out as (size², C_out, C)
+    u = np.tensordot(np.tensordot(g, w.astype(dtype, copy=False),
+                                  axes=([1], [2])),
+                     g, axes=([3], [1]))
+    u = u.transpose(0, 3, 1, 2).reshape(size * size, c_out, c)
+
+    # Element-wise product summed over channels: (size², C_out, blocks)
+    m = np.matmul(u, v).reshape(size, size, c_out, n, tiles_h, tiles_w)
+
+    # A^T m A back to tile × tile outputs
+    y = np.tensordot(at, m, axes=([1], [0]))
+    y = np.tensordot(y, at, axes=([1], [1]))
+    out = y.transpose(2, 1, 3, 0, 4, 5).reshape(
+        n, c_out, tiles_h * tile, tiles_w * tile
+    )[:, :, :output_h, :output_w]
+
+    if bias is not None:
+        out = out + np.asarray(bias, dtype=dtype)[:, np.newaxis, np.newaxis]
+
+    return _from_batch(np.ascontiguousarray(out), image_ndim)
+
+
+WinogradCheck = namedtuple("WinogradCheck", ["error", "tolerance", "ok"])
+WinogradCheck.__doc__ = """
+Result of comparing conv2d_winograd with a direct reference.
+
+Fields:
+    error: Largest absolute difference, relative to the largest output
+        magnitude of the reference
+    tolerance: Largest relative error allowed (see WINOGRAD_TOLERANCE)
+    ok: Whether error <= tolerance
+"""
+
+
+def check_winograd(image, kernel, padding=1, bias=None, tile=None):
+    """
+    Check conv2d_winograd against conv2d computed in float64.
+
+    Args:
+        image, kernel, padding, bias: As for conv2d (stride is 1)
+        tile: Winograd tile size, as for conv2d_winograd
+
+    Returns:
+        WinogradCheck
+    """
+    image = np.asarray(image)
+    kernel = np.asarray(kernel)
+    if tile is None:
+        x, w, _ = _as_batch(image, kernel)
+        tile = winograd_tile(x.shape[0], x.shape[1], w.shape[0],
+                             *output_shape(x.shape[2], x.shape[3], 3, 3, 1,
+                                           padding))
+
+    out = conv2d_winograd(image, kernel, 1, padding, bias, tile)
+    reference = conv2d(image.astype(np.float64), kernel.astype(np.float64),
+                       1, padding, bias)
+
+    scale = np.abs(reference).max()
+    error = float(np.abs(out - reference).max() / scale) if scale else 0.0
+    tolerance = WINOGRAD_TOLERANCE[tile] * float(np.finfo(out.dtype).eps)
+    return WinogradCheck(error, tolerance, error <= tolerance)
+
+
+# NumPy's FFT runs at roughly 1/2.5 of the flop rate BLAS reaches in the
+# direct algorithm's matmul, so FFT flops are weighted up by this factor
+FFT_OVERHEAD = 2.5
+
+# The Winograd transforms are small tensordots that are bound by memory
+# traffic rather than arithmetic, so their flops are weighted up likewise
+WINOGRAD_OVERHEAD = 2
+
+
+ALGORITHMS = {
+    "direct": conv2d,
+    "fft": conv2d_fft,
+    "winograd": conv2d_winograd,
+}
+
+
+AlgorithmChoice = namedtuple(
+    "AlgorithmChoice",
+    ["algorithm", "direct_cost", "fft_cost", "reason", "winograd_cost"],
+    defaults=(None,),
+)
+AlgorithmChoice.__doc__ = """
+The algorithm convolve() picks for one call.
+
+Fields:
+    algorithm: "direct", "fft" or "winograd"
+    direct_cost, fft_cost: Estimated cost of each, in direct-algorithm flops
+    reason: Human-readable explanation of the choice
+    winograd_cost: Estimated cost of the Winograd algorithm with its best
+        tile size, or None if it doesn't apply
+"""
+
+
+def estimate_costs(batch, channels, out_channels, input_h, input_w,
+                   filter_h, filter_w, stride, padding):
+    """
+    Estimate the floating-point operations of each algorithm.
+
+    direct: 2 flops per multiply-accumulate over every window.
+    fft:    forward transforms of the input and kernel, a complex
+            multiply-accumulate per frequency and channel pair, and the
+            inverse transforms, weighted by FFT_OVERHEAD. Stride does not
+            reduce this cost.
+
+    Returns:
+        (direct_cost, fft_cost)
+    """
+    output_h = (input_h - filter_h + 2 * padding) // stride + 1
+    output_w = (input_w - filter_w + 2 * padding) // stride + 1
+
+    direct = 2 * batch * out_channels * channels \
+        * output_h * output_w * filter_h * filter_w
+
+    size = (_next_fast_len(input_h + 2 * padding)
+            * _next_fast_len(input_w + 2 * padding))
+    transform = 2.5 * size * math.log2(max(size, 2))
+    fft = FFT_OVERHEAD * (
+        transform * (batch * channels + out_channels * channels
+                     + batch * out_channels)
+        + 8 * (size / 2) * batch * out_channels * channels
+    )
+
+    return direct, fft
+
+
+def estimate_winograd_cost(batch, channels, out_channels, output_h, output_w,
+                           tile):
+    """
+    Estimate the floating-point operations of the Winograd algorithm.
+
+    The batched matmul does one multiply-accumulate per transformed element
+    and channel pair, (tile + 2)² per block instead of 9 × tile². The
+    input, output and filter transforms are weighted by WINOGRAD_OVERHEAD.
+
+    Returns:
+        Estimated cost, in direct-algorithm flops
+    """
+    size = tile + 2
+    blocks = batch * -(-output_h // tile) * -(-output_w // tile)
+
+    products = 2 * size * size * blocks * channels * out_channels
+    transforms = (4 * size ** 3 * blocks * channels
+                  + 2 * (tile * size * size + tile * tile * size)
+                  * blocks * out_channels
+                  + 4 * size * size * 3 * channels * out_channels)
+    return products + WINOGRAD_OVERHEAD * transforms
+
+
+def winograd_tile(batch, channels, out_channels, output_h, output_w):
+    """Pick the Winograd tile size with the lowest estimated cost."""
+    return min(WINOGRAD_TRANSFORMS, key=lambda tile: estimate_winograd_cost(
+        batch, channels, out_channels, output_h, output_w, tile
+    ))
+
+
+def select_algorithm(image_shape, kernel_shape, stride=1, padding=0):
+    """
+    Choose between the direct, FFT and Winograd algorithms for one
+    convolution.
+
+    Args:
+        image_shape: Shape of the image array (any layout conv2d accepts)
+        kernel_shape: Shape of the kernel array
+        stride: Stride value
+        padding: Padding value
+
+    Returns:
+        AlgorithmChoice with the estimates and the reason for the choice
+    """
+    image_shape = (1,) * (4 - len(image_shape)) + tuple(image_shape)
+    kernel_shape = (1,) * (4 - len(kernel_shape)) + tuple(kernel_shape)
+    batch, channels, input_h, input_w = image_shape
+    out_channels, _, filter_h, filter_w = kernel_shape
+
+    direct, fft = estimate_costs(batch, channels, out_channels,
+                                 input_h, input_w, filter_h, filter_w,
+                                 stride, padding)
+
+    winograd = None
+    if winograd_applies(filter_h, filter_w, stride):
+        output_h = input_h - filter_h + 2 * padding + 1
+        output_w = input_w - filter_w + 2 * padding + 1
+        tile = winograd_tile(batch, channels, out_channels, output_h, output_w)
+        winograd = estimate_winograd_cost(batch, channels, out_channels,
+                                          output_h, output_w, tile)
+
+    if winograd is not None and winograd < min(direct, fft):
+        algorithm = "winograd"
+        reason = (f"3×3 filter, stride 1: Winograd F({tile}×{tile}, 3×3) "
+                  f"~{winograd:.3g} flops vs direct ~{direct:.3g} "
+                  f"({direct / winograd:.1f}× cheaper)")
+    elif fft < direct:
+        algorithm = "fft"
+        reason = (f"{filter_h}×{filter_w} filter on {input_h}×{input_w} input: "
+                  f"FFT ~{fft:.3g} flops vs direct ~{direct:.3g} "
+                  f"({direct / fft:.1f}× cheaper)")
+    else:
+        algorithm = "direct"
+        reason = (f"{filter_h}×{filter_w} filter, stride {stride}: "
+                  f"direct ~{direct:.3g} flops vs FFT ~{fft:.3g}")
+        if fft > 0 and direct > 0:
+            reason += f" ({fft / direct:.1f}× cheaper)"
+
+    return AlgorithmChoice(algorithm, direct, fft, reason, winograd)
+
+
+def convolve(image, kernel, stride=1, padding=0, bias=None,
+             algorithm="auto", return_choice=False):
+    """
+    Convolve with the cheapest algorithm for the given shapes.
+
+    Args:
+        image, kernel, stride, padding, bias: As for conv2d
+        algorithm: "auto", or force one of ALGORITHMS
+        return_choice: Also return the AlgorithmChoice that was used
+
+    Returns:
+        Output array, or (output, AlgorithmChoice) if return_choice is set
+    """
+    image = np.asarray(image)
+    kernel = np.asarray(kernel)
+
+    choice = select_algorithm(image.shape, kernel.shape, stride, padding)
+    if algorithm != "auto":
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"unknown algorithm: {algorithm}")
+        choice = choice._replace(algorithm=algorithm,
+                                 reason=f"forced by caller ({algorithm})")
+
+    out = ALGORITHMS[choice.algorithm](image, kernel, stride, padding, bias)
+    if return_choice:
+        return out, choice
+    return out
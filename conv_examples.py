@@ -3,11 +3,18 @@
 Example demonstrations of convolution output dimension calculations
 """
 
+import sys
+
 from conv_output_calculator import visualize_calculation
 
 
-def run_examples():
-    """Run several example scenarios."""
+def run_examples(pause=True):
+    """
+    Run several example scenarios.
+
+    Args:
+        pause: Wait for Enter between examples
+    """
 
     print("\n" + "="*60)
     print("EXAMPLE SCENARIOS")
@@ -73,9 +80,14 @@ def run_examples():
             example["padding"]
         )
 
-        if i < len(examples):
+        if pause and i < len(examples):
             input("\nPress Enter to see next example...")
 
 
+def main():
+    # Only pause when someone is at the terminal, so output can be piped
+    run_examples(pause=sys.stdin.isatty())
+
+
 if __name__ == "__main__":
-    run_examples()
+    main()
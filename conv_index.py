@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Precomputed Lookup Index of Valid Configurations
+
+Precomputes the output dimension of every (input, filter, stride, padding)
+combination in a bounded domain into a .npy file, and answers queries from
+a read-only memory map of it.
+
+Height and width are independent, so the table covers one axis: a 2D
+configuration is valid when both of its axes are. Entries are uint16
+output dimensions, with 0 marking configurations that don't give a
+positive integer output. The table is laid out as
+
+    table[input - 1, filter - 1, padding, stride - 1]
+
+so every (input, filter) pair owns one contiguous padding × stride block,
+and range queries such as "all strides valid for this input, filter and
+padding" read a single short row. The domain follows from the table shape
+alone: inputs, filters and strides start at 1 and paddings at 0.
+
+Opening an index only reads the .npy header; pages of the table are read
+by the operating system as queries touch them. Queries outside the domain
+fall back to calculating the answer directly.
+
+Usage:
+    python3 conv_index.py build [--path conv_index.npy] [--max-input 4096] ...
+    python3 conv_index.py query INPUT FILTER [--padding P] [--stride S]
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from conv_batch import output_sizes
+
+
+DEFAULT_PATH = "conv_index.npy"
+DEFAULT_MAX_INPUT = 4096
+DEFAULT_MAX_FILTER = 15
+DEFAULT_MAX_STRIDE = 8
+DEFAULT_MAX_PADDING = 10
+
+INDEX_DTYPE = np.uint16
+
+# Input rows computed per block while building
+BUILD_BLOCK = 256
+
+
+def _entries(input_dim, filter_dim, stride, padding):
+    """Calculate table entries: the output dimension, or 0 where invalid."""
+    output, remainder = output_sizes(input_dim, filter_dim, stride, padding)
+    return np.where((remainder == 0) & (output > 0), output, 0)
+
+
+def _table_rows(inputs, max_filter, max_stride, max_padding):
+    """Calculate the table rows for an array of input dimensions."""
+    return _entries(inputs[:, None, None, None],
+                    np.arange(1, max_filter + 1)[None, :, None, None],
+                    np.arange(1, max_stride + 1)[None, None, None, :],
+                    np.arange(0, max_padding + 1)[None, None, :, None])
+
+
+def build_index(path=DEFAULT_PATH, max_input=DEFAULT_MAX_INPUT,
+                max_filter=DEFAULT_MAX_FILTER, max_stride=DEFAULT_MAX_STRIDE,
+                max_padding=DEFAULT_MAX_PADDING):
+    """
+    Precompute the lookup table and write it to a .npy file.
+
+    Args:
+        path: Output file
+        max_input, max_filter, max_stride, max_padding: Domain bounds
+            (inclusive)
+
+    Returns:
+        Size of the table in bytes
+    """
+    largest = max_input + 2 * max_padding
+    if largest > np.iinfo(INDEX_DTYPE).max:
+        raise ValueError(f"outputs up to {largest} don't fit in {INDEX_DTYPE.__name__}")
+
+    shape = (max_input, max_filter, max_padding + 1, max_stride)
+    table = np.lib.format.open_memmap(path, mode="w+", dtype=INDEX_DTYPE,
+                                      shape=shape)
+
+    for start in range(1, max_input + 1, BUILD_BLOCK):
+        inputs = np.arange(start, min(start + BUILD_BLOCK, max_input + 1))
+        table[start - 1:start - 1 + len(inputs)] = _table_rows(
+            inputs, max_filter, max_stride, max_padding
+        )
+
+    table.flush()
+    return table.nbytes
+
+
+class ConfigIndex:
+    """
+    Read-only lookups into a table written by build_index.
+
+    The file is memory-mapped on the first query, not when the index is
+    created.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._table = None
+
+    @property
+    def table(self):
+        if self._table is None:
+            self._table = np.load(self.path, mmap_mode="r")
+        return self._table
+
+    @property
+    def max_input(self):
+        return self.table.shape[0]
+
+    @property
+    def max_filter(self):
+        return self.table.shape[1]
+
+    @property
+    def max_padding(self):
+        return self.table.shape[2] - 1
+
+    @property
+    def max_stride(self):
+        return self.table.shape[3]
+
+    def covers(self, input_dim, filter_dim, stride=1, padding=0):
+        """Check that a configuration lies inside the precomputed domain."""
+        inputs, filters, paddings, strides = self.table.shape
+        return (0 < input_dim <= inputs and 0 < filter_dim <= filters
+                and 0 < stride <= strides and 0 <= padding < paddings)
+
+    def output(self, input_dim, filter_dim, stride, padding):
+        """
+        Look up one output dimension.
+
+        Returns:
+            The output dimension, or None if the configuration doesn't give
+            a positive integer output
+        """
+        if self.covers(input_dim, filter_dim, stride, padding):
+            output = int(self.table[input_dim - 1, filter_dim - 1,
+                                    padding, stride - 1])
+        else:
+            output = int(_entries(input_dim, filter_dim, stride, padding))
+        return output or None
+
+    def lookup(self, input_h, input_w, filter_h, filter_w, stride, padding):
+        """
+        Look up a 2D configuration.
+
+        Returns:
+            (output_h, output_w), or None if either axis is invalid
+        """
+        output_h = self.output(input_h, filter_h, stride, padding)
+        output_w = self.output(input_w, filter_w, stride, padding)
+        if output_h is None or output_w is None:
+            return None
+        return output_h, output_w
+
+    def _block(self, input_dim, filter_dim):
+        """The padding × stride block of one (input, filter) pair."""
+        if 1 <= input_dim <= self.max_input and 1 <= filter_dim <= self.max_filter:
+            return self.table[input_dim - 1, filter_dim - 1]
+        return _entries(input_dim, filter_dim,
+                        np.arange(1, self.max_stride + 1)[None, :],
+                        np.arange(0, self.max_padding + 1)[:, None])
+
+    def valid_strides(self, input_dim, filter_dim, padding):
+        """All strides in the domain that are valid for input, filter and padding."""
+        if not 0 <= padding <= self.max_padding:
+            row = _entries(input_dim, filter_dim,
+                           np.arange(1, self.max_stride + 1), padding)
+        else:
+            row = self._block(input_dim, filter_dim)[padding]
+        return np.flatnonzero(row) + 1
+
+    def valid_paddings(self, input_dim, filter_dim, stride):
+        """All paddings in the domain that are valid for input, filter and stride."""
+        if not 1 <= stride <= self.max_stride:
+            column = _entries(input_dim, filter_dim, stride,
+                              np.arange(0, self.max_padding + 1))
+        else:
+            column = self._block(input_dim, filter_dim)[:, stride - 1]
+        return np.flatnonzero(column)
+
+    def valid_configs(self, input_dim, filter_dim):
+        """
+        All valid (stride, padding) pairs in the domain for input and filter.
+
+        Returns:
+            (strides, paddings, outputs) arrays of equal length
+        """
+        block = self._block(input_dim, filter_dim)
+        paddings, strides = np.nonzero(block)
+        return strides + 1, paddings, block[paddings, strides]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Build or query the precomputed configuration index."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="precompute the table")
+    build.add_argument("--path", default=DEFAULT_PATH)
+    build.add_argument("--max-input", type=int, default=DEFAULT_MAX_INPUT)
+    build.add_argument("--max-filter", type=int, default=DEFAULT_MAX_FILTER)
+    build.add_argument("--max-stride", type=int, default=DEFAULT_MAX_STRIDE)
+    build.add_argument("--max-padding", type=int, default=DEFAULT_MAX_PADDING)
+
+    query = commands.add_parser("query", help="list valid strides/paddings")
+    query.add_argument("input", type=int)
+    query.add_argument("filter", type=int)
+    query.add_argument("--padding", type=int)
+    query.add_argument("--stride", type=int)
+    query.add_argument("--path", default=DEFAULT_PATH)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        nbytes = build_index(args.path, args.max_input, args.max_filter,
+                             args.max_stride, args.max_padding)
+        print(f"Wrote {args.path} ({nbytes / 2**20:.1f} MiB)")
+        return
+
+    if not os.path.exists(args.path):
+        parser.error(f"{args.path} not found; run 'build' first")
+    index = ConfigIndex(args.path)
+
+    print("\n" + "="*60)
+    print(f"VALID CONFIGURATIONS: input {args.input}, filter {args.filter}")
+    print("="*60)
+    if args.stride is not None and args.padding is not None:
+        output = index.output(args.input, args.filter, args.stride, args.padding)
+        print(f"\n  Stride {args.stride}, padding {args.padding}: "
+              + (f"✓ output {output}" if output else "✗ invalid"))
+    elif args.padding is not None:
+        strides = index.valid_strides(args.input, args.filter, args.padding)
+        print(f"\n  Padding {args.padding}, valid strides: "
+              + (", ".join(map(str, strides)) or "none"))
+    elif args.stride is not None:
+        paddings = index.valid_paddings(args.input, args.filter, args.stride)
+        print(f"\n  Stride {args.stride}, valid paddings: "
+              + (", ".join(map(str, paddings)) or "none"))
+    else:
+        print(f"\n  {'Stride':>8}{'Padding':>10}{'Output':>10}")
+        for stride, padding, output in zip(*index.valid_configs(args.input,
+                                                                 args.filter)):
+            print(f"  {stride:>8}{padding:>10}{output:>10}")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    main()
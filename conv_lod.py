@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Level-of-Detail Planning for Sliding-Window Visualizations
+
+Decides what to draw for a viewport onto the padded input plane, so the
+cost of one frame stays bounded however large the input is:
+
+  - If few enough filter windows intersect the viewport, their rectangles
+    are listed individually.
+  - Otherwise the viewport is split into a bounded grid of cells, and each
+    cell gets the average number of windows covering it (a density heatmap).
+
+Coordinates are in input pixels on the padded plane, with (0, 0) at the
+top-left corner of the padding. Window (i, j) covers rows
+[i × Stride, i × Stride + FilterH) and columns [j × Stride, j × Stride + FilterW).
+
+Window coverage is separable, so every per-cell value is the product of a
+row average and a column average, and each average is computed in closed
+form in O(Filter / Stride) steps.
+"""
+
+import math
+
+
+# Draw windows individually only up to this many
+MAX_WINDOWS = 400
+
+# Largest heatmap grid along either axis
+MAX_BINS = 40
+
+# Smallest heatmap cell on screen
+MIN_CELL_PIXELS = 12
+
+
+def window_count(padded_dim, filter_dim, stride):
+    """Number of filter positions along one axis of the padded plane."""
+    if padded_dim < filter_dim:
+        return 0
+    return (padded_dim - filter_dim) // stride + 1
+
+
+def windows_overlapping(lo, hi, count, filter_dim, stride):
+    """
+    Range of window indices along one axis that intersect [lo, hi).
+
+    Args:
+        lo, hi: Interval on the padded plane (may be fractional)
+        count: Number of windows along the axis
+        filter_dim: Filter size along the axis
+        stride: Stride value
+    """
+    # i * stride + filter_dim > lo  and  i * stride < hi
+    first = max(0, math.floor((lo - filter_dim) / stride) + 1)
+    last = min(count - 1, math.ceil(hi / stride) - 1)
+    return range(first, last + 1)
+
+
+def _coverage_integral(x, count, filter_dim, stride):
+    """Integral of the window coverage along one axis from 0 to x."""
+    if count == 0 or x <= 0:
+        return 0.0
+
+    # Windows ending at or before x contribute their full length
+    full = min(count, max(0, math.floor((x - filter_dim) / stride) + 1))
+    total = full * filter_dim
+
+    # At most ceil(filter / stride) windows straddle x
+    for i in range(full, count):
+        start = i * stride
+        if start >= x:
+            break
+        total += min(x - start, filter_dim)
+
+    return float(total)
+
+
+def average_coverage(lo, hi, count, filter_dim, stride):
+    """Average number of windows covering a point of [lo, hi) along one axis."""
+    if hi <= lo:
+        return 0.0
+    return (_coverage_integral(hi, count, filter_dim, stride)
+            - _coverage_integral(lo, count, filter_dim, stride)) / (hi - lo)
+
+
+def max_coverage(filter_dim, stride):
+    """Largest number of windows covering one point along an axis."""
+    return math.ceil(filter_dim / stride)
+
+
+def plan_frame(input_h, input_w, filter_h, filter_w, stride, padding,
+               viewport, pixel_size, max_windows=MAX_WINDOWS,
+               max_bins=MAX_BINS):
+    """
+    Decide what to draw for one frame.
+
+    Args:
+        input_h, input_w, filter_h, filter_w, stride, padding:
+            Convolution parameters
+        viewport: (x0, y0, x1, y1) visible region of the padded plane
+        pixel_size: (width, height) of the view in screen pixels, used to
+            size the heatmap grid
+        max_windows: Largest number of windows drawn individually
+        max_bins: Largest heatmap grid size along either axis
+
+    Returns:
+        Dictionary with:
+          "mode":    "windows" or "heatmap"
+          "total":   number of windows on the whole plane
+          "visible": number of windows intersecting the viewport
+          "windows": list of (x0, y0, x1, y1) rectangles ("windows" mode)
+          "cells":   list of (x0, y0, x1, y1, density) with density in
+                     [0, 1] ("heatmap" mode)
+    """
+    padded_h = input_h + 2 * padding
+    padded_w = input_w + 2 * padding
+    count_h = window_count(padded_h, filter_h, stride)
+    count_w = window_count(padded_w, filter_w, stride)
+
+    # Clip the viewport to the plane
+    x0, y0, x1, y1 = viewport
+    x0, x1 = max(0, x0), min(padded_w, x1)
+    y0, y1 = max(0, y0), min(padded_h, y1)
+
+    rows = windows_overlapping(y0, y1, count_h, filter_h, stride)
+    cols = windows_overlapping(x0, x1, count_w, filter_w, stride)
+    if x1 <= x0 or y1 <= y0:
+        rows = cols = range(0)
+
+    plan = {
+        "mode": "windows",
+        "total": count_h * count_w,
+        "visible": len(rows) * len(cols),
+        "windows": [],
+        "cells": [],
+    }
+
+    if plan["visible"] <= max_windows:
+        plan["windows"] = [
+            (j * stride, i * stride, j * stride + filter_w, i * stride + filter_h)
+            for i in rows for j in cols
+        ]
+        return plan
+
+    plan["mode"] = "heatmap"
+
+    # At most one bin per input pixel, MIN_CELL_PIXELS on screen and
+    # max_bins per axis
+    width, height = pixel_size
+    bins_x = max(1, min(max_bins, math.ceil(x1 - x0),
+                        int(width) // MIN_CELL_PIXELS))
+    bins_y = max(1, min(max_bins, math.ceil(y1 - y0),
+                        int(height) // MIN_CELL_PIXELS))
+    edges_x = [x0 + (x1 - x0) * k / bins_x for k in range(bins_x + 1)]
+    edges_y = [y0 + (y1 - y0) * k / bins_y for k in range(bins_y + 1)]
+
+    peak = max_coverage(filter_h, stride) * max_coverage(filter_w, stride)
+    col_density = [
+        average_coverage(a, b, count_w, filter_w, stride)
+        for a, b in zip(edges_x, edges_x[1:])
+    ]
+    row_density = [
+        average_coverage(a, b, count_h, filter_h, stride)
+        for a, b in zip(edges_y, edges_y[1:])
+    ]
+
+    plan["cells"] = [
+        (edges_x[c], edges_y[r], edges_x[c + 1], edges_y[r + 1],
+         min(1.0, row_density[r] * col_density[c] / peak))
+        for r in range(bins_y) for c in range(bins_x)
+    ]
+    return plan
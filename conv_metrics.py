@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Opt-in Instrumentation of the Calculator Hot Paths
+
+Counts calls and records latency histograms for the calculation, rendering
+and GUI update paths, and reports the hit rates of the shape and receptive
+field caches. Metrics export as JSON or in the Prometheus text format.
+
+Instrumentation is off by default, and then nothing is wrapped: the hot
+paths are the original functions, so disabled metrics cost nothing at all.
+enable() swaps in timing wrappers, both in the defining module and in
+the other calculator modules (conv_*) that imported a function by name
+(e.g. conv_stream's calculate_output_dimension), and on ConvCalculatorGUI
+for its methods if the GUI module is loaded. disable() puts the originals
+back everywhere. Other modules, including __main__, are left alone: a
+reference to an original function held outside the calculator modules is
+not counted.
+
+Usage:
+    import conv_metrics
+    conv_metrics.enable()
+    ...                                   # run the tooling
+    print(conv_metrics.export_prometheus())
+
+    python3 conv_metrics.py [--format prometheus] conv_examples:main [args]
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Instrumented functions as (module, attribute path); methods are patched
+# on their class
+INSTRUMENTED = [
+    ("conv_output_calculator", "calculate_output_dimension"),
+    ("conv_output_calculator", "visualize_calculation"),
+    ("conv_report", "render_report"),
+    ("conv_calculator_gui", "ConvCalculatorGUI.update_calculation"),
+    ("conv_calculator_gui", "ConvCalculatorGUI.draw_visualization"),
+]
+
+# Instrumented only when already imported, so that enabling metrics in a
+# headless run never pulls in tkinter
+LOADED_ONLY_MODULES = ["conv_calculator_gui"]
+
+# lru_cache-decorated functions whose hit rates are reported
+CACHES = [
+    ("conv_network", "propagate_layer"),
+    ("conv_receptive", "receptive_field_step"),
+]
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0,
+)
+
+EXPORT_FORMATS = ["json", "prometheus"]
+
+
+class _Stats:
+    """Call count, error count and latency histogram of one function."""
+
+    __slots__ = ("calls", "errors", "seconds", "counts")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        # counts[i] is the number of calls in bucket i (the last is +Inf)
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+
+
+# Per function name: _Stats
+_stats = {}
+# Per function name: (owner, attribute, original, wrapper)
+_patches = {}
+# Per cache name: (hits, misses) when metrics were last enabled or reset
+_cache_baseline = {}
+
+
+def _wrap(name, func):
+    stats = _stats.setdefault(name, _Stats())
+    clock = time.perf_counter
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        except BaseException:
+            stats.errors += 1
+            raise
+        finally:
+            elapsed = clock() - start
+            stats.calls += 1
+            stats.seconds += elapsed
+            stats.counts[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+    return wrapper
+
+
+def _calculator_modules():
+    """Yield the loaded conv_* modules installed alongside this one."""
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if (name.startswith("conv_") and path
+                and os.path.dirname(os.path.abspath(path)) == _MODULE_DIR):
+            yield module
+
+
+def _rebind(old, new):
+    """Replace old with new where a calculator module imported it by name."""
+    for module in _calculator_modules():
+        namespace = module.__dict__
+        for key, value in list(namespace.items()):
+            if value is old:
+                namespace[key] = new
+
+
+def _cache_functions():
+    """Yield (name, function) for the caches of loaded modules."""
+    for module_name, attribute in CACHES:
+        module = sys.modules.get(module_name)
+        func = getattr(module, attribute, None)
+        if func is not None and hasattr(func, "cache_info"):
+            yield attribute, func
+
+
+def is_enabled():
+    """Whether instrumentation is on."""
+    return bool(_patches)
+
+
+def enable():
+    """
+    Turn instrumentation on.
+
+    Modules of INSTRUMENTED are imported if needed, except those in
+    LOADED_ONLY_MODULES: the GUI methods are only instrumented if
+    conv_calculator_gui was imported before enable().
+    """
+    if _patches:
+        return
+
+    for module_name, path in INSTRUMENTED:
+        if module_name in LOADED_ONLY_MODULES:
+            owner = sys.modules.get(module_name)
+            if owner is None:
+                continue
+        else:
+            owner = importlib.import_module(module_name)
+        *parents, attribute = path.split(".")
+        for parent in parents:
+            owner = getattr(owner, parent)
+
+        original = getattr(owner, attribute)
+        wrapper = _wrap(path, original)
+        if isinstance(owner, type):
+            setattr(owner, attribute, wrapper)
+        else:
+            _rebind(original, wrapper)
+        _patches[path] = (owner, attribute, original, wrapper)
+
+    _snapshot_caches()
+
+
+def disable():
+    """Turn instrumentation off, restoring the original functions."""
+    for owner, attribute, original, wrapper in _patches.values():
+        if isinstance(owner, type):
+            setattr(owner, attribute, original)
+        else:
+            # Also catches modules that imported the wrapper after enable()
+            _rebind(wrapper, original)
+    _patches.clear()
+
+
+@contextmanager
+def instrumented():
+    """Context manager that enables instrumentation for its body."""
+    was_enabled = is_enabled()
+    enable()
+    try:
+        yield
+    finally:
+        if not was_enabled:
+            disable()
+
+
+def _snapshot_caches():
+    for name, func in _cache_functions():
+        info = func.cache_info()
+        _cache_baseline[name] = (info.hits, info.misses)
+
+
+def reset():
+    """Clear all recorded metrics."""
+    for stats in _stats.values():
+        stats.__init__()
+    _snapshot_caches()
+
+
+def _bound_label(bound):
+    return bound if isinstance(bound, str) else repr(bound)
+
+
+def snapshot():
+    """
+    Collect the current metrics.
+
+    Returns:
+        Dictionary with
+          "functions": per function, "calls", "errors", "seconds" (total)
+              and "buckets", mapping each upper bound (as a string, up to
+              "+Inf") to the cumulative count of calls
+          "caches": per cache, "hits", "misses", "hit_rate" (None before
+              the first lookup) and "size", counted since enable() or
+              reset()
+    """
+    functions = {}
+    for name, stats in _stats.items():
+        buckets = {}
+        total = 0
+        for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), stats.counts):
+            total += count
+            buckets[_bound_label(bound)] = total
+        functions[name] = {
+            "calls": stats.calls,
+            "errors": stats.errors,
+            "seconds": stats.seconds,
+            "buckets": buckets,
+        }
+
+    caches = {}
+    for name, func in _cache_functions():
+        info = func.cache_info()
+        base_hits, base_misses = _cache_baseline.get(name, (0, 0))
+        # A cache_clear() since the baseline restarts the counters
+        if info.hits < base_hits or info.misses < base_misses:
+            base_hits = base_misses = 0
+        hits = info.hits - base_hits
+        misses = info.misses - base_misses
+        caches[name] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+            "size": info.currsize,
+        }
+
+    return {"functions": functions, "caches": caches}
+
+
+def export_json(indent=2):
+    """Export the metrics as a JSON document."""
+    return json.dumps(snapshot(), indent=indent) + "\n"
+
+
+def export_prometheus():
+    """Export the metrics in the Prometheus text exposition format."""
+    data = snapshot()
+    lines = []
+    add = lines.append
+
+    add("# HELP conv_calls_total Calls of instrumented functions.")
+    add("# TYPE conv_calls_total counter")
+    for name, m in data["functions"].items():
+        add(f'conv_calls_total{{function="{name}"}} {m["calls"]}')
+
+    add("# HELP conv_call_errors_total Calls that raised an exception.")
+    add("# TYPE conv_call_errors_total counter")
+    for name, m in data["functions"].items():
+        add(f'conv_call_errors_total{{function="{name}"}} {m["errors"]}')
+
+    add("# HELP conv_call_duration_seconds Latency of instrumented functions.")
+    add("# TYPE conv_call_duration_seconds histogram")
+    for name, m in data["functions"].items():
+        for bound, count in m["buckets"].items():
+            add(f'conv_call_duration_seconds_bucket{{function="{name}",'
+                f'le="{bound}"}} {count}')
+        add(f'conv_call_duration_seconds_sum{{function="{name}"}} '
+            f'{m["seconds"]!r}')
+        add(f'conv_call_duration_seconds_count{{function="{name}"}} '
+            f'{m["calls"]}')
+
+    add("# HELP conv_cache_hits_total Cache lookups answered from the cache.")
+    add("# TYPE conv_cache_hits_total counter")
+    for name, c in data["caches"].items():
+        add(f'conv_cache_hits_total{{cache="{name}"}} {c["hits"]}')
+
+    add("# HELP conv_cache_misses_total Cache lookups that were computed.")
+    add("# TYPE conv_cache_misses_total counter")
+    for name, c in data["caches"].items():
+        add(f'conv_cache_misses_total{{cache="{name}"}} {c["misses"]}')
+
+    add("# HELP conv_cache_hit_ratio Share of cache lookups that hit.")
+    add("# TYPE conv_cache_hit_ratio gauge")
+    for name, c in data["caches"].items():
+        rate = c["hit_rate"]
+        add(f'conv_cache_hit_ratio{{cache="{name}"}} '
+            f'{"NaN" if rate is None else repr(rate)}')
+
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(format="json", out=None):
+    """
+    Write the metrics to a stream.
+
+    Args:
+        format: One of EXPORT_FORMATS
+        out: Text stream (defaults to stdout)
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"unknown metrics format: {format}")
+    if out is None:
+        out = sys.stdout
+    out.write(export_json() if format == "json" else export_prometheus())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run a calculator entry point with instrumentation on "
+                    "and print its metrics."
+    )
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="json")
+    parser.add_argument("--out", help="metrics file (default: stderr)")
+    parser.add_argument("entry_point",
+                        help="module:function to run, e.g. conv_examples:main")
+    parser.add_argument("args", nargs=argparse.REMAINDER,
+                        help="arguments passed on to the entry point")
+    args = parser.parse_args(argv)
+
+    module_name, _, function = args.entry_point.partition(":")
+    entry = getattr(importlib.import_module(module_name), function or "main")
+
+    enable()
+    sys.argv = [args.entry_point] + args.args
+    try:
+        # Passed on as the exit status, e.g. conv_benchmark's 1 on a
+        # regression
+        return entry()
+    finally:
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                write_metrics(args.format, f)
+        else:
+            write_metrics(args.format, sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+"""
+Model Description Importer
+
+Reads a model topology from a JSON or YAML file, calculates the shape after
+every layer and reports the first invalid one. A model is an input shape
+and a list of layers; a layer entry with "branches" runs several layer
+lists on the same input and merges their outputs:
+
+    input: [3, 225, 225]                # channels, height, width
+    layers:
+      - {type: conv, filter: 7, stride: 2, padding: 3, out_channels: 64}
+      - {type: pool, filter: 3, stride: 2, padding: 1, name: pool1}
+      - name: block1
+        merge: add                      # or concat (channels add up)
+        branches:
+          - - {type: conv, filter: 3, padding: 1, out_channels: 64}
+            - {type: relu}
+            - {type: conv, filter: 3, padding: 1, out_channels: 64}
+          - []                          # identity shortcut
+
+Layer keys are those of conv_network.Layer: type (conv, pool, or one of
+SHAPE_PRESERVING_KINDS such as relu), filter (or [height, width]), stride,
+padding, dilation and out_channels, plus an optional name. Any other type
+is an error, so a misspelt layer can't pass the check with the wrong shape.
+
+Runs of layers are propagated in one vectorized pass instead of one
+calculate_output_dimension call per layer. Along one axis a layer maps
+X to (X + C) / S with C = 2 × Padding - Filter + Stride, so after layers
+1..k the size is N_k / S_k, where S_k is the product of the strides and
+
+    N_k = X_0 + Σ C_j × S_(j-1)
+
+is a cumulative sum. Layer k is valid when the layers before it are and
+N_k is a positive multiple of S_k.
+
+import_model caches results under the SHA-256 of the file contents, so
+re-checking an unchanged file (e.g. in CI) skips parsing altogether.
+
+Usage:
+    python3 conv_model.py model.yaml [--quiet] [--no-cache]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from conv_network import Layer, _format_shape
+from conv_output_calculator import output_size
+
+
+DEFAULT_CACHE_DIR = ".conv_model_cache"
+
+# Bump when the result of importing a file changes, to ignore old caches
+CACHE_VERSION = 2
+
+MERGE_KINDS = ["concat", "add"]
+
+# Layer types that keep the shape of their input
+SHAPE_PRESERVING_KINDS = [
+    "relu", "leaky_relu", "prelu", "elu", "gelu", "silu", "sigmoid", "tanh",
+    "softmax", "bn", "batchnorm", "layernorm", "groupnorm", "dropout",
+    "identity",
+]
+
+# Stride products (and cumulative sums) in one chunk stay well inside int64
+_MAX_STRIDE_PRODUCT = 2.0**30
+_MAX_CUMULATIVE = 2.0**60
+_MAX_CHUNK = 4096
+
+
+Branch = namedtuple("Branch", ["name", "merge", "paths"])
+Branch.__doc__ = """
+Parallel layer lists applied to the same input.
+
+Fields:
+    name: Name of the merge entry in the results
+    merge: "concat" (channels add up) or "add" (shapes must match)
+    paths: Tuple of node lists; an empty list is an identity shortcut
+"""
+
+Model = namedtuple("Model", ["input_shape", "nodes"])
+Model.__doc__ = """
+A parsed model description.
+
+Fields:
+    input_shape: (channels, height, width) tuple
+    nodes: List of (name, Layer) pairs and Branches
+"""
+
+ModelShapes = namedtuple(
+    "ModelShapes",
+    ["input_shape", "names", "layers", "shapes", "first_invalid", "reason"],
+)
+ModelShapes.__doc__ = """
+The shape after every layer of a model.
+
+Fields:
+    input_shape: (channels, height, width) tuple
+    names: Layer names, in file order; branch merges are included as
+        Layer(kind="concat" or "add") entries named after the branch
+    layers: Layer of each entry
+    shapes: Output shape of each entry, None from an invalid layer onward
+    first_invalid: Index of the first invalid entry, or None
+    reason: Why that entry is invalid, or None
+"""
+
+
+# Parsing
+
+def _pair(value, key, where):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value, value
+    if (isinstance(value, (list, tuple)) and len(value) == 2
+            and all(isinstance(v, int) and not isinstance(v, bool)
+                    for v in value)):
+        return tuple(value)
+    raise ValueError(f"{where}: {key} must be an integer or [height, width]")
+
+
+def _int(entry, key, default, where, minimum):
+    value = entry.get(key, default)
+    if (value is not None and (not isinstance(value, int)
+                               or isinstance(value, bool) or value < minimum)):
+        raise ValueError(f"{where}: {key} must be an integer >= {minimum}")
+    return value
+
+
+def _parse_layer(entry, where):
+    kind = entry.get("type", entry.get("kind"))
+    if not isinstance(kind, str):
+        raise ValueError(f"{where}: layer needs a type")
+
+    if kind in SHAPE_PRESERVING_KINDS:
+        return Layer(kind, 1, 1)
+    if kind not in ("conv", "pool"):
+        raise ValueError(f"{where}: unknown layer type {kind!r} (expected "
+                         f"conv, pool or one of {SHAPE_PRESERVING_KINDS})")
+
+    if "filter" not in entry:
+        raise ValueError(f"{where}: {kind} layer needs a filter size")
+    filter_h, filter_w = _pair(entry["filter"], "filter", where)
+    if filter_h < 1 or filter_w < 1:
+        raise ValueError(f"{where}: filter must be at least 1")
+
+    # Pooling strides default to the window size, as in pool_layer
+    stride = _int(entry, "stride", 1 if kind == "conv" else filter_h, where, 1)
+    padding = _int(entry, "padding", 0, where, 0)
+    dilation = _int(entry, "dilation", 1, where, 1)
+    out_channels = None
+    if kind == "conv":
+        out_channels = _int(entry, "out_channels", None, where, 1)
+
+    return Layer(kind, filter_h, filter_w, stride, padding, out_channels,
+                 dilation)
+
+
+def _parse_nodes(entries, prefix):
+    if not isinstance(entries, list):
+        raise ValueError(f"{prefix or 'layers'}: expected a list of layers")
+
+    nodes = []
+    for i, entry in enumerate(entries):
+        where = f"{prefix}{i}"
+        if not isinstance(entry, dict):
+            raise ValueError(f"{where}: expected a mapping")
+        name = str(entry.get("name", where))
+
+        if "branches" in entry:
+            merge = entry.get("merge", "concat")
+            if merge not in MERGE_KINDS:
+                raise ValueError(f"{where}: merge must be one of {MERGE_KINDS}")
+            paths = entry["branches"]
+            if not isinstance(paths, list) or not paths:
+                raise ValueError(f"{where}: branches must be a list of "
+                                 "layer lists")
+            nodes.append(Branch(name, merge, tuple(
+                _parse_nodes(path, f"{name}.{j}.")
+                for j, path in enumerate(paths)
+            )))
+        else:
+            nodes.append((name, _parse_layer(entry, where)))
+    return nodes
+
+
+def _load_document(data, path):
+    """Decode JSON or YAML (chosen by file extension) from bytes."""
+    text = data.decode("utf-8")
+    if path.endswith(".json"):
+        return json.loads(text)
+
+    try:
+        import yaml
+    except ImportError:
+        if path.endswith((".yaml", ".yml")):
+            raise ImportError("YAML models need PyYAML (pip install pyyaml); "
+                              "JSON models need nothing extra")
+        return json.loads(text)
+    # The C loader is much faster on large files where available
+    try:
+        return yaml.load(text,
+                         Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+    except yaml.YAMLError as e:
+        raise ValueError(f"invalid YAML: {e}")
+
+
+def parse_model(document):
+    """
+    Build a Model from a decoded description (see the module docstring).
+
+    Raises:
+        ValueError: If the description is malformed
+    """
+    if not isinstance(document, dict):
+        raise ValueError("model description must be a mapping")
+    shape = document.get("input")
+    if (not isinstance(shape, list) or len(shape) != 3
+            or not all(isinstance(d, int) and d > 0 for d in shape)):
+        raise ValueError("input must be [channels, height, width]")
+    return Model(tuple(shape), _parse_nodes(document.get("layers"), ""))
+
+
+def load_model(path):
+    """Read and parse a JSON or YAML model description."""
+    with open(path, "rb") as f:
+        return parse_model(_load_document(f.read(), str(path)))
+
+
+# Shape propagation
+
+def _axis_chain(size, filter_dim, stride, padding, dilation):
+    """
+    Propagate one axis through a chain of layers (see the module docstring).
+
+    Returns:
+        (sizes, valid) arrays; entries after the first invalid layer are
+        meaningless
+    """
+    count = len(stride)
+    sizes = np.zeros(count, dtype=np.int64)
+    valid = np.zeros(count, dtype=bool)
+    change = 2 * padding - (dilation * (filter_dim - 1) + 1) + stride
+
+    start = 0
+    while start < count:
+        stop = min(start + _MAX_CHUNK, count)
+        # Estimate the chunk in floating point first, and cut it where the
+        # exact integers could overflow
+        scale = np.cumprod(stride[start:stop], dtype=np.float64)
+        bound = size + np.cumsum(np.abs(change[start:stop])
+                                 * (scale / stride[start:stop]))
+        fits = (scale <= _MAX_STRIDE_PRODUCT) & (bound <= _MAX_CUMULATIVE)
+        stop = start + max(int(np.argmin(fits)) if not fits.all()
+                           else stop - start, 1)
+
+        s = stride[start:stop]
+        scale = np.cumprod(s)
+        total = size + np.cumsum(change[start:stop] * (scale // s))
+        quotient, remainder = np.divmod(total, scale)
+
+        sizes[start:stop] = quotient
+        valid[start:stop] = np.logical_and.accumulate(
+            (remainder == 0) & (total > 0)
+        )
+        if not valid[stop - 1]:
+            break
+        size = int(quotient[-1])
+        start = stop
+
+    return sizes, valid
+
+
+def chain_shapes(input_shape, layers):
+    """
+    Calculate the output shape of every layer of a sequential stack.
+
+    Vectorized counterpart of conv_network.propagate_shapes(...)[1:].
+
+    Returns:
+        List of (channels, height, width) tuples, None from the first
+        invalid layer onward
+    """
+    if not layers or input_shape is None:
+        return [None] * len(layers)
+
+    channels, input_h, input_w = input_shape
+    columns = np.array(
+        [(l.filter_h, l.filter_w, l.stride, l.padding, l.dilation,
+          -1 if l.out_channels is None or l.kind != "conv" else l.out_channels)
+         for l in layers],
+        dtype=np.int64,
+    ).T
+    filter_h, filter_w, stride, padding, dilation, out_channels = columns
+
+    sizes_h, valid_h = _axis_chain(input_h, filter_h, stride, padding, dilation)
+    sizes_w, valid_w = _axis_chain(input_w, filter_w, stride, padding, dilation)
+    valid_count = int(np.count_nonzero(valid_h & valid_w))
+
+    # Each layer has the channels of the last conv setting them
+    position = np.where(out_channels >= 0, np.arange(len(layers)), -1)
+    position = np.maximum.accumulate(position)
+    channel_counts = np.where(position >= 0, out_channels[position], channels)
+
+    shapes = list(zip(channel_counts[:valid_count].tolist(),
+                      sizes_h[:valid_count].tolist(),
+                      sizes_w[:valid_count].tolist()))
+    return shapes + [None] * (len(layers) - valid_count)
+
+
+def _layer_reason(layer, input_shape):
+    """Describe why a layer is invalid for an input shape."""
+    _, input_h, input_w = input_shape
+    for axis, size, filter_dim in (("height", input_h, layer.filter_h),
+                                   ("width", input_w, layer.filter_w)):
+        output, remainder = output_size(size, filter_dim, layer.stride,
+                                        layer.padding, layer.dilation)
+        formula = (f"({size} - {filter_dim} + 2 × {layer.padding})"
+                   f" / {layer.stride} + 1")
+        if layer.dilation != 1:
+            formula += f" (dilation {layer.dilation})"
+        if output <= 0:
+            return f"output {axis} {formula} is not positive"
+        if remainder:
+            return (f"output {axis} {formula} = "
+                    f"{output - 1 + remainder / layer.stride:g}"
+                    f" is not an integer")
+    return None
+
+
+def _merge_shape(merge, shapes):
+    """Merge branch output shapes, or return (None, reason)."""
+    first = shapes[0]
+    if any(shape[1:] != first[1:] for shape in shapes):
+        return None, ("branch outputs differ in height × width: "
+                      + ", ".join(_format_shape(s) for s in shapes))
+    if merge == "add":
+        if any(shape != first for shape in shapes):
+            return None, ("added branch outputs differ in channels: "
+                          + ", ".join(_format_shape(s) for s in shapes))
+        return first, None
+    return (sum(shape[0] for shape in shapes),) + first[1:], None
+
+
+def _propagate(nodes, shape, entries, failures):
+    """Append (name, layer, shape) entries for nodes; return the last shape."""
+    run = []
+
+    def flush(shape):
+        if not run:
+            return shape
+        layers = [layer for _, layer in run]
+        shapes = chain_shapes(shape, layers)
+        if shape is not None and shapes[-1] is None:
+            k = shapes.index(None)
+            before = shapes[k - 1] if k else shape
+            failures.append((len(entries) + k,
+                             _layer_reason(layers[k], before)))
+        entries.extend(zip((name for name, _ in run), layers, shapes))
+        del run[:]
+        return shapes[-1]
+
+    for node in nodes:
+        if not isinstance(node, Branch):
+            run.append(node)
+            continue
+
+        shape = flush(shape)
+        ends = [_propagate(path, shape, entries, failures)
+                for path in node.paths]
+        merged = None
+        if shape is not None and None not in ends:
+            merged, reason = _merge_shape(node.merge, ends)
+            if merged is None:
+                failures.append((len(entries), reason))
+        entries.append((node.name, Layer(node.merge, 1, 1), merged))
+        shape = merged
+
+    return flush(shape)
+
+
+def model_shapes(model):
+    """
+    Calculate the shape after every layer of a model.
+
+    Returns:
+        ModelShapes
+    """
+    entries = []
+    failures = []
+    _propagate(model.nodes, model.input_shape, entries, failures)
+
+    first_invalid, reason = min(failures) if failures else (None, None)
+    names, layers, shapes = (list(column) for column in zip(*entries)) \
+        if entries else ([], [], [])
+    return ModelShapes(model.input_shape, names, layers, shapes,
+                       first_invalid, reason)
+
+
+# Cached import
+
+def _cache_path(cache_dir, digest):
+    return os.path.join(cache_dir, f"{digest}.json")
+
+
+def _read_cache(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != CACHE_VERSION:
+        return None
+    return ModelShapes(
+        tuple(data["input_shape"]),
+        data["names"],
+        [Layer(*layer) for layer in data["layers"]],
+        [tuple(shape) if shape is not None else None
+         for shape in data["shapes"]],
+        data["first_invalid"],
+        data["reason"],
+    )
+
+
+def _write_cache(path, result):
+    data = dict(result._asdict(), version=CACHE_VERSION)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Write to a temporary file first so concurrent runs never read half
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temporary, path)
+
+
+def import_model(path, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Import a model description file and calculate its layer shapes.
+
+    Args:
+        path: JSON or YAML model description (.json, .yaml or .yml)
+        cache_dir: Directory of cached results, keyed by the SHA-256 of the
+            file contents; None disables caching
+
+    Returns:
+        ModelShapes
+
+    Raises:
+        ValueError: If the description is malformed
+        ImportError: For a YAML file when PyYAML is not installed
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    cache_file = None
+    if cache_dir is not None:
+        digest = hashlib.sha256(data).hexdigest()
+        cache_file = _cache_path(cache_dir, digest)
+        cached = _read_cache(cache_file)
+        if cached is not None:
+            return cached
+
+    result = model_shapes(parse_model(_load_document(data, str(path))))
+    if cache_file is not None:
+        _write_cache(cache_file, result)
+    return result
+
+
+def print_model(result, quiet=False):
+    """Print a table of the shapes through a model (only the verdict if quiet)."""
+    print("\n" + "="*60)
+    print("MODEL SHAPES")
+    print("="*60)
+
+    if not quiet:
+        print(f"\n  {'#':>5}  {'Layer':<30}{'Output (C × H × W)'}")
+        print("-"*60)
+        print(f"  {'':>5}  {'input':<30}{_format_shape(result.input_shape)}")
+        for i, (name, layer, shape) in enumerate(zip(result.names,
+                                                     result.layers,
+                                                     result.shapes)):
+            if layer.kind in ("conv", "pool"):
+                desc = (f"{layer.kind} {layer.filter_h}×{layer.filter_w}"
+                        f" s{layer.stride} p{layer.padding}")
+                if layer.dilation != 1:
+                    desc += f" d{layer.dilation}"
+            else:
+                desc = layer.kind
+            print(f"  {i:>5}  {name[:14] + ' ' + desc:<30}"
+                  f"{_format_shape(shape)}")
+        print("-"*60)
+
+    if result.first_invalid is None:
+        output = result.shapes[-1] if result.shapes else result.input_shape
+        print(f"\n✓ All {len(result.layers)} layers valid, output "
+              f"{_format_shape(output)}")
+    else:
+        print(f"\n✗ First invalid layer: #{result.first_invalid} "
+              f"({result.names[result.first_invalid]})")
+        print(f"  {result.reason}")
+    print("="*60 + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Check the layer shapes of a JSON or YAML model description."
+    )
+    parser.add_argument("model", help="model description file")
+    parser.add_argument("--quiet", action="store_true",
+                        help="print only the verdict, not every layer")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args(argv)
+
+    try:
+        result = import_model(args.model,
+                              None if args.no_cache else args.cache_dir)
+    except (OSError, ValueError, ImportError) as e:
+        parser.exit(2, f"{parser.prog}: error: {e}\n")
+
+    print_model(result, quiet=args.quiet)
+    # A non-zero exit status fails CI jobs on invalid models
+    sys.exit(0 if result.first_invalid is None else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+N-Dimensional Convolution and Pooling Shapes
+
+Output sizes of 1D (audio), 2D (image) and 3D (video) convolution and
+pooling layers. Every parameter is given per spatial axis: the last axis
+of each array runs over the spatial axes, and any leading axes index
+configurations, so
+
+    nd_calculate([[16000], [32000]], kernel=400, stride=160, padding=120)
+
+handles two 1D configurations, and
+
+    nd_calculate((16, 112, 112), kernel=(3, 7, 7), stride=(1, 2, 2),
+                 padding=(1, 3, 3))
+
+one 3D configuration. Scalars apply to every axis. All axes of all
+configurations are calculated in a single call of conv_batch.output_sizes,
+with the formula of calculate_output_dimension per axis:
+
+    Output = ((Input + 2 × Padding - Dilation × (Kernel - 1) - 1) / Stride) + 1
+
+Layer kinds:
+    conv:  a configuration is valid when every axis gives a positive
+           integer output
+    max:   max pooling; stride defaults to the kernel size and padding may
+           be at most half the (dilated) kernel, as in PyTorch
+    avg:   average pooling, likewise, without dilation
+
+With ceil_mode a partial last window is rounded up instead of making the
+configuration invalid.
+"""
+
+import numpy as np
+
+from conv_batch import _padding_arrays, output_sizes
+
+
+LAYER_KINDS = ["conv", "max", "avg"]
+
+AXIS_NAMES = {
+    1: ("length",),
+    2: ("height", "width"),
+    3: ("depth", "height", "width"),
+}
+
+
+def _axis_names(count):
+    return AXIS_NAMES.get(count, tuple(f"axis {i}" for i in range(count)))
+
+
+def nd_calculate(input_size, kernel, stride=None, padding=0, dilation=1,
+                 kind="conv", ceil_mode=False, padding_after=None):
+    """
+    Calculate output sizes for a batch of N-d conv or pooling layers.
+
+    Args:
+        input_size: Spatial input size, shape (..., N)
+        kernel: Kernel size per axis
+        stride: Stride per axis (default: 1 for conv, the kernel for pooling)
+        padding: Padding before (and after, unless padding_after is given)
+            per axis, or "same" / "valid"
+        dilation: Spacing between kernel elements per axis
+        kind: One of LAYER_KINDS
+        ceil_mode: Round a partial last window up, as in PyTorch pooling
+        padding_after: Separate padding after, for asymmetric padding
+
+    All numeric arguments are broadcast together; scalars and arrays with
+    a last axis of length 1 apply to every spatial axis.
+
+    Returns:
+        Dictionary of arrays with keys:
+          "output":    int64 output sizes, shape (..., N)
+          "remainder": remainder of each axis' division by the stride
+          "valid":     boolean mask, shape (...)
+          "features":  output positions over all axes (0 where invalid)
+
+    Raises:
+        ValueError: For an unknown kind, or average pooling with dilation
+    """
+    if kind not in LAYER_KINDS:
+        raise ValueError(f"unknown layer kind: {kind}")
+
+    input_size = np.atleast_1d(np.asarray(input_size, dtype=np.int64))
+    kernel = np.asarray(kernel, dtype=np.int64)
+    if stride is None:
+        stride = 1 if kind == "conv" else kernel
+    stride = np.asarray(stride, dtype=np.int64)
+    dilation = np.asarray(dilation, dtype=np.int64)
+    if kind == "avg" and np.any(dilation != 1):
+        raise ValueError("average pooling has no dilation")
+
+    # Broadcast everything to (..., N) once so the single output_sizes
+    # call below covers every axis of every configuration
+    arrays = [input_size, kernel, stride, dilation]
+    if not isinstance(padding, str):
+        arrays.append(np.asarray(padding, dtype=np.int64))
+    if padding_after is not None:
+        arrays.append(np.asarray(padding_after, dtype=np.int64))
+    arrays = np.broadcast_arrays(*arrays)
+    input_size, kernel, stride, dilation = arrays[:4]
+    if not isinstance(padding, str):
+        padding = arrays[4]
+    if padding_after is not None:
+        padding_after = arrays[-1]
+
+    output, remainder = output_sizes(input_size, kernel, stride, padding,
+                                     dilation, ceil_mode, padding_after)
+
+    axis_valid = output > 0
+    if not ceil_mode:
+        axis_valid &= remainder == 0
+    if kind != "conv":
+        before, after = _padding_arrays(padding, padding_after, input_size,
+                                        kernel, stride, dilation)
+        half = (dilation * (kernel - 1) + 1) // 2
+        axis_valid &= (before <= half) & (after <= half)
+
+    valid = np.all(axis_valid, axis=-1)
+    features = np.where(valid, np.prod(output, axis=-1), 0)
+
+    return {
+        "output": output,
+        "remainder": remainder,
+        "valid": valid,
+        "features": features,
+    }
+
+
+def nd_output_shape(input_size, kernel, stride=None, padding=0, dilation=1,
+                    kind="conv", ceil_mode=False):
+    """
+    Calculate the output size of a single N-d layer.
+
+    Returns:
+        Tuple of output sizes per axis, or None if the layer is invalid
+    """
+    result = nd_calculate(input_size, kernel, stride, padding, dilation,
+                          kind, ceil_mode)
+    if not result["valid"]:
+        return None
+    return tuple(result["output"].tolist())
+
+
+def print_nd_calculation(input_size, kernel, stride=None, padding=0,
+                         dilation=1, kind="conv", ceil_mode=False):
+    """Print the per-axis calculation for a single N-d layer."""
+    result = nd_calculate(input_size, kernel, stride, padding, dilation,
+                          kind, ceil_mode)
+    output = result["output"]
+    count = output.shape[-1]
+
+    def per_axis(value):
+        return np.broadcast_to(np.asarray(value), (count,)).tolist()
+
+    sizes = per_axis(input_size)
+    kernels = per_axis(kernel)
+    if stride is None:
+        stride = 1 if kind == "conv" else kernel
+    strides = per_axis(stride)
+    dilations = per_axis(dilation)
+    if isinstance(padding, str):
+        before, after = _padding_arrays(padding, None, np.asarray(sizes),
+                                        np.asarray(kernels),
+                                        np.asarray(strides),
+                                        np.asarray(dilations))
+        paddings = (np.asarray(before) + np.asarray(after)).tolist()
+        paddings = [f"{p} total" for p in per_axis(paddings)]
+    else:
+        paddings = [f"2 × {p}" for p in per_axis(padding)]
+
+    print("\n" + "="*60)
+    print(f"{count}D {kind.upper()} OUTPUT SIZE"
+          + (" (ceil mode)" if ceil_mode else ""))
+    print("="*60)
+
+    for name, size, k, s, p, d, out, rem in zip(
+            _axis_names(count), sizes, kernels, strides, paddings, dilations,
+            output.tolist(), result["remainder"].tolist()):
+        kernel_text = f"{d} × ({k} - 1) + 1" if d != 1 else f"{k}"
+        print(f"\n  {name.capitalize()}: (({size} + {p} - {kernel_text}) / {s}) + 1"
+              f" = {out}" + (f" (remainder {rem})" if rem else ""))
+
+    print("\n" + "-"*60)
+    if result["valid"]:
+        print(f"✓ Output size: {' × '.join(map(str, output.tolist()))}")
+    else:
+        print("✗ Invalid configuration!")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    # 1D audio: 25 ms windows with a 10 ms hop at 16 kHz
+    print_nd_calculation(16000, kernel=400, stride=160, padding=120)
+    # 3D video: a C3D-style conv and pooling that keeps the time axis
+    print_nd_calculation((16, 112, 112), kernel=3, padding=1)
+    print_nd_calculation((16, 112, 112), kernel=(1, 2, 2), kind="max")
+    print_nd_calculation((16, 56, 56), kernel=(1, 3, 3), stride=(1, 2, 2),
+                         padding=(0, 1, 1), kind="max", ceil_mode=True)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Whole-Network Shape Propagation
+
+Pushes an input shape (channels, height, width) through a stack of
+convolution and pooling layers using calculate_output_dimension, and
+reports the shape after every layer.
+
+Results are memoized per (layer, input shape), and each network keeps
+the shapes it has already propagated, so editing one layer of a deep
+stack only recomputes from that layer onward. Receptive fields (see
+conv_receptive) are cached the same way.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+from conv_output_calculator import output_size
+from conv_receptive import INPUT_FIELD, receptive_field_step
+
+
+Layer = namedtuple(
+    "Layer",
+    ["kind", "filter_h", "filter_w", "stride", "padding", "out_channels",
+     "dilation"],
+    defaults=(1, 0, None, 1),
+)
+Layer.__doc__ = """
+A single convolution or pooling layer.
+
+Fields:
+    kind: "conv" or "pool"
+    filter_h, filter_w: Filter/kernel size
+    stride: Stride value
+    padding: Padding, as for conv_output_calculator.resolve_padding (a
+        (before, after) pair must be a tuple, as layers are hashed)
+    out_channels: Output channels of a conv layer (None keeps the input
+        channels; pooling always keeps them)
+    dilation: Spacing between filter elements (1 for a dense filter)
+"""
+
+
+def conv_layer(filter_h, filter_w=None, stride=1, padding=0, out_channels=None,
+               dilation=1):
+    """Create a convolution layer (square filter if filter_w is omitted)."""
+    if filter_w is None:
+        filter_w = filter_h
+    return Layer("conv", filter_h, filter_w, stride, padding, out_channels,
+                 dilation)
+
+
+def pool_layer(filter_h, filter_w=None, stride=None, padding=0):
+    """Create a pooling layer (stride defaults to the filter size)."""
+    if filter_w is None:
+        filter_w = filter_h
+    if stride is None:
+        stride = filter_h
+    return Layer("pool", filter_h, filter_w, stride, padding)
+
+
+@lru_cache(maxsize=65536)
+def propagate_layer(layer, input_shape):
+    """
+    Calculate the output shape of a single layer.
+
+    Args:
+        layer: Layer to apply
+        input_shape: (channels, height, width) tuple
+
+    Returns:
+        (channels, height, width) tuple, or None if the layer gives
+        non-integer or non-positive output dimensions
+    """
+    channels, input_h, input_w = input_shape
+
+    output_h, remainder_h = output_size(
+        input_h, layer.filter_h, layer.stride, layer.padding, layer.dilation
+    )
+    output_w, remainder_w = output_size(
+        input_w, layer.filter_w, layer.stride, layer.padding, layer.dilation
+    )
+
+    if not (output_h > 0 and output_w > 0):
+        return None
+    if remainder_h or remainder_w:
+        return None
+
+    if layer.kind == "conv" and layer.out_channels is not None:
+        channels = layer.out_channels
+
+    return (channels, output_h, output_w)
+
+
+class ConvNetwork:
+    """
+    A sequential stack of layers applied to a fixed input shape.
+
+    Shapes and receptive fields are computed lazily and kept per layer
+    position. Changing layer k (or inserting/removing at k) discards only
+    the results from k onward; earlier ones are reused as-is.
+    """
+
+    def __init__(self, input_shape, layers=()):
+        self._input_shape = tuple(input_shape)
+        self._layers = list(layers)
+        # _shapes[i] is the output shape of layer i, valid for i < len(_shapes)
+        self._shapes = []
+        # _fields[i] is the receptive field after layer i, likewise
+        self._fields = []
+
+    @property
+    def input_shape(self):
+        return self._input_shape
+
+    @property
+    def layers(self):
+        return tuple(self._layers)
+
+    def __len__(self):
+        return len(self._layers)
+
+    def set_input_shape(self, input_shape):
+        """Change the network input shape."""
+        self._input_shape = tuple(input_shape)
+        del self._shapes[:]
+        # Receptive fields depend on the input shape only through "same"
+        # padding
+        for i, layer in enumerate(self._layers[:len(self._fields)]):
+            if layer.padding == "same":
+                del self._fields[i:]
+                break
+
+    def append(self, layer):
+        """Add a layer at the end of the stack."""
+        self._layers.append(layer)
+
+    def insert(self, index, layer):
+        """Insert a layer before position index."""
+        position = self._position(index)
+        self._layers.insert(index, layer)
+        self._invalidate(position)
+
+    def set_layer(self, index, layer):
+        """Replace the layer at position index."""
+        if self._layers[index] != layer:
+            position = self._position(index)
+            self._layers[index] = layer
+            self._invalidate(position)
+
+    def remove(self, index):
+        """Remove the layer at position index."""
+        position = self._position(index)
+        del self._layers[index]
+        self._invalidate(position)
+
+    def _position(self, index):
+        """
+        Resolve index against the layers before they change, clamped the
+        way list.insert clamps it.
+        """
+        if index < 0:
+            index += len(self._layers)
+        return min(max(index, 0), len(self._layers))
+
+    def _invalidate(self, position):
+        del self._shapes[position:]
+        del self._fields[position:]
+
+    def shapes(self):
+        """
+        Propagate the input shape through every layer.
+
+        Returns:
+            List of len(layers) + 1 shapes: the input shape followed by the
+            output shape of each layer. Once a layer is invalid, its shape
+            and every later shape is None.
+        """
+        shape = self._shapes[-1] if self._shapes else self._input_shape
+
+        for layer in self._layers[len(self._shapes):]:
+            if shape is not None:
+                shape = propagate_layer(layer, shape)
+            self._shapes.append(shape)
+
+        return [self._input_shape] + self._shapes
+
+    def output_shape(self):
+        """Return the shape after the last layer (None if invalid)."""
+        return self.shapes()[-1]
+
+    def receptive_fields(self):
+        """
+        Calculate the receptive field after every layer.
+
+        Returns:
+            List of len(layers) + 1 ReceptiveField tuples (see
+            conv_receptive), starting with a single input pixel
+        """
+        field = self._fields[-1] if self._fields else INPUT_FIELD
+        shapes = None
+
+        for i in range(len(self._fields), len(self._layers)):
+            layer = self._layers[i]
+            shape = None
+            if layer.padding == "same":
+                if shapes is None:
+                    shapes = self.shapes()
+                shape = shapes[i]
+            field = receptive_field_step(layer, field, shape)
+            self._fields.append(field)
+
+        return [INPUT_FIELD] + self._fields
+
+    def first_invalid_layer(self):
+        """Return the index of the first invalid layer, or None."""
+        for i, shape in enumerate(self.shapes()[1:]):
+            if shape is None:
+                return i
+        return None
+
+
+def propagate_shapes(input_shape, layers):
+    """
+    Calculate every intermediate shape for a stack of layers.
+
+    Convenience wrapper around ConvNetwork(input_shape, layers).shapes().
+    """
+    return ConvNetwork(input_shape, layers).shapes()
+
+
+def print_network(network):
+    """Print a table of the shapes through a network."""
+    shapes = network.shapes()
+
+    print("\n" + "="*60)
+    print("NETWORK SHAPE PROPAGATION")
+    print("="*60)
+    print(f"\n  {'#':>3}  {'Layer':<24}{'Output (C × H × W)'}")
+    print("-"*60)
+    print(f"  {'':>3}  {'input':<24}{_format_shape(shapes[0])}")
+
+    for i, (layer, shape) in enumerate(zip(network.layers, shapes[1:])):
+        desc = (f"{layer.kind} {layer.filter_h}×{layer.filter_w}"
+                f" s{layer.stride} p{layer.padding}")
+        if layer.dilation != 1:
+            desc += f" d{layer.dilation}"
+        print(f"  {i:>3}  {desc:<24}{_format_shape(shape)}")
+
+    print("="*60 + "\n")
+
+
+def _format_shape(shape):
+    if shape is None:
+        return "✗ invalid"
+    return " × ".join(str(d) for d in shape)
+
+
+if __name__ == "__main__":
+    vgg_like = ConvNetwork((3, 224, 224), [
+        conv_layer(3, padding=1, out_channels=64),
+        conv_layer(3, padding=1, out_channels=64),
+        pool_layer(2),
+        conv_layer(3, padding=1, out_channels=128),
+        conv_layer(3, padding=1, out_channels=128),
+        pool_layer(2),
+        conv_layer(3, padding=1, out_channels=256),
+        pool_layer(2),
+    ])
+    print_network(vgg_like)
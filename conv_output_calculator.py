@@ -7,9 +7,18 @@ a convolutional operation with specified parameters.
 
 Formula:
 Output = ((Input - Filter + 2 * Padding) / Stride) + 1
+
+The integer core (output_size, transposed_output_size) evaluates the same
+formula exactly with divmod, and also covers the options deep learning
+frameworks use: floor/ceil rounding, dilation, asymmetric padding,
+"same"/"valid" padding and transposed convolution.
 """
 
 import math
+import numbers
+import sys
+from collections import namedtuple
+from collections.abc import Sequence
 
 
 def calculate_output_dimension(input_dim, filter_dim, stride, padding):
@@ -23,71 +32,281 @@ def calculate_output_dimension(input_dim, filter_dim, stride, padding):
         padding: Padding value
 
     Returns:
-        Output dimension after convolution
+        Output dimension after convolution, as a float (fractional when the
+        stride doesn't divide evenly); output_size is the integer core
     """
-    output = ((input_dim - filter_dim + 2 * padding) / stride) + 1
-    return output
+    span = input_dim - filter_dim + 2 * padding
+    quotient, remainder = divmod(span, stride)
+    if remainder == 0:
+        # Rounded once, so exact results stay exact up to 2**53
+        return float(quotient + 1)
+    return (span / stride) + 1
+
 
+def effective_filter_size(filter_dim, dilation=1):
+    """Size covered by a filter with the given dilation."""
+    return dilation * (filter_dim - 1) + 1
 
-def visualize_calculation(input_h, input_w, filter_h, filter_w, stride, padding):
+
+def resolve_padding(padding, input_dim, filter_dim, stride=1, dilation=1):
     """
-    Calculate and display the output dimensions with detailed information.
+    Turn a padding specification into (before, after) amounts.
+
+    Args:
+        padding: An int (same on both sides), a (before, after) pair,
+            "valid" (no padding) or "same" (output = ceil(Input / Stride),
+            with any odd extra padding after, as in TensorFlow)
+        input_dim, filter_dim, stride, dilation: Layer parameters, used
+            for "same"
+
+    Returns:
+        (before, after) tuple of ints
+
+    Raises:
+        ValueError: For an unknown padding mode or a malformed pair
+    """
+    if isinstance(padding, str):
+        if padding == "valid":
+            return 0, 0
+        if padding == "same":
+            output = -(-input_dim // stride)
+            total = max(0, (output - 1) * stride
+                        + effective_filter_size(filter_dim, dilation)
+                        - input_dim)
+            return total // 2, total - total // 2
+        raise ValueError(f"unknown padding: {padding!r}")
+    if isinstance(padding, numbers.Integral):
+        return int(padding), int(padding)
+
+    try:
+        before, after = padding
+    except (TypeError, ValueError):
+        raise ValueError(
+            f"padding must be an int, a (before, after) pair, \"same\" or "
+            f"\"valid\", got {padding!r}"
+        ) from None
+    return before, after
+
+
+def output_size(input_dim, filter_dim, stride=1, padding=0, dilation=1,
+                ceil_mode=False):
     """
-    # Calculate output dimensions
-    output_h = calculate_output_dimension(input_h, filter_h, stride, padding)
-    output_w = calculate_output_dimension(input_w, filter_w, stride, padding)
+    Calculate an output dimension in exact integer arithmetic.
 
-    print("\n" + "="*60)
-    print("CONVOLUTION OUTPUT DIMENSION CALCULATOR")
-    print("="*60)
+    Args:
+        input_dim: Input dimension (height or width)
+        filter_dim: Filter/kernel dimension
+        stride: Stride value
+        padding: Padding, see resolve_padding
+        dilation: Spacing between filter elements
+        ceil_mode: Round a partial last window up instead of down (as in
+            PyTorch pooling); the last window must still start inside the
+            input or its leading padding
 
-    print("\nInput Parameters:")
-    print(f"  • Input Image Dimensions:  {input_h} × {input_w}")
-    print(f"  • Filter/Kernel Size:      {filter_h} × {filter_w}")
-    print(f"  • Stride:                  {stride}")
-    print(f"  • Padding:                 {padding}")
-
-    print("\n" + "-"*60)
-    print("Calculation Formula:")
-    print("  Output = ((Input - Filter + 2 × Padding) / Stride) + 1")
-
-    print("\n" + "-"*60)
-    print("Height Calculation:")
-    print(f"  Output Height = (({input_h} - {filter_h} + 2 × {padding}) / {stride}) + 1")
-    print(f"  Output Height = (({input_h} - {filter_h} + {2*padding}) / {stride}) + 1")
-    print(f"  Output Height = ({input_h - filter_h + 2*padding} / {stride}) + 1")
-    print(f"  Output Height = {(input_h - filter_h + 2*padding) / stride} + 1")
-    print(f"  Output Height = {output_h}")
-
-    print("\nWidth Calculation:")
-    print(f"  Output Width  = (({input_w} - {filter_w} + 2 × {padding}) / {stride}) + 1")
-    print(f"  Output Width  = (({input_w} - {filter_w} + {2*padding}) / {stride}) + 1")
-    print(f"  Output Width  = ({input_w - filter_w + 2*padding} / {stride}) + 1")
-    print(f"  Output Width  = {(input_w - filter_w + 2*padding) / stride} + 1")
-    print(f"  Output Width  = {output_w}")
+    Returns:
+        (output, remainder): the rounded output dimension and the remainder
+        of the division by the stride. The configuration is exact, in the
+        sense of visualize_calculation, when remainder == 0 and output > 0.
+    """
+    before, after = resolve_padding(padding, input_dim, filter_dim,
+                                    stride, dilation)
+    span = input_dim + before + after - effective_filter_size(filter_dim, dilation)
+    quotient, remainder = divmod(span, stride)
+    output = quotient + 1
 
-    print("\n" + "="*60)
-    print("RESULT:")
-    print("="*60)
+    if ceil_mode and remainder:
+        output += 1
+        if (output - 1) * stride >= input_dim + before:
+            output -= 1
 
-    # Check if output dimensions are valid (should be positive integers)
-    if output_h > 0 and output_w > 0:
-        if output_h == int(output_h) and output_w == int(output_w):
-            print(f"\n✓ Output Image Dimensions: {int(output_h)} × {int(output_w)}")
-            print(f"✓ Total output features:   {int(output_h * output_w)}")
-            print("\n✓ Valid configuration!")
-        else:
-            print(f"\n✗ Output Dimensions: {output_h} × {output_w}")
-            print("\n⚠ WARNING: Output dimensions are not integers!")
-            print("  This configuration will not work properly.")
-            print("  Adjust stride, padding, or filter size.")
-    else:
-        print(f"\n✗ Invalid configuration!")
-        print(f"  Output dimensions are negative or zero: {output_h} × {output_w}")
+    return output, remainder
 
-    print("="*60 + "\n")
 
-    return output_h, output_w
+def is_valid_output(input_dim, filter_dim, stride, padding, dilation=1):
+    """Check that a configuration gives a positive integer output dimension."""
+    output, remainder = output_size(input_dim, filter_dim, stride, padding,
+                                    dilation)
+    return remainder == 0 and output > 0
+
+
+def transposed_output_size(input_dim, filter_dim, stride=1, padding=0,
+                           dilation=1, output_padding=0):
+    """
+    Calculate the output dimension of a transposed convolution.
+
+    Output = (Input - 1) × Stride - PadBefore - PadAfter
+             + Dilation × (Filter - 1) + 1 + OutputPadding
+
+    Args:
+        padding: An int or a (before, after) pair
+        output_padding: Extra size added on one side, to pick among the
+            input sizes a strided convolution maps to the same output;
+            must be smaller than the stride or the dilation
+
+    Raises:
+        ValueError: If output_padding is out of range
+    """
+    if not 0 <= output_padding < max(stride, dilation):
+        raise ValueError(
+            f"output_padding must be smaller than stride or dilation, "
+            f"got {output_padding}"
+        )
+    if isinstance(padding, str):
+        raise ValueError("transposed convolution needs numeric padding")
+
+    before, after = resolve_padding(padding, input_dim, filter_dim)
+    return ((input_dim - 1) * stride - before - after
+            + effective_filter_size(filter_dim, dilation) + output_padding)
+
+
+FilterPosition = namedtuple(
+    "FilterPosition",
+    ["output_y", "output_x", "start_y", "start_x", "end_y", "end_x"],
+)
+FilterPosition.__doc__ = """
+Where the filter lands for one output position.
+
+The window covers rows [start_y, end_y) and columns [start_x, end_x) of the
+padded input (subtract the padding for unpadded input coordinates).
+"""
+
+
+class FilterPositions(Sequence):
+    """
+    Every position of the filter over the padded input, in row-major order.
+
+    A lazy equivalent of getFilterPositions in index.html: positions are
+    computed on access, so len(), indexing and slicing are O(1) and memory
+    use does not depend on the size of the feature map.
+
+    Example:
+        positions = FilterPositions(720, 1280, 7, 7, 1, 3)
+        len(positions)          # 921600
+        positions[-1]           # last window
+        positions[::1000]       # every 1000th window, still lazy
+    """
+
+    def __init__(self, input_h, input_w, filter_h, filter_w, stride, padding,
+                 _indices=None):
+        self.input_h = input_h
+        self.input_w = input_w
+        self.filter_h = filter_h
+        self.filter_w = filter_w
+        self.stride = stride
+        self.padding = padding
+
+        # Filter positions that fit entirely inside the padded input
+        # (the integer part of calculate_output_dimension when positive)
+        padded_h = input_h + 2 * padding
+        padded_w = input_w + 2 * padding
+        self.output_h = max(0, (padded_h - filter_h) // stride + 1)
+        self.output_w = max(0, (padded_w - filter_w) // stride + 1)
+        if self.output_h == 0 or self.output_w == 0:
+            self.output_h = self.output_w = 0
+
+        if _indices is None:
+            _indices = range(self.output_h * self.output_w)
+        self._indices = _indices
+
+    def __len__(self):
+        return len(self._indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return FilterPositions(
+                self.input_h, self.input_w, self.filter_h, self.filter_w,
+                self.stride, self.padding, _indices=self._indices[index]
+            )
+        return self._position(self._indices[index])
+
+    def __iter__(self):
+        for flat in self._indices:
+            yield self._position(flat)
+
+    def __contains__(self, position):
+        try:
+            self.index(position)
+        except ValueError:
+            return False
+        return True
+
+    def __repr__(self):
+        return (f"FilterPositions({self.input_h}, {self.input_w}, "
+                f"{self.filter_h}, {self.filter_w}, {self.stride}, "
+                f"{self.padding})[{self._indices.start}:{self._indices.stop}"
+                f":{self._indices.step}]")
+
+    def _position(self, flat):
+        output_y, output_x = divmod(flat, self.output_w)
+        start_y = output_y * self.stride
+        start_x = output_x * self.stride
+        return FilterPosition(output_y, output_x, start_y, start_x,
+                              start_y + self.filter_h, start_x + self.filter_w)
+
+    def window(self, output_y, output_x):
+        """Return the filter position for output coordinates (y, x)."""
+        if not (0 <= output_y < self.output_h and 0 <= output_x < self.output_w):
+            raise IndexError(f"output position ({output_y}, {output_x}) "
+                             f"outside {self.output_h} × {self.output_w}")
+        return self._position(output_y * self.output_w + output_x)
+
+    def index(self, position, start=0, stop=None):
+        """Return the index of a FilterPosition in O(1)."""
+        output_y, output_x = position[0], position[1]
+        if (0 <= output_y < self.output_h and 0 <= output_x < self.output_w
+                and self._position(output_y * self.output_w + output_x)
+                == tuple(position)):
+            try:
+                index = self._indices.index(output_y * self.output_w + output_x)
+            except ValueError:
+                pass
+            else:
+                # Negative bounds count from the end, as for list.index
+                start, stop, _ = slice(start, stop).indices(len(self))
+                if start <= index < stop:
+                    return index
+        raise ValueError(f"{position!r} is not in {self!r}")
+
+    def covering(self, y, x):
+        """
+        Return the filter positions whose window contains padded input
+        pixel (y, x).
+
+        At most ceil(filter_h / stride) × ceil(filter_w / stride) positions
+        are built, whatever the size of the feature map.
+        """
+        def axis_range(coord, filter_dim, count):
+            # start <= coord < start + filter_dim, start = i * stride
+            first = max(0, -((filter_dim - 1 - coord) // self.stride))
+            last = min(count - 1, coord // self.stride)
+            return range(first, last + 1)
+
+        rows = axis_range(y, self.filter_h, self.output_h)
+        cols = axis_range(x, self.filter_w, self.output_w)
+        return [self._position(i * self.output_w + j)
+                for i in rows for j in cols
+                if i * self.output_w + j in self._indices]
+
+
+def visualize_calculation(input_h, input_w, filter_h, filter_w, stride, padding,
+                          format="text", out=None):
+    """
+    Calculate and display the output dimensions with detailed information.
+
+    Args:
+        input_h, input_w, filter_h, filter_w, stride, padding: Configuration
+        format: Report format, see conv_report.REPORT_FORMATS
+        out: Text stream for the report (defaults to stdout)
+
+    Returns:
+        (output_h, output_w) as from calculate_output_dimension
+    """
+    from conv_report import report_record, write_report
+
+    record = report_record(input_h, input_w, filter_h, filter_w, stride, padding)
+    write_report([record], format, out)
+
+    return float(record["output_h"]), float(record["output_w"])
 
 
 def get_positive_int(prompt):
@@ -116,8 +335,45 @@ def get_non_negative_int(prompt):
             print("  ⚠ Invalid input! Please enter a number.")
 
 
-def main():
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    # Imported here so library users don't pay for argparse at import time
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Convolution output dimension calculator. Runs "
+                    "interactively unless --batch is given."
+    )
+    parser.add_argument(
+        "--batch", nargs="?", const="-", metavar="FILE",
+        help="read configurations from FILE (or stdin if omitted or '-') "
+             "and stream results to stdout"
+    )
+    parser.add_argument(
+        "--format", choices=["csv", "jsonl"], default="csv",
+        help="batch input format (default: csv)"
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=["csv", "jsonl", "text", "json", "markdown", "quiet"],
+        help="batch output format (default: same as --format); text, json, "
+             "markdown and quiet write one report after reading all input"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main function to run the calculator."""
+    args = parse_args(argv)
+    if args.batch is not None:
+        from conv_stream import run_batch
+        try:
+            run_batch(args.batch, args.format, args.output_format)
+        except BrokenPipeError:
+            # Output was closed early (e.g. piped into head)
+            sys.stderr.close()
+        return
+
     print("\n" + "="*60)
     print("WELCOME TO CONVOLUTION OUTPUT DIMENSION CALCULATOR")
     print("="*60)
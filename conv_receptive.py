@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Receptive Field and Jump Tracking
+
+For every layer of a stack, reports how much of the input one output
+position sees (the receptive field size), how far apart neighbouring
+output positions are in input pixels (the jump, or effective stride), and
+where the first output position is centred on the input (the start).
+
+Each layer updates these with the running products and sums:
+
+    Jump_out  = Jump_in × Stride
+    Size_out  = Size_in + (Filter_eff - 1) × Jump_in
+    Start_out = Start_in + ((Filter_eff - 1) / 2 - Padding) × Jump_in
+
+where Filter_eff = Dilation × (Filter - 1) + 1 (effective_filter_size in
+conv_output_calculator) and Padding is the padding before the input, as
+resolve_padding gives it. Start is in input pixel coordinates, with 0 at
+the centre of the top-left input pixel.
+
+"same" padding depends on the layer's input size, so layers using it
+need their input shape; other paddings don't.
+
+Each layer only needs the values after the previous one, so
+ConvNetwork.receptive_fields keeps them per layer and recomputes from an
+edited layer onward, like its shapes.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+from conv_output_calculator import effective_filter_size, resolve_padding
+
+
+ReceptiveField = namedtuple(
+    "ReceptiveField",
+    ["size_h", "size_w", "jump_h", "jump_w", "start_h", "start_w"],
+)
+ReceptiveField.__doc__ = """
+Receptive field of one output position after a layer.
+
+Fields:
+    size_h, size_w: Receptive field size in input pixels
+    jump_h, jump_w: Distance in input pixels between neighbouring outputs
+    start_h, start_w: Centre of the first output's receptive field in input
+        pixel coordinates (may be a half pixel, or negative with padding)
+"""
+
+# A single input pixel
+INPUT_FIELD = ReceptiveField(1, 1, 1, 1, 0.0, 0.0)
+
+
+def _axis_step(size, jump, start, input_dim, filter_dim, stride, padding,
+               dilation):
+    span = effective_filter_size(filter_dim, dilation) - 1
+    before, _ = resolve_padding(padding, input_dim, filter_dim, stride,
+                                dilation)
+    return (size + span * jump,
+            jump * stride,
+            start + (span / 2 - before) * jump)
+
+
+@lru_cache(maxsize=65536)
+def receptive_field_step(layer, field, input_shape=None):
+    """
+    Calculate the receptive field after one layer.
+
+    Args:
+        layer: conv_network.Layer to apply
+        field: ReceptiveField before the layer
+        input_shape: (channels, height, width) before the layer; only
+            needed for "same" padding
+
+    Returns:
+        ReceptiveField after the layer
+
+    Raises:
+        ValueError: If the padding is invalid, or "same" without an input
+            shape
+    """
+    if input_shape is None:
+        if layer.padding == "same":
+            raise ValueError('"same" padding needs the layer input shape')
+        input_h = input_w = None
+    else:
+        _, input_h, input_w = input_shape
+
+    size_h, jump_h, start_h = _axis_step(
+        field.size_h, field.jump_h, field.start_h, input_h,
+        layer.filter_h, layer.stride, layer.padding, layer.dilation
+    )
+    size_w, jump_w, start_w = _axis_step(
+        field.size_w, field.jump_w, field.start_w, input_w,
+        layer.filter_w, layer.stride, layer.padding, layer.dilation
+    )
+    return ReceptiveField(size_h, size_w, jump_h, jump_w, start_h, start_w)
+
+
+def receptive_fields(layers, input_shape=None):
+    """
+    Calculate the receptive field after every layer of a stack.
+
+    Convenience wrapper for a one-off stack; use
+    ConvNetwork.receptive_fields to keep results across edits.
+
+    Args:
+        layers: Sequence of conv_network.Layer
+        input_shape: (channels, height, width) of the input; only needed
+            if a layer uses "same" padding
+
+    Returns:
+        List of len(layers) + 1 ReceptiveField tuples, starting with
+        INPUT_FIELD
+    """
+    if input_shape is not None:
+        from conv_network import propagate_shapes
+        shapes = propagate_shapes(input_shape, layers)
+    else:
+        shapes = [None] * len(layers)
+
+    fields = [INPUT_FIELD]
+    for layer, shape in zip(layers, shapes):
+        if layer.padding != "same":
+            shape = None  # keeps cache entries shared across input shapes
+        fields.append(receptive_field_step(layer, fields[-1], shape))
+    return fields
+
+
+def print_receptive_fields(network):
+    """Print a table of the receptive fields through a ConvNetwork."""
+    fields = network.receptive_fields()
+
+    print("\n" + "="*60)
+    print("RECEPTIVE FIELDS")
+    print("="*60)
+    print(f"\n  {'#':>3}  {'Layer':<22}{'Size':<12}{'Jump':<10}{'Start'}")
+    print("-"*60)
+
+    for i, (layer, field) in enumerate(zip(network.layers, fields[1:])):
+        desc = (f"{layer.kind} {layer.filter_h}×{layer.filter_w}"
+                f" s{layer.stride} p{layer.padding}")
+        if layer.dilation != 1:
+            desc += f" d{layer.dilation}"
+        size = f"{field.size_h}×{field.size_w}"
+        jump = f"{field.jump_h}×{field.jump_w}"
+        start = f"({field.start_h:g}, {field.start_w:g})"
+        print(f"  {i:>3}  {desc:<22}{size:<12}{jump:<10}{start}")
+
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    from conv_network import ConvNetwork, conv_layer, pool_layer
+
+    network = ConvNetwork((3, 224, 224), [
+        conv_layer(7, stride=2, padding=3, out_channels=64),
+        pool_layer(3, stride=2, padding=1),
+        conv_layer(3, padding=1, out_channels=64),
+        conv_layer(3, padding=1, out_channels=64),
+        conv_layer(3, stride=2, padding=1, out_channels=128),
+        conv_layer(3, padding=2, out_channels=128, dilation=2),
+        conv_layer(3, padding=4, out_channels=128, dilation=4),
+    ])
+    print_receptive_fields(network)
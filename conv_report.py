@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Report Rendering for Convolution Calculations
+
+Turns calculation results into reports for one or many configurations:
+
+    text:      the step-by-step breakdown of visualize_calculation
+    json:      a JSON list of result records
+    markdown:  one Markdown table row per configuration
+    quiet:     one line per configuration with just the output size
+
+The whole report is built as a list of strings and joined once, and
+write_report hands it to the output stream in a single write, instead of
+one print call per line.
+
+Results are the records of conv_stream.calculate_record (one dict per
+configuration, with the keys in conv_stream.RESULT_FIELDS), or columns of
+them, e.g. the arrays passed to conv_batch.batch_calculate merged with the
+dictionary it returns.
+"""
+
+import json
+import sys
+from collections.abc import Mapping
+
+from conv_output_calculator import calculate_output_dimension
+from conv_stream import RESULT_FIELDS
+
+
+REPORT_FORMATS = ["text", "json", "markdown", "quiet"]
+
+
+def report_record(input_h, input_w, filter_h, filter_w, stride, padding):
+    """
+    Calculate the result record for one configuration.
+
+    Unlike conv_stream.calculate_record, the values are not range-checked:
+    anything visualize_calculation has always reported on (e.g. negative
+    padding) still gets a report, marked invalid where appropriate.
+    """
+    output_h = calculate_output_dimension(input_h, filter_h, stride, padding)
+    output_w = calculate_output_dimension(input_w, filter_w, stride, padding)
+
+    span_h = input_h - filter_h + 2 * padding
+    span_w = input_w - filter_w + 2 * padding
+    valid = (output_h > 0 and output_w > 0
+             and span_h % stride == 0 and span_w % stride == 0)
+    if valid:
+        output_h = int(span_h // stride) + 1
+        output_w = int(span_w // stride) + 1
+
+    return {
+        "input_h": input_h, "input_w": input_w,
+        "filter_h": filter_h, "filter_w": filter_w,
+        "stride": stride, "padding": padding,
+        "output_h": output_h, "output_w": output_w,
+        "valid": valid,
+        "features": output_h * output_w if valid else 0,
+        "error": None,
+    }
+
+
+def _plain(value):
+    """Convert NumPy scalars to Python numbers."""
+    return value.item() if hasattr(value, "item") else value
+
+
+def _records(results):
+    """Normalize a record, a list of records or columns to a record list."""
+    if not isinstance(results, Mapping):
+        return results
+    if not hasattr(results["output_h"], "__len__"):
+        return [results]
+
+    count = len(results["output_h"])
+    columns = {}
+    for name in RESULT_FIELDS:
+        column = results.get(name)
+        if column is None or not hasattr(column, "__len__"):
+            column = [column] * count
+        columns[name] = column
+
+    records = []
+    for i in range(count):
+        record = {name: _plain(columns[name][i]) for name in RESULT_FIELDS}
+        if record["valid"]:
+            record["output_h"] = int(record["output_h"])
+            record["output_w"] = int(record["output_w"])
+        records.append(record)
+    return records
+
+
+def _render_text(records):
+    lines = []
+    add = lines.append
+
+    for r in records:
+        if r["error"] is not None:
+            add("\n" + "="*60)
+            add(f"✗ {r['error']}")
+            add("="*60 + "\n")
+            continue
+
+        ih, iw, fh, fw = r["input_h"], r["input_w"], r["filter_h"], r["filter_w"]
+        s, p = r["stride"], r["padding"]
+        oh, ow = r["output_h"], r["output_w"]
+
+        add("\n" + "="*60)
+        add("CONVOLUTION OUTPUT DIMENSION CALCULATOR")
+        add("="*60)
+
+        add("\nInput Parameters:")
+        add(f"  • Input Image Dimensions:  {ih} × {iw}")
+        add(f"  • Filter/Kernel Size:      {fh} × {fw}")
+        add(f"  • Stride:                  {s}")
+        add(f"  • Padding:                 {p}")
+
+        add("\n" + "-"*60)
+        add("Calculation Formula:")
+        add("  Output = ((Input - Filter + 2 × Padding) / Stride) + 1")
+
+        add("\n" + "-"*60)
+        add("Height Calculation:")
+        add(f"  Output Height = (({ih} - {fh} + 2 × {p}) / {s}) + 1")
+        add(f"  Output Height = (({ih} - {fh} + {2*p}) / {s}) + 1")
+        add(f"  Output Height = ({ih - fh + 2*p} / {s}) + 1")
+        add(f"  Output Height = {(ih - fh + 2*p) / s} + 1")
+        add(f"  Output Height = {calculate_output_dimension(ih, fh, s, p)}")
+
+        add("\nWidth Calculation:")
+        add(f"  Output Width  = (({iw} - {fw} + 2 × {p}) / {s}) + 1")
+        add(f"  Output Width  = (({iw} - {fw} + {2*p}) / {s}) + 1")
+        add(f"  Output Width  = ({iw - fw + 2*p} / {s}) + 1")
+        add(f"  Output Width  = {(iw - fw + 2*p) / s} + 1")
+        add(f"  Output Width  = {calculate_output_dimension(iw, fw, s, p)}")
+
+        add("\n" + "="*60)
+        add("RESULT:")
+        add("="*60)
+
+        if r["valid"]:
+            add(f"\n✓ Output Image Dimensions: {oh} × {ow}")
+            add(f"✓ Total output features:   {r['features']}")
+            add("\n✓ Valid configuration!")
+        elif oh > 0 and ow > 0:
+            add(f"\n✗ Output Dimensions: {oh} × {ow}")
+            add("\n⚠ WARNING: Output dimensions are not integers!")
+            add("  This configuration will not work properly.")
+            add("  Adjust stride, padding, or filter size.")
+        else:
+            add("\n✗ Invalid configuration!")
+            add(f"  Output dimensions are negative or zero: {oh} × {ow}")
+
+        add("="*60 + "\n")
+
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def _render_json(records):
+    return json.dumps(list(records), ensure_ascii=False, indent=2) + "\n"
+
+
+def _render_markdown(records):
+    lines = [
+        "| Input | Filter | Stride | Padding | Output | Features | Valid |",
+        "|---|---|---|---|---|---|---|",
+    ]
+    for r in records:
+        if r["error"] is not None:
+            error = r["error"].replace("|", "\\|")
+            lines.append(f"| | | | | {error} | | ✗ |")
+            continue
+        lines.append(
+            f"| {r['input_h']} × {r['input_w']} | {r['filter_h']} × {r['filter_w']}"
+            f" | {r['stride']} | {r['padding']}"
+            f" | {r['output_h']} × {r['output_w']} | {r['features']}"
+            f" | {'✓' if r['valid'] else '✗'} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def _render_quiet(records):
+    lines = []
+    for r in records:
+        if r["error"] is not None:
+            lines.append(f"✗ {r['error']}")
+        elif r["valid"]:
+            lines.append(f"{r['output_h']} × {r['output_w']}")
+        else:
+            lines.append(f"✗ {r['output_h']} × {r['output_w']}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+_RENDERERS = {
+    "text": _render_text,
+    "json": _render_json,
+    "markdown": _render_markdown,
+    "quiet": _render_quiet,
+}
+
+
+def render_report(results, format="text"):
+    """
+    Render results as a report.
+
+    Args:
+        results: A result record, an iterable of records, or a mapping of
+            result columns (see the module docstring)
+        format: One of REPORT_FORMATS
+
+    Returns:
+        The report as one string
+    """
+    if format not in _RENDERERS:
+        raise ValueError(f"unknown report format: {format}")
+    return _RENDERERS[format](_records(results))
+
+
+def write_report(results, format="text", out=None):
+    """
+    Render results and write the report to a stream in one write.
+
+    Args:
+        results, format: As for render_report
+        out: Text stream (defaults to stdout)
+    """
+    if out is None:
+        out = sys.stdout
+    out.write(render_report(results, format))
+
+
+if __name__ == "__main__":
+    # AlexNet-style stack, with one deliberately misaligned layer
+    layers = [
+        report_record(227, 227, 11, 11, 4, 0),
+        report_record(55, 55, 3, 3, 2, 0),
+        report_record(27, 27, 5, 5, 1, 2),
+        report_record(27, 27, 4, 4, 2, 1),
+        report_record(27, 27, 3, 3, 2, 0),
+    ]
+    write_report(layers, "markdown")
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Architecture Search Under Shape and FLOPs Constraints
+
+Finds stacks of square convolutions (filter, stride, padding per layer)
+that turn an input size into a target output size, and returns the Pareto
+front of FLOPs against depth: for each depth, the cheapest stack, kept
+only if it is cheaper than every shallower one.
+
+The search is a depth-first branch and bound. A partial stack is dropped
+as soon as
+
+  - the target size is out of reach in the remaining layers: one layer
+    shrinks a size X to at least (X - max_filter) // max_stride + 1 and
+    grows it to at most X + 2 × max_padding;
+  - its FLOPs plus the cheapest possible last layer (a 1×1 conv producing
+    the target size) exceed the budget, or can't beat a stack already
+    found that is no deeper;
+  - another partial stack reached the same size with no more layers and
+    no more FLOPs (after the first layer the channel count is fixed, so
+    both have exactly the same completions).
+
+Layer FLOPs are 2 × OutH × OutW × Filter² × InChannels × OutChannels.
+
+The subtrees below each possible first layer are explored on a process
+pool. Workers share the cheapest FLOPs found per depth, so a good stack
+found by one prunes the others, and all stop at the time limit with the
+best front found so far.
+"""
+
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from conv_batch import output_sizes
+from conv_network import conv_layer
+from conv_solver import DEFAULT_MAX_FILTER, DEFAULT_MAX_PADDING, DEFAULT_MAX_STRIDE
+
+
+DEFAULT_MAX_DEPTH = 6
+DEFAULT_TIME_LIMIT = 10.0
+
+
+Architecture = namedtuple("Architecture", ["depth", "flops", "layers"])
+Architecture.__doc__ = """
+A conv stack on the Pareto front.
+
+Fields:
+    depth: Number of layers
+    flops: Total FLOPs
+    layers: List of conv_network.Layer
+"""
+
+SearchResult = namedtuple("SearchResult", ["front", "nodes", "complete"])
+SearchResult.__doc__ = """
+The outcome of a search.
+
+Fields:
+    front: Architectures on the Pareto front, by increasing depth
+    nodes: Partial stacks visited
+    complete: False if the time limit stopped the search, in which case
+        the front is the best found so far
+"""
+
+
+class _Timeout(Exception):
+    pass
+
+
+@lru_cache(maxsize=None)
+def _moves(height, width, max_filter, max_stride, max_padding):
+    """
+    Valid layers for an input size, cheapest first.
+
+    Returns:
+        Tuple of (flops per in × out channel, filter, stride, padding,
+        output_h, output_w)
+    """
+    f, s, p = np.meshgrid(np.arange(1, max_filter + 1),
+                          np.arange(1, max_stride + 1),
+                          np.arange(0, max_padding + 1), indexing="ij")
+    f, s, p = f.ravel(), s.ravel(), p.ravel()
+    out_h, rem_h = output_sizes(height, f, s, p)
+    out_w, rem_w = output_sizes(width, f, s, p)
+    valid = (rem_h == 0) & (out_h > 0) & (rem_w == 0) & (out_w > 0)
+
+    flops = 2 * out_h * out_w * f * f
+    rows = np.stack([flops, f, s, p, out_h, out_w])[:, valid]
+    rows = rows[:, np.lexsort(rows[::-1])]
+    return tuple(map(tuple, rows.T.tolist()))
+
+
+@lru_cache(maxsize=None)
+def _reachable(size, target, layers, max_filter, max_stride, max_padding):
+    """Whether target may be reachable from size in exactly `layers` layers."""
+    low = high = size
+    for _ in range(layers):
+        low = max(1, (low - max_filter) // max_stride + 1)
+        high += 2 * max_padding
+    return low <= target <= high
+
+
+class _Searcher:
+    """Depth-first branch and bound below given first layers."""
+
+    def __init__(self, settings, best):
+        (self.target_h, self.target_w, self.in_channels, self.channels,
+         self.max_depth, self.max_flops, self.max_filter, self.max_stride,
+         self.max_padding, self.deadline) = settings
+        # best[d] is the cheapest stack of depth d found by any worker;
+        # reads skip the lock, a stale value only prunes a little less
+        self.best = best
+        self.best_values = best.get_obj()
+        self.last_flops = (2 * self.target_h * self.target_w
+                           * self.channels * self.channels)
+        # Per size: (depth, flops) of partial stacks already expanded
+        self.seen = {}
+        self.nodes = 0
+
+    def _bound(self, depth):
+        """Cheapest FLOPs of any found stack at most depth layers deep."""
+        return min(self.best_values[1:min(depth, self.max_depth) + 1])
+
+    def _record(self, depth, flops, stack):
+        with self.best.get_lock():
+            if flops >= self._bound(depth):
+                return
+            self.best_values[depth] = flops
+        if depth not in self.found or flops < self.found[depth][0]:
+            self.found[depth] = (flops, stack)
+
+    def run(self, first):
+        """
+        Search all stacks starting with one first layer.
+
+        Returns:
+            ({depth: (flops, stack)}, nodes, complete)
+        """
+        self.found = {}
+        self.nodes = 0
+        flops, f, s, p, out_h, out_w = first
+        try:
+            if time.monotonic() > self.deadline:
+                raise _Timeout
+            self._step(out_h, out_w, 1, flops * self.in_channels * self.channels,
+                       ((f, s, p),))
+        except _Timeout:
+            return self.found, self.nodes, False
+        return self.found, self.nodes, True
+
+    def _step(self, height, width, depth, flops, stack):
+        """Handle a partial stack of depth layers ending at height × width."""
+        if (height, width) == (self.target_h, self.target_w):
+            # Deeper stacks through the same size are dominated by this one
+            self._record(depth, flops, stack)
+            return
+        remaining = self.max_depth - depth
+        if remaining == 0:
+            return
+        if not (_reachable(height, self.target_h, remaining, self.max_filter,
+                           self.max_stride, self.max_padding)
+                and _reachable(width, self.target_w, remaining, self.max_filter,
+                               self.max_stride, self.max_padding)):
+            return
+        if (flops + self.last_flops > self.max_flops
+                or flops + self.last_flops >= self._bound(depth + 1)):
+            return
+
+        seen = self.seen.setdefault((height, width), [])
+        for seen_depth, seen_flops in seen:
+            if seen_depth <= depth and seen_flops <= flops:
+                return
+        seen[:] = [(d, c) for d, c in seen if d < depth or c < flops]
+        seen.append((depth, flops))
+
+        self.nodes += 1
+        if time.monotonic() > self.deadline:
+            raise _Timeout
+
+        scale = self.channels * self.channels
+        for layer_flops, f, s, p, out_h, out_w in _moves(
+                height, width, self.max_filter, self.max_stride,
+                self.max_padding):
+            total = flops + layer_flops * scale
+            # Moves are cheapest first: once a layer can't beat the stacks
+            # found at this depth or above, none of the later ones can
+            if total > self.max_flops or total >= self._bound(depth + 1):
+                break
+            self._step(out_h, out_w, depth + 1, total, stack + ((f, s, p),))
+
+
+# Per-worker searcher, set by _init_worker
+_worker_searcher = None
+
+
+def _init_worker(settings, best):
+    global _worker_searcher
+    _worker_searcher = _Searcher(settings, best)
+
+
+def _run_first(first):
+    return _worker_searcher.run(first)
+
+
+def search(input_h, input_w, output_h, output_w, in_channels=3, channels=64,
+           max_depth=DEFAULT_MAX_DEPTH, max_flops=None,
+           max_filter=DEFAULT_MAX_FILTER, max_stride=DEFAULT_MAX_STRIDE,
+           max_padding=DEFAULT_MAX_PADDING, time_limit=DEFAULT_TIME_LIMIT,
+           workers=None):
+    """
+    Find the Pareto front of conv stacks reaching a target output size.
+
+    Args:
+        input_h, input_w: Input size
+        output_h, output_w: Target output size
+        in_channels: Channels of the input
+        channels: Output channels of every layer
+        max_depth: Most layers in a stack
+        max_flops: FLOPs budget (default: unlimited)
+        max_filter, max_stride, max_padding: Per-layer bounds, as in
+            conv_solver
+        time_limit: Seconds to search before returning the best front
+            found so far
+        workers: Number of worker processes (default: CPU count; 1 runs
+            in the current process)
+
+    Returns:
+        SearchResult
+    """
+    if max_flops is None:
+        max_flops = float("inf")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    deadline = time.monotonic() + time_limit
+
+    settings = (output_h, output_w, in_channels, channels, max_depth,
+                max_flops, max_filter, max_stride, max_padding, deadline)
+    best = multiprocessing.Array("d", [float("inf")] * (max_depth + 1))
+
+    firsts = [move for move in _moves(input_h, input_w, max_filter, max_stride,
+                                      max_padding)
+              if move[0] * in_channels * channels <= max_flops]
+    if output_h < 1 or output_w < 1 or max_depth < 1:
+        firsts = []
+
+    if workers == 1 or len(firsts) <= 1:
+        searcher = _Searcher(settings, best)
+        outcomes = [searcher.run(first) for first in firsts]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(settings, best)) as pool:
+            outcomes = list(pool.map(_run_first, firsts,
+                                     chunksize=max(1, len(firsts)
+                                                   // (8 * workers))))
+
+    found = {}
+    for solutions, _, _ in outcomes:
+        for depth, (flops, stack) in solutions.items():
+            if depth not in found or flops < found[depth][0]:
+                found[depth] = (flops, stack)
+
+    front = []
+    for depth in sorted(found):
+        flops, stack = found[depth]
+        if not front or flops < front[-1].flops:
+            front.append(Architecture(depth, flops, [
+                conv_layer(f, stride=s, padding=p, out_channels=channels)
+                for f, s, p in stack
+            ]))
+
+    return SearchResult(front,
+                        sum(nodes for _, nodes, _ in outcomes),
+                        all(complete for _, _, complete in outcomes))
+
+
+def print_front(result):
+    """Print the Pareto front of a search."""
+    print("\n" + "="*60)
+    print("ARCHITECTURE SEARCH: FLOPs vs DEPTH")
+    print("="*60)
+    print(f"\n  {'Depth':>5}  {'FLOPs':>18}  Layers (filter/stride/padding)")
+    print("-"*60)
+    for arch in result.front:
+        layers = " ".join(f"{l.filter_h}/{l.stride}/{l.padding}"
+                          for l in arch.layers)
+        print(f"  {arch.depth:>5}  {arch.flops:>18,}  {layers}")
+    if not result.front:
+        print("\n✗ No stack found within the given bounds.")
+    print("-"*60)
+    print(f"  {result.nodes:,} partial stacks explored"
+          + ("" if result.complete else "  (⚠ time limit reached)"))
+    print("="*60 + "\n")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Search conv stacks reaching a target output size."
+    )
+    parser.add_argument("input_h", type=int)
+    parser.add_argument("input_w", type=int)
+    parser.add_argument("output_h", type=int)
+    parser.add_argument("output_w", type=int)
+    parser.add_argument("--in-channels", type=int, default=3)
+    parser.add_argument("--channels", type=int, default=64)
+    parser.add_argument("--max-depth", type=int, default=DEFAULT_MAX_DEPTH)
+    parser.add_argument("--max-flops", type=float)
+    parser.add_argument("--max-filter", type=int, default=DEFAULT_MAX_FILTER)
+    parser.add_argument("--max-stride", type=int, default=DEFAULT_MAX_STRIDE)
+    parser.add_argument("--max-padding", type=int, default=DEFAULT_MAX_PADDING)
+    parser.add_argument("--time-limit", type=float, default=DEFAULT_TIME_LIMIT,
+                        help="seconds (default: %(default)s)")
+    parser.add_argument("--workers", type=int,
+                        help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    print_front(search(
+        args.input_h, args.input_w, args.output_h, args.output_w,
+        in_channels=args.in_channels, channels=args.channels,
+        max_depth=args.max_depth, max_flops=args.max_flops,
+        max_filter=args.max_filter, max_stride=args.max_stride,
+        max_padding=args.max_padding, time_limit=args.time_limit,
+        workers=args.workers,
+    ))
+
+
+if __name__ == "__main__":
+    main()
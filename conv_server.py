@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Local HTTP/JSON Service for the Convolution Calculator
+
+A small asyncio HTTP/1.1 server so tools and notebooks can query the
+calculator without starting a new Python process for every call.
+Connections are kept alive and pipelined requests are answered in order.
+
+Endpoints:
+    GET  /                 index.html (and the other HTML pages by name)
+    GET  /shape?input_h=…  output shape of one configuration (query string)
+    POST /shape            output shape of one configuration (JSON object)
+    POST /shape/batch      output shapes of a JSON list of configurations
+    POST /cost             cost estimate of one layer (JSON object)
+    POST /cost/batch       cost estimates of a JSON list of layers
+
+Configurations use the fields of conv_stream: input_h, input_w, filter_h,
+filter_w, stride, padding. Cost queries also need in_channels and
+out_channels, and accept batch and dtype. Invalid entries of a batch get an
+"error" field instead of failing the whole request.
+
+The server binds to 127.0.0.1 by default.
+
+Usage:
+    python3 conv_server.py [--host 127.0.0.1] [--port 8000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import traceback
+from urllib.parse import parse_qsl, urlsplit
+
+from conv_stream import FIELDS, _parse_field, calculate_record
+
+
+STATIC_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_FILES = {
+    "/": "index.html",
+    "/index.html": "index.html",
+    "/conv_calculator_gui.html": "conv_calculator_gui.html",
+}
+
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 64 * 1024 * 1024
+KEEP_ALIVE_TIMEOUT = 30
+
+COST_FIELDS = ["in_channels", "out_channels"]
+COST_RESULT_FIELDS = ["macs", "params", "input_bytes", "output_bytes",
+                      "weight_bytes", "intensity"]
+
+# layer_costs computes in int64
+MAX_COST = 2**63 - 1
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    """An error answered with an HTTP status and a JSON message."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+_static_cache = {}
+
+
+def _static_file(name):
+    """Return the contents of a static file, read once per process."""
+    if name not in _static_cache:
+        with open(os.path.join(STATIC_DIR, name), "rb") as f:
+            _static_cache[name] = f.read()
+    return _static_cache[name]
+
+
+def _error(message):
+    return {"error": message}
+
+
+def shape_batch(records):
+    """Calculate output shapes for a list of configuration records."""
+    results = []
+    for record in records:
+        if not isinstance(record, dict):
+            results.append(_error("expected a JSON object"))
+            continue
+        try:
+            results.append(calculate_record(record))
+        except (OverflowError, ValueError) as e:
+            results.append(_error(str(e)))
+    return results
+
+
+def _cost_fits(shape, channels, batch, itemsize):
+    """Whether every count layer_costs computes for a record fits in int64."""
+    in_channels, out_channels = channels
+    kernel = shape["filter_h"] * shape["filter_w"]
+    input_pixels = shape["input_h"] * shape["input_w"]
+    output_pixels = shape["features"]
+    params = kernel * in_channels * out_channels + out_channels
+    moved = (batch * in_channels * input_pixels
+             + batch * out_channels * output_pixels + params) * itemsize
+    macs = batch * output_pixels * kernel * in_channels * out_channels
+    return max(moved, macs) <= MAX_COST
+
+
+def cost_batch(records):
+    """
+    Estimate layer costs for a list of records in one vectorized call.
+
+    Records sharing a dtype are scored together with conv_cost.layer_costs.
+    """
+    from conv_cost import DTYPE_BYTES, layer_costs
+
+    results = [None] * len(records)
+    groups = {}
+
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            results[i] = _error("expected a JSON object")
+            continue
+        try:
+            shape = calculate_record(record)
+            channels = [_parse_field(record, name) for name in COST_FIELDS]
+            batch = _parse_field(record, "batch") if "batch" in record else 1
+        except (OverflowError, ValueError) as e:
+            results[i] = _error(str(e))
+            continue
+        # Checked here, before grouping: JSON may hold an unhashable dtype
+        dtype = record.get("dtype", "float32")
+        if not isinstance(dtype, str) or dtype not in DTYPE_BYTES:
+            results[i] = _error(f"unknown dtype: {dtype!r}")
+            continue
+        # One entry out of int64 range must not fail its whole group
+        if not _cost_fits(shape, channels, batch, DTYPE_BYTES[dtype]):
+            results[i] = _error("layer too large to estimate")
+            continue
+
+        row = [shape[name] for name in FIELDS] + channels + [batch]
+        groups.setdefault(dtype, []).append((i, shape, row))
+
+    for dtype, rows in groups.items():
+        columns = list(zip(*(row for _, _, row in rows)))
+        try:
+            costs = layer_costs(*columns[:8], batch=columns[8], dtype=dtype)
+        except (OverflowError, TypeError, ValueError) as e:
+            for i, _, _ in rows:
+                results[i] = _error(str(e))
+            continue
+
+        for k, (i, shape, _) in enumerate(rows):
+            result = dict(shape)
+            for name in COST_RESULT_FIELDS:
+                value = costs[name][k].item()
+                result[name] = None if value != value else value  # NaN
+            results[i] = result
+
+    return results
+
+
+def _load_json(body):
+    try:
+        return json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise HTTPError(400, f"invalid JSON: {e}")
+
+
+def _batch_records(body):
+    data = _load_json(body)
+    if isinstance(data, dict) and "configs" in data:
+        data = data["configs"]
+    if not isinstance(data, list):
+        raise HTTPError(400, "expected a JSON list of configurations")
+    return data
+
+
+def _single(batch_func, record):
+    result = batch_func([record])[0]
+    if "error" in result and len(result) == 1:
+        raise HTTPError(400, result["error"])
+    return result
+
+
+def route(method, target, body):
+    """
+    Handle one request.
+
+    Returns:
+        (status, content type, body bytes)
+    """
+    url = urlsplit(target)
+    path = url.path
+
+    if path in STATIC_FILES:
+        if method not in ("GET", "HEAD"):
+            raise HTTPError(405, f"{method} not allowed on {path}")
+        try:
+            page = _static_file(STATIC_FILES[path])
+        except FileNotFoundError:
+            # Installed without the repository's HTML pages
+            raise HTTPError(404, f"{STATIC_FILES[path]} is not available")
+        return 200, "text/html; charset=utf-8", page
+
+    if path == "/shape" and method == "GET":
+        result = _single(shape_batch, dict(parse_qsl(url.query)))
+    elif path == "/shape" and method == "POST":
+        result = _single(shape_batch, _load_json(body))
+    elif path == "/shape/batch" and method == "POST":
+        result = shape_batch(_batch_records(body))
+    elif path == "/cost" and method == "POST":
+        result = _single(cost_batch, _load_json(body))
+    elif path == "/cost/batch" and method == "POST":
+        result = cost_batch(_batch_records(body))
+    elif path in ("/shape", "/shape/batch", "/cost", "/cost/batch"):
+        raise HTTPError(405, f"{method} not allowed on {path}")
+    else:
+        raise HTTPError(404, f"no such endpoint: {path}")
+
+    return 200, "application/json", json.dumps(result).encode()
+
+
+async def _read_request(reader):
+    """
+    Read one request from a connection.
+
+    Returns:
+        (method, target, version, headers, body), or None at end of stream
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise HTTPError(400, "incomplete request")
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(413, "request headers too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ")
+    except ValueError:
+        raise HTTPError(400, "malformed request line")
+
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise HTTPError(411, "chunked bodies are not supported; "
+                             "send Content-Length")
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(400, "invalid Content-Length")
+    if length < 0:
+        raise HTTPError(400, "invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "request body too large")
+
+    body = await reader.readexactly(length) if length else b""
+    return method, target, version, headers, body
+
+
+def _response(status, content_type, body, keep_alive, head_only=False):
+    headers = [
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    data = ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1")
+    return data if head_only else data + body
+
+
+async def handle_connection(reader, writer):
+    """Serve requests on one connection until it closes."""
+    try:
+        while True:
+            try:
+                request = await asyncio.wait_for(_read_request(reader),
+                                                 KEEP_ALIVE_TIMEOUT)
+            except HTTPError as e:
+                writer.write(_response(
+                    e.status, "application/json",
+                    json.dumps(_error(str(e))).encode(), keep_alive=False
+                ))
+                break
+            if request is None:
+                break
+
+            method, target, version, headers, body = request
+            connection = headers.get("connection", "").lower()
+            keep_alive = (connection != "close" if version == "HTTP/1.1"
+                          else connection == "keep-alive")
+
+            try:
+                status, content_type, payload = route(method, target, body)
+            except HTTPError as e:
+                status, content_type = e.status, "application/json"
+                payload = json.dumps(_error(str(e))).encode()
+            except Exception:
+                # The details go to the server log, not to the client
+                traceback.print_exc()
+                status, content_type = 500, "application/json"
+                payload = json.dumps(_error("internal server error")).encode()
+
+            # Responses are written in request order, which is all that
+            # pipelining needs
+            writer.write(_response(status, content_type, payload,
+                                   keep_alive, head_only=method == "HEAD"))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def start_server(host="127.0.0.1", port=8000):
+    """Start the server and return the asyncio Server object."""
+    return await asyncio.start_server(handle_connection, host, port,
+                                      limit=MAX_HEADER_BYTES)
+
+
+async def serve(host="127.0.0.1", port=8000):
+    server = await start_server(host, port)
+    addresses = ", ".join(f"http://{s.getsockname()[0]}:{s.getsockname()[1]}"
+                          for s in server.sockets)
+    print(f"Serving convolution calculator on {addresses}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Serve the convolution calculator over local HTTP."
+    )
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000,
+                        help="port to listen on (default: 8000)")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Inverse Convolution Calculator
+
+Finds every (filter, stride, padding) combination that turns a given input
+size into a target output size, e.g. 224 → 56.
+
+Instead of scanning the whole grid with calculate_output_dimension, the
+solver rearranges the formula
+
+    Output = ((Input - Filter + 2 * Padding) / Stride) + 1
+
+into  Filter = Input - (Output - 1) * Stride + 2 * Padding,  so for each
+stride the valid paddings form a single contiguous range that is walked
+directly. Solutions are yielded lazily, so large bounds cost no memory.
+"""
+
+# Defaults match the slider ranges of the GUI
+DEFAULT_MAX_FILTER = 15
+DEFAULT_MAX_STRIDE = 8
+DEFAULT_MAX_PADDING = 10
+
+
+def _stride_range(input_dim, output_dim, max_filter, max_stride, max_padding):
+    """Range of strides that can possibly reach output_dim."""
+    if output_dim == 1:
+        # Stride never applies with a single output position
+        return range(1, max_stride + 1)
+
+    # Filter >= 1 requires (Output - 1) * Stride <= Input - 1 + 2 * Padding,
+    # Filter <= max_filter requires (Output - 1) * Stride >= Input - max_filter
+    smallest = -((max_filter - input_dim) // (output_dim - 1))
+    largest = (input_dim - 1 + 2 * max_padding) // (output_dim - 1)
+    return range(max(1, smallest), min(max_stride, largest) + 1)
+
+
+def solve_dimension(input_dim, output_dim, max_filter=DEFAULT_MAX_FILTER,
+                    max_stride=DEFAULT_MAX_STRIDE,
+                    max_padding=DEFAULT_MAX_PADDING):
+    """
+    Yield every (filter, stride, padding) that maps input_dim to output_dim.
+
+    Args:
+        input_dim: Input dimension (height or width)
+        output_dim: Target output dimension
+        max_filter: Largest filter size to consider
+        max_stride: Largest stride to consider
+        max_padding: Largest padding to consider
+
+    Yields:
+        (filter, stride, padding) tuples, ordered by stride then padding
+    """
+    if input_dim < 1 or output_dim < 1:
+        return
+
+    for stride in _stride_range(input_dim, output_dim,
+                                max_filter, max_stride, max_padding):
+        # Filter = base + 2 * Padding must lie in [1, max_filter]
+        base = input_dim - (output_dim - 1) * stride
+        low = max(0, -((base - 1) // 2))
+        high = min(max_padding, (max_filter - base) // 2)
+
+        for padding in range(low, high + 1):
+            yield base + 2 * padding, stride, padding
+
+
+def solve(input_h, input_w, output_h, output_w, max_filter=DEFAULT_MAX_FILTER,
+          max_stride=DEFAULT_MAX_STRIDE, max_padding=DEFAULT_MAX_PADDING,
+          square_filter=False):
+    """
+    Yield every 2D configuration that maps input_h × input_w to
+    output_h × output_w.
+
+    Stride and padding are shared by both axes, as in visualize_calculation,
+    while the filter height and width may differ unless square_filter is set.
+
+    Yields:
+        (filter_h, filter_w, stride, padding) tuples, ordered by stride
+        then padding
+    """
+    if min(input_h, input_w, output_h, output_w) < 1:
+        return
+
+    strides_h = _stride_range(input_h, output_h,
+                              max_filter, max_stride, max_padding)
+    strides_w = _stride_range(input_w, output_w,
+                              max_filter, max_stride, max_padding)
+
+    for stride in range(max(strides_h.start, strides_w.start),
+                        min(strides_h.stop, strides_w.stop)):
+        base_h = input_h - (output_h - 1) * stride
+        base_w = input_w - (output_w - 1) * stride
+        if square_filter and base_h != base_w:
+            continue
+
+        low = max(0, -((base_h - 1) // 2), -((base_w - 1) // 2))
+        high = min(max_padding,
+                   (max_filter - base_h) // 2,
+                   (max_filter - base_w) // 2)
+
+        for padding in range(low, high + 1):
+            yield base_h + 2 * padding, base_w + 2 * padding, stride, padding
+
+
+def print_solutions(input_h, input_w, output_h, output_w, limit=20, **bounds):
+    """Print the first limit configurations reaching the target output."""
+    print("\n" + "="*60)
+    print("INVERSE CONVOLUTION SOLVER")
+    print("="*60)
+    print(f"\n  Input {input_h} × {input_w}  →  Output {output_h} × {output_w}\n")
+    print(f"  {'Filter':<12}{'Stride':<10}{'Padding':<10}")
+    print("-"*60)
+
+    count = 0
+    for filter_h, filter_w, stride, padding in solve(
+            input_h, input_w, output_h, output_w, **bounds):
+        if count == limit:
+            print("  ...")
+            break
+        print(f"  {f'{filter_h}×{filter_w}':<12}{stride:<10}{padding:<10}")
+        count += 1
+
+    if count == 0:
+        print("\n✗ No configuration found within the given bounds.")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    print_solutions(224, 224, 56, 56, square_filter=True)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Non-interactive batch mode for the convolution calculator
+
+Reads configurations as CSV or JSON Lines from a file or stdin and writes
+one result record per input row, as soon as that row is read. Nothing is
+accumulated, so memory use stays constant however long the stream is.
+
+Rows that fail validation are written as error records (with the line
+number and message) and the stream carries on.
+
+CSV input may start with a header naming the columns; otherwise columns are
+taken in the order:  input_h, input_w, filter_h, filter_w, stride, padding
+
+In CSV output, output_h and output_w are written as decimals on every row
+(as calculate_output_dimension returns them), so the column has one type
+whether or not the configuration is valid.
+"""
+
+import sys
+
+from conv_output_calculator import calculate_output_dimension
+
+
+FIELDS = ["input_h", "input_w", "filter_h", "filter_w", "stride", "padding"]
+RESULT_FIELDS = FIELDS + ["output_h", "output_w", "valid", "features", "error"]
+_OUTPUT_H_COLUMN = RESULT_FIELDS.index("output_h")
+_OUTPUT_W_COLUMN = RESULT_FIELDS.index("output_w")
+_VALID_COLUMN = RESULT_FIELDS.index("valid")
+
+
+def _parse_field(record, name):
+    """Read one field from a record and check its range."""
+    value = record.get(name)
+    if value is None or value == "":
+        raise ValueError(f"missing {name}")
+    if isinstance(value, bool):
+        raise ValueError(f"{name} is not an integer: {value!r}")
+
+    try:
+        number = int(value)
+    except (OverflowError, TypeError, ValueError):
+        # OverflowError: infinities, e.g. JSON Infinity or 1e400
+        raise ValueError(f"{name} is not an integer: {value!r}")
+    if isinstance(value, float) and value != number:
+        raise ValueError(f"{name} is not an integer: {value!r}")
+
+    if name == "padding":
+        if number < 0:
+            raise ValueError("padding must be a non-negative integer")
+    elif number <= 0:
+        raise ValueError(f"{name} must be a positive integer")
+
+    return number
+
+
+def _parse_fields(record):
+    """Read and validate all FIELDS of a record."""
+    try:
+        values = [record[name] for name in FIELDS]
+        # Fast path for the common case of plain strings or integers;
+        # int() also rejects strings such as "3.5"
+        if all(type(v) is str or type(v) is int for v in values):
+            numbers = [int(v) for v in values]
+            if min(numbers[:5]) > 0 and numbers[5] >= 0:
+                return numbers
+    except (KeyError, ValueError):
+        pass
+
+    # Slow path: find the offending field for the error message
+    return [_parse_field(record, name) for name in FIELDS]
+
+
+def calculate_record(record):
+    """
+    Calculate the result for one configuration record.
+
+    Args:
+        record: Mapping with the keys in FIELDS (values may be strings)
+
+    Returns:
+        Result dictionary with the keys in RESULT_FIELDS
+
+    Raises:
+        ValueError: If a field is missing or out of range
+    """
+    ih, iw, fh, fw, s, p = _parse_fields(record)
+
+    # Same validity rule as visualize_calculation, in integer arithmetic:
+    # the output is a positive integer when the span is non-negative and
+    # divisible by the stride
+    span_h = ih - fh + 2 * p
+    span_w = iw - fw + 2 * p
+    valid = (span_h >= 0 and span_w >= 0
+             and span_h % s == 0 and span_w % s == 0)
+
+    if valid:
+        output_h = span_h // s + 1
+        output_w = span_w // s + 1
+    else:
+        output_h = calculate_output_dimension(ih, fh, s, p)
+        output_w = calculate_output_dimension(iw, fw, s, p)
+
+    return {
+        "input_h": ih, "input_w": iw,
+        "filter_h": fh, "filter_w": fw,
+        "stride": s, "padding": p,
+        "output_h": output_h, "output_w": output_w,
+        "valid": valid,
+        "features": output_h * output_w if valid else 0,
+        "error": None,
+    }
+
+
+def _error_record(line, message):
+    result = dict.fromkeys(RESULT_FIELDS)
+    result["error"] = f"line {line}: {message}"
+    return result
+
+
+def _csv_records(lines):
+    """Yield (line number, record) pairs from CSV lines."""
+    # csv and json are imported on use: with the re module they pull in,
+    # they would be most of this module's import time
+    import csv
+
+    fields = FIELDS
+    for line_no, row in enumerate(csv.reader(lines), 1):
+        if not row or (len(row) == 1 and not row[0].strip()):
+            continue
+        if line_no == 1 and row[0].strip() in FIELDS:
+            fields = [cell.strip() for cell in row]
+            continue
+        if len(row) != len(fields):
+            yield line_no, ValueError(
+                f"expected {len(fields)} columns, got {len(row)}")
+            continue
+        yield line_no, dict(zip(fields, row))
+
+
+def _jsonl_records(lines):
+    """Yield (line number, record) pairs from JSON Lines."""
+    import json
+
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, ValueError(f"invalid JSON: {e.msg}")
+            continue
+        if not isinstance(record, dict):
+            yield line_no, ValueError("expected a JSON object")
+            continue
+        yield line_no, record
+
+
+def stream_results(lines, input_format="csv"):
+    """
+    Calculate results for a stream of input lines.
+
+    Args:
+        lines: Iterable of text lines (e.g. an open file or sys.stdin)
+        input_format: "csv" or "jsonl"
+
+    Yields:
+        One result dictionary per data row, including error records
+    """
+    if input_format == "csv":
+        records = _csv_records(lines)
+    elif input_format == "jsonl":
+        records = _jsonl_records(lines)
+    else:
+        raise ValueError(f"unknown input format: {input_format}")
+
+    for line_no, record in records:
+        if isinstance(record, Exception):
+            yield _error_record(line_no, record)
+            continue
+        try:
+            yield calculate_record(record)
+        except ValueError as e:
+            yield _error_record(line_no, e)
+
+
+def write_results(results, out, output_format="csv"):
+    """
+    Write result dictionaries to a text stream one record at a time.
+
+    The conv_report formats are also accepted; they are rendered as one
+    report once all results are in.
+
+    Returns:
+        (rows written, error rows) counts
+    """
+    rows = errors = 0
+
+    if output_format == "csv":
+        import csv
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(RESULT_FIELDS)
+        for result in results:
+            if result["error"] is None:
+                row = list(result.values())
+                row[_OUTPUT_H_COLUMN] = float(result["output_h"])
+                row[_OUTPUT_W_COLUMN] = float(result["output_w"])
+                row[_VALID_COLUMN] = "true" if result["valid"] else "false"
+            else:
+                row = [""] * (len(RESULT_FIELDS) - 1) + [result["error"]]
+                errors += 1
+            writer.writerow(row)
+            rows += 1
+    elif output_format == "jsonl":
+        import json
+        for result in results:
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            rows += 1
+            errors += result["error"] is not None
+    elif output_format in ("text", "json", "markdown", "quiet"):
+        # Reports are rendered whole, so these formats hold every result
+        from conv_report import write_report
+        results = list(results)
+        write_report(results, output_format, out)
+        rows = len(results)
+        errors = sum(result["error"] is not None for result in results)
+    else:
+        raise ValueError(f"unknown output format: {output_format}")
+
+    return rows, errors
+
+
+def run_batch(source="-", input_format="csv", output_format=None, out=None):
+    """
+    Run the calculator over every configuration in source.
+
+    Args:
+        source: Input file path, or "-" for stdin
+        input_format: "csv" or "jsonl"
+        output_format: "csv" or "jsonl" (defaults to input_format), or a
+            conv_report format ("text", "json", "markdown", "quiet")
+        out: Text stream for results (defaults to stdout)
+
+    Returns:
+        (rows written, error rows) counts
+    """
+    if output_format is None:
+        output_format = input_format
+    if out is None:
+        out = sys.stdout
+
+    if source == "-":
+        return write_results(stream_results(sys.stdin, input_format),
+                             out, output_format)
+
+    with open(source, newline="", encoding="utf-8") as f:
+        return write_results(stream_results(f, input_format),
+                             out, output_format)
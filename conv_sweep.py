@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Multi-core Parameter Sweep
+
+Evaluates every combination of input size, filter, stride and padding on a
+grid, using batch_calculate from conv_batch on a process pool.
+
+The grid is split into contiguous chunks of its flattened (C-order) index.
+Each worker writes its chunk straight into a memory-mapped result file, so
+only chunk bounds travel between processes and rows are never pickled. The
+result order is the grid order, however the chunks are scheduled.
+"""
+
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from conv_batch import batch_calculate
+
+
+RESULT_DTYPE = np.dtype([
+    ("output_h", np.float64),
+    ("output_w", np.float64),
+    ("valid", np.bool_),
+    ("features", np.int64),
+])
+
+DEFAULT_CHUNK_SIZE = 1 << 18
+
+# Per-worker state, set by _init_worker
+_worker_axes = None
+_worker_results = None
+
+
+def _init_worker(path, axes):
+    global _worker_axes, _worker_results
+    _worker_axes = axes
+    _worker_results = np.lib.format.open_memmap(path, mode="r+")
+
+
+def _run_chunk(start, stop, axes=None, results=None):
+    """Calculate grid positions [start, stop) into the flat result array."""
+    if axes is None:
+        axes, results = _worker_axes, _worker_results
+
+    shape = tuple(len(axis) for axis in axes)
+    coords = np.unravel_index(np.arange(start, stop), shape)
+    columns = [axis[c] for axis, c in zip(axes, coords)]
+
+    result = batch_calculate(*columns)
+
+    chunk = results[start:stop]
+    for name in RESULT_DTYPE.names:
+        chunk[name] = result[name]
+
+    return stop - start
+
+
+def print_progress(done, total):
+    """Default progress reporter: a single updating line on stderr."""
+    percent = 100 * done / total if total else 100
+    sys.stderr.write(f"\r  Sweep progress: {percent:5.1f}% ({done:,}/{total:,})")
+    if done == total:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+
+def sweep(input_h, input_w, filter_h, filter_w, stride, padding,
+          workers=None, chunk_size=DEFAULT_CHUNK_SIZE, out=None,
+          progress=None):
+    """
+    Evaluate every configuration on a parameter grid.
+
+    Args:
+        input_h, input_w, filter_h, filter_w, stride, padding:
+            Values for each grid axis (a scalar, list, range or array)
+        workers: Number of worker processes (default: CPU count; 1 runs
+            in the current process)
+        chunk_size: Grid positions per chunk
+        out: Path of a .npy file to keep the results in. If omitted, a
+            temporary file is used and the results are returned in memory.
+        progress: Callable progress(done, total) called as chunks finish,
+            e.g. print_progress
+
+    Returns:
+        Structured array of RESULT_DTYPE with one axis per parameter, so
+        result[i, j, k, l, m, n] belongs to the i-th input_h, j-th input_w,
+        and so on. When out is given this is a memory map of that file.
+    """
+    axes = [np.atleast_1d(np.asarray(values, dtype=np.int64)).ravel()
+            for values in (input_h, input_w, filter_h, filter_w, stride, padding)]
+    shape = tuple(len(axis) for axis in axes)
+    total = int(np.prod(shape))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = out if out is not None else os.path.join(tmp, "sweep.npy")
+        results = np.lib.format.open_memmap(
+            path, mode="w+", dtype=RESULT_DTYPE, shape=(total,)
+        )
+
+        chunks = [(start, min(start + chunk_size, total))
+                  for start in range(0, total, chunk_size)]
+        done = 0
+
+        if workers == 1 or len(chunks) <= 1:
+            for start, stop in chunks:
+                done += _run_chunk(start, stop, axes, results)
+                if progress:
+                    progress(done, total)
+        else:
+            results.flush()
+            with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=(path, axes)) as pool:
+                futures = [pool.submit(_run_chunk, start, stop)
+                           for start, stop in chunks]
+                for future in as_completed(futures):
+                    done += future.result()
+                    if progress:
+                        progress(done, total)
+
+        if out is not None:
+            results.flush()
+            return results.reshape(shape)
+
+        return np.array(results).reshape(shape)
+
+
+if __name__ == "__main__":
+    grid = sweep(
+        input_h=range(1, 129), input_w=range(1, 129),
+        filter_h=range(1, 16), filter_w=3,
+        stride=range(1, 9), padding=range(0, 5),
+        progress=print_progress,
+    )
+
+    print("\n" + "="*60)
+    print("PARAMETER SWEEP")
+    print("="*60)
+    print(f"\n  Configurations:        {grid.size:,}")
+    print(f"  Valid configurations:  {int(grid['valid'].sum()):,}")
+    print("="*60 + "\n")
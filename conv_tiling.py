@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Memory-Budgeted Tiled Convolution
+
+Convolves images too large to hold in memory by splitting the output into
+tiles and computing each tile from just the part of the input it needs.
+
+For a tile covering output rows [OY0, OY1), the filter windows cover padded
+input rows [OY0 × Stride, (OY1 - 1) × Stride + Filter), which is the
+formula of calculate_output_dimension solved for the input. Neighbouring
+tiles therefore overlap by a halo of (Filter - Stride) input rows (none if
+Stride >= Filter), and tiles at the image border get their share of the
+zero padding. Columns work the same way.
+
+plan_tiles picks the largest tiles whose estimated working memory fits a
+budget, preferring full-width tiles so each one is a contiguous read of a
+row-major image. convolve_tiled streams the tiles from a (memory-mapped)
+input through conv_engine.convolve into a (memory-mapped) output, so peak
+memory depends on the tile size, not the image size.
+
+Layouts are those of conv_engine: image (H, W), (C, H, W) or (N, C, H, W).
+"""
+
+from collections import namedtuple
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from conv_engine import _as_batch, convolve, output_shape
+
+
+DEFAULT_MEMORY_BUDGET = 256 * 2**20
+
+
+TilePlan = namedtuple(
+    "TilePlan",
+    ["input_h", "input_w", "filter_h", "filter_w", "stride", "padding",
+     "output_h", "output_w", "tile_h", "tile_w", "peak_bytes"],
+)
+TilePlan.__doc__ = """
+How an image is split into tiles.
+
+Fields:
+    input_h, input_w, filter_h, filter_w, stride, padding:
+        Convolution parameters
+    output_h, output_w: Full output size
+    tile_h, tile_w: Output size of a tile (edge tiles may be smaller)
+    peak_bytes: Estimated working memory of one full tile
+"""
+
+Tile = namedtuple(
+    "Tile",
+    ["out_y0", "out_y1", "out_x0", "out_x1",
+     "in_y0", "in_y1", "in_x0", "in_x1",
+     "pad_top", "pad_bottom", "pad_left", "pad_right"],
+)
+Tile.__doc__ = """
+One tile: an output region, the input region it reads, and the zero
+padding to add on each side where the region extends past the image.
+"""
+
+
+def tile_memory(tile_h, tile_w, filter_h, filter_w, stride, batch, channels,
+                out_channels, itemsize, algorithm="direct"):
+    """
+    Estimate the working memory of convolving one tile.
+
+    direct: the input tile and its padded copy, the im2col matrix that
+            tensordot builds from the window view, and the output with
+            its transposed copy.
+    fft:    the padded input tile, the input, kernel and output spectra
+            with one copy each for the batched matmul, and the full
+            stride-1 result before subsampling.
+
+    "auto" gives the larger of the two; it also bounds "winograd", whose
+    transformed tiles are smaller than the im2col matrix of a 3×3 filter.
+
+    Returns:
+        Estimated bytes
+    """
+    in_h = (tile_h - 1) * stride + filter_h
+    in_w = (tile_w - 1) * stride + filter_w
+    input_bytes = 2 * batch * channels * in_h * in_w * itemsize
+    output_bytes = 2 * batch * out_channels * tile_h * tile_w * itemsize
+
+    direct = (input_bytes + output_bytes
+              + batch * tile_h * tile_w * channels * filter_h * filter_w * itemsize)
+    if algorithm == "direct":
+        return direct
+
+    spectrum = in_h * (in_w // 2 + 1) * 2 * itemsize
+    fft = (input_bytes + output_bytes
+           + 2 * spectrum * (batch * channels + out_channels * channels
+                             + batch * out_channels)
+           + batch * out_channels * in_h * in_w * itemsize)
+    if algorithm == "fft":
+        return fft
+    return max(direct, fft)
+
+
+def plan_tiles(image_shape, kernel_shape, stride=1, padding=0,
+               memory_budget=DEFAULT_MEMORY_BUDGET, dtype="float32",
+               algorithm="auto"):
+    """
+    Choose a tile size for convolving an image under a memory budget.
+
+    Args:
+        image_shape, kernel_shape: Array shapes (any layout conv2d accepts)
+        stride, padding: Convolution parameters
+        memory_budget: Bytes of working memory one tile may use
+        dtype: Computation dtype
+        algorithm: "auto" or one of conv_engine.ALGORITHMS, as for convolve
+
+    Returns:
+        TilePlan
+
+    Raises:
+        ValueError: If the configuration is invalid or not even a single
+            output pixel fits the budget
+    """
+    image_shape = (1,) * (4 - len(image_shape)) + tuple(image_shape)
+    kernel_shape = (1,) * (4 - len(kernel_shape)) + tuple(kernel_shape)
+    batch, channels, input_h, input_w = image_shape
+    out_channels, _, filter_h, filter_w = kernel_shape
+    itemsize = np.dtype(dtype).itemsize
+
+    output_h, output_w = output_shape(input_h, input_w, filter_h, filter_w,
+                                      stride, padding)
+
+    def memory(tile_h, tile_w):
+        return tile_memory(tile_h, tile_w, filter_h, filter_w, stride, batch,
+                           channels, out_channels, itemsize, algorithm)
+
+    def largest(limit, fits):
+        # Largest n in [1, limit] with fits(n), or 0; fits is monotonic
+        lo, hi = 0, limit
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if fits(mid):
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+
+    # Full-width tiles if a single row fits, otherwise square tiles
+    tile_w = output_w
+    tile_h = largest(output_h, lambda n: memory(n, tile_w) <= memory_budget)
+    if tile_h == 0:
+        side = largest(min(output_h, output_w),
+                       lambda n: memory(n, n) <= memory_budget)
+        if side == 0:
+            raise ValueError(
+                f"memory budget of {memory_budget:,} bytes is too small for "
+                f"a single output pixel ({memory(1, 1):,} bytes)"
+            )
+        tile_h = tile_w = side
+
+    return TilePlan(input_h, input_w, filter_h, filter_w, stride, padding,
+                    output_h, output_w, tile_h, tile_w,
+                    memory(tile_h, tile_w))
+
+
+def _axis_tiles(output_dim, tile, input_dim, filter_dim, stride, padding):
+    """Output ranges, input ranges and border padding along one axis."""
+    for out0 in range(0, output_dim, tile):
+        out1 = min(out0 + tile, output_dim)
+        start = out0 * stride - padding
+        stop = (out1 - 1) * stride + filter_dim - padding
+        # A tile may lie entirely in the padding, before or past the image;
+        # then its input range is empty and the padding covers all of it
+        in0 = min(max(start, 0), input_dim)
+        in1 = max(min(stop, input_dim), in0)
+        before = max(min(in0, stop) - start, 0)
+        after = (stop - start) - (in1 - in0) - before
+        yield out0, out1, in0, in1, before, after
+
+
+def iter_tiles(plan):
+    """Yield the Tiles of a plan in row-major order."""
+    rows = list(_axis_tiles(plan.output_h, plan.tile_h, plan.input_h,
+                            plan.filter_h, plan.stride, plan.padding))
+    cols = list(_axis_tiles(plan.output_w, plan.tile_w, plan.input_w,
+                            plan.filter_w, plan.stride, plan.padding))
+    for oy0, oy1, iy0, iy1, top, bottom in rows:
+        for ox0, ox1, ix0, ix1, left, right in cols:
+            yield Tile(oy0, oy1, ox0, ox1, iy0, iy1, ix0, ix1,
+                       top, bottom, left, right)
+
+
+def tile_count(plan):
+    """Number of tiles in a plan."""
+    return (-(-plan.output_h // plan.tile_h)) * (-(-plan.output_w // plan.tile_w))
+
+
+def convolve_tiled(image, kernel, stride=1, padding=0, bias=None, out=None,
+                   memory_budget=DEFAULT_MEMORY_BUDGET, algorithm="auto",
+                   progress=None):
+    """
+    Convolve an image tile by tile under a memory budget.
+
+    Args:
+        image: Input array, typically a read-only memory map, or the path
+            of a .npy file to memory-map
+        kernel, stride, padding, bias: As for conv_engine.conv2d
+        out: Path of a .npy file to write the result to as a memory map,
+            or an array of the output shape to fill; if omitted the result
+            is returned in memory
+        memory_budget: Bytes of working memory per tile, see plan_tiles
+        algorithm: "auto" or one of conv_engine.ALGORITHMS, as for convolve
+        progress: Callable progress(done, total) called after every tile
+
+    Returns:
+        The output array (the memory map when out is a path)
+    """
+    if isinstance(image, (str, os.PathLike)):
+        image = np.load(image, mmap_mode="r")
+
+    # Views only: nothing is read from a memory-mapped image here
+    x, w, image_ndim = _as_batch(image, kernel)
+    dtype = np.result_type(x.dtype, w.dtype, np.float32)
+
+    plan = plan_tiles(x.shape, w.shape, stride, padding, memory_budget,
+                      dtype, algorithm)
+    # The output follows the image layout, as in conv_engine
+    full_shape = (x.shape[0], w.shape[0], plan.output_h, plan.output_w)
+    shape = full_shape[4 - image_ndim:]
+
+    if out is None:
+        result = np.empty(shape, dtype=dtype)
+    elif isinstance(out, (str, os.PathLike)):
+        result = np.lib.format.open_memmap(out, mode="w+", dtype=dtype,
+                                           shape=shape)
+    else:
+        result = out
+        if result.shape != shape:
+            raise ValueError(f"out has shape {result.shape}, expected {shape}")
+
+    result4 = result.reshape(full_shape)
+    total = tile_count(plan)
+
+    for done, tile in enumerate(iter_tiles(plan), 1):
+        block = np.asarray(x[:, :, tile.in_y0:tile.in_y1, tile.in_x0:tile.in_x1],
+                           dtype=dtype)
+        if tile.pad_top or tile.pad_bottom or tile.pad_left or tile.pad_right:
+            block = np.pad(block, ((0, 0), (0, 0),
+                                   (tile.pad_top, tile.pad_bottom),
+                                   (tile.pad_left, tile.pad_right)))
+        result4[:, :, tile.out_y0:tile.out_y1, tile.out_x0:tile.out_x1] = \
+            convolve(block, w, stride, 0, bias, algorithm=algorithm)
+        del block
+        if progress:
+            progress(done, total)
+
+    if isinstance(result, np.memmap):
+        result.flush()
+    return result
+
+
+def print_plan(plan):
+    """Print a summary of a tile plan."""
+    print("\n" + "="*60)
+    print("TILE PLAN")
+    print("="*60)
+    print(f"\n  Input:        {plan.input_h} × {plan.input_w}")
+    print(f"  Filter:       {plan.filter_h} × {plan.filter_w}"
+          f"  (stride {plan.stride}, padding {plan.padding})")
+    print(f"  Output:       {plan.output_h} × {plan.output_w}")
+    print(f"  Tile:         {plan.tile_h} × {plan.tile_w} outputs"
+          f"  ({tile_count(plan)} tiles)")
+    print(f"  Halo:         {max(plan.filter_h - plan.stride, 0)} rows,"
+          f" {max(plan.filter_w - plan.stride, 0)} columns")
+    print(f"  Peak memory:  ~{plan.peak_bytes / 2**20:.1f} MiB per tile")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "image.npy")
+        image = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32,
+                                          shape=(3, 2048, 2048))
+        for y in range(0, 2048, 256):
+            image[:, y:y + 256] = np.random.rand(3, 256, 2048)
+        image.flush()
+        del image
+
+        kernel = np.random.rand(8, 3, 3, 3).astype(np.float32)
+        budget = 32 * 2**20
+        print_plan(plan_tiles((3, 2048, 2048), kernel.shape, stride=1,
+                              padding=1, memory_budget=budget))
+
+        start = time.perf_counter()
+        result = convolve_tiled(path, kernel, stride=1, padding=1,
+                                out=os.path.join(tmp, "output.npy"),
+                                memory_budget=budget)
+        print(f"  Output {result.shape} in {time.perf_counter() - start:.2f} s\n")
+        del result
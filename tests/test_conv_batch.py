@@ -0,0 +1,91 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from conv_batch import (batch_calculate, output_sizes,
+                        transposed_output_sizes, valid_output_mask)
+from conv_output_calculator import (calculate_output_dimension, output_size,
+                                    transposed_output_size)
+
+
+def _columns(count, seed=0):
+    rng = random.Random(seed)
+    rows = [(rng.randint(1, 300), rng.randint(1, 300), rng.randint(1, 11),
+             rng.randint(1, 11), rng.randint(1, 6), rng.randint(0, 6),
+             rng.randint(1, 3))
+            for _ in range(count)]
+    return rows, [np.array(column) for column in zip(*rows)]
+
+
+def test_batch_calculate_matches_scalar():
+    rows, columns = _columns(5000)
+    result = batch_calculate(*columns[:6])
+    for i, (ih, iw, fh, fw, s, p, _) in enumerate(rows):
+        output_h = calculate_output_dimension(ih, fh, s, p)
+        output_w = calculate_output_dimension(iw, fw, s, p)
+        valid = (output_h > 0 and output_h.is_integer()
+                 and output_w > 0 and output_w.is_integer())
+        assert result["output_h"][i] == output_h
+        assert result["output_w"][i] == output_w
+        assert result["valid"][i] == valid
+        assert result["features"][i] == (output_h * output_w if valid else 0)
+
+
+def test_batch_calculate_dilation_matches_integer_core():
+    rows, columns = _columns(2000, seed=1)
+    result = batch_calculate(*columns)
+    for i, (ih, iw, fh, fw, s, p, d) in enumerate(rows):
+        size_h, rem_h = output_size(ih, fh, s, p, d)
+        size_w, rem_w = output_size(iw, fw, s, p, d)
+        valid = rem_h == 0 and rem_w == 0 and size_h > 0 and size_w > 0
+        assert result["valid"][i] == valid
+        assert result["features"][i] == (size_h * size_w if valid else 0)
+
+
+def test_batch_calculate_broadcasts_scalars():
+    result = batch_calculate(np.arange(1, 65), 64, 3, 3, 1, 1)
+    assert result["output_h"].shape == (64,)
+    assert result["output_h"][31] == 32.0
+    assert result["features"][-1] == 64 * 64
+
+
+@pytest.mark.parametrize("padding", [0, 2, "same", "valid", (1, 2)])
+@pytest.mark.parametrize("ceil_mode", [False, True])
+def test_output_sizes_matches_output_size(padding, ceil_mode):
+    configs = list(itertools.product(range(1, 20), range(1, 6), range(1, 4),
+                                     range(1, 3)))
+    input_dim, filter_dim, stride, dilation = map(np.array, zip(*configs))
+    if isinstance(padding, tuple):
+        outputs, remainders = output_sizes(
+            input_dim, filter_dim, stride, padding[0], dilation, ceil_mode,
+            padding_after=padding[1])
+    else:
+        outputs, remainders = output_sizes(input_dim, filter_dim, stride,
+                                           padding, dilation, ceil_mode)
+    for i, config in enumerate(configs):
+        i_dim, f_dim, s, d = config
+        assert (outputs[i], remainders[i]) == output_size(
+            i_dim, f_dim, s, padding, d, ceil_mode)
+
+
+def test_valid_output_mask_matches_scalar():
+    rows, columns = _columns(2000, seed=2)
+    mask = valid_output_mask(columns[0], columns[2], columns[4], columns[5],
+                             columns[6])
+    for i, (ih, _, fh, _, s, p, d) in enumerate(rows):
+        output, remainder = output_size(ih, fh, s, p, d)
+        assert mask[i] == (remainder == 0 and output > 0)
+
+
+def test_transposed_output_sizes_matches_scalar():
+    configs = list(itertools.product(range(1, 10), range(1, 5), range(1, 4),
+                                     range(0, 3)))
+    input_dim, filter_dim, stride, padding = map(np.array, zip(*configs))
+    outputs = transposed_output_sizes(input_dim, filter_dim, stride, padding)
+    for i, config in enumerate(configs):
+        assert outputs[i] == transposed_output_size(*config)
+
+    with pytest.raises(ValueError):
+        transposed_output_sizes(8, 3, 2, 0, output_padding=2)
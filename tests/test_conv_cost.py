@@ -0,0 +1,76 @@
+import numpy as np
+
+from conv_cost import layer_costs, network_costs
+from conv_network import ConvNetwork, conv_layer, pool_layer
+
+
+def test_layer_costs_matches_formula():
+    costs = layer_costs(32, 32, 3, 3, 1, 1, 16, 32, batch=2, dtype="float16")
+    assert costs["valid"]
+    assert costs["macs"] == 2 * 32 * 32 * 3 * 3 * 16 * 32
+    assert costs["params"] == 3 * 3 * 16 * 32 + 32
+    assert costs["output_bytes"] == 2 * 32 * 32 * 32 * 2
+
+
+def test_layer_costs_invalid_configuration_costs_nothing():
+    costs = layer_costs(10, 10, 3, 3, 2, 0, 3, 8)
+    assert not costs["valid"]
+    assert costs["macs"] == 0
+    assert np.isnan(costs["intensity"])
+
+
+def test_layer_costs_dilation():
+    costs = layer_costs(64, 64, 3, 3, 1, 2, 3, 8, dilation=2)
+    assert costs["valid"]
+    assert costs["output_h"] == 64
+    assert costs["macs"] == 64 * 64 * 3 * 3 * 3 * 8
+
+
+def test_network_costs_dilated_layer():
+    network = ConvNetwork((3, 64, 64), [
+        conv_layer(3, padding=2, dilation=2, out_channels=8),
+    ])
+    per_layer, totals = network_costs(network)
+    assert per_layer["output_h"].tolist() == [64]
+    assert totals["macs"] == 884736
+
+
+def test_network_costs_dilation_can_make_layer_valid():
+    # Valid only with dilation 2: 11 + 0 - 5 = 6, divisible by stride 2
+    network = ConvNetwork((3, 11, 11), [
+        conv_layer(3, stride=2, dilation=2, out_channels=4),
+    ])
+    assert network.output_shape() == (4, 4, 4)
+    per_layer, totals = network_costs(network)
+    assert per_layer["valid"].tolist() == [True]
+    assert totals["macs"] == 4 * 4 * 3 * 3 * 3 * 4
+
+
+def test_network_costs_pooling_has_no_macs():
+    network = ConvNetwork((3, 32, 32), [
+        conv_layer(3, padding=1, out_channels=8),
+        pool_layer(2),
+    ])
+    per_layer, totals = network_costs(network)
+    assert per_layer["macs"][1] == 0
+    assert per_layer["params"][1] == 0
+    assert totals["macs"] == per_layer["macs"][0]
+
+
+def test_network_costs_same_and_pair_padding():
+    same = ConvNetwork((3, 32, 32), [conv_layer(3, padding="same",
+                                                out_channels=8)])
+    symmetric = ConvNetwork((3, 32, 32), [conv_layer(3, padding=1,
+                                                     out_channels=8)])
+    for key, value in network_costs(symmetric)[1].items():
+        assert network_costs(same)[1][key] == value
+
+    # 32 → 16 with the odd extra padding row and column after the input
+    for padding in ["same", (0, 1)]:
+        network = ConvNetwork((3, 32, 32), [
+            conv_layer(3, stride=2, padding=padding, out_channels=8)])
+        per_layer, totals = network_costs(network)
+        assert network.output_shape() == (8, 16, 16)
+        assert totals["macs"] == 16 * 16 * 3 * 3 * 3 * 8
+        assert per_layer["input_bytes"][0] == 3 * 32 * 32 * 4
+        assert per_layer["output_bytes"][0] == 8 * 16 * 16 * 4
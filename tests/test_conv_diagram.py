@@ -0,0 +1,70 @@
+import sys
+import xml.etree.ElementTree as ElementTree
+
+import pytest
+
+from conv_diagram import main, record_layout, render_diagrams, render_png, render_svg
+from conv_report import report_record
+
+
+RECORDS = [report_record(32, 32, 3, 3, 1, 1), report_record(10, 10, 3, 3, 2, 0)]
+
+
+@pytest.fixture
+def no_pillow(monkeypatch):
+    # A None entry makes "import PIL" raise ImportError
+    monkeypatch.setitem(sys.modules, "PIL", None)
+
+
+def test_render_svg_is_well_formed():
+    for record in RECORDS:
+        root = ElementTree.fromstring(render_svg(record_layout(record)))
+        assert root.tag.endswith("svg")
+
+
+def test_render_diagrams_writes_one_file_per_record(tmp_path):
+    written = render_diagrams(RECORDS, str(tmp_path), workers=1)
+    assert written == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "layer_00000.svg", "layer_00001.svg"]
+
+
+def test_render_png():
+    pytest.importorskip("PIL")
+    data = render_png(record_layout(RECORDS[0]), 200, 150)
+    assert data.startswith(b"\x89PNG\r\n\x1a\n")
+
+
+def test_render_diagrams_png(tmp_path):
+    pytest.importorskip("PIL")
+    assert render_diagrams(RECORDS, str(tmp_path), "png", workers=1) == 2
+    assert (tmp_path / "layer_00000.png").read_bytes().startswith(b"\x89PNG")
+
+
+def test_png_without_pillow_raises_import_error(tmp_path, no_pillow):
+    with pytest.raises(ImportError, match="Pillow"):
+        render_diagrams(RECORDS, str(tmp_path), "png", workers=1)
+
+
+def test_main_png_without_pillow_exits_cleanly(tmp_path, no_pillow, capsys):
+    source = tmp_path / "layers.csv"
+    source.write_text("32,32,3,3,1,1\n")
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(source), "--format", "png", "--out", str(tmp_path / "out")])
+    assert exit_info.value.code == 2
+    err = capsys.readouterr().err
+    assert "error: PNG diagrams need Pillow" in err
+    assert "Traceback" not in err
+
+
+def test_render_png_without_system_fonts(monkeypatch):
+    pytest.importorskip("PIL")
+    import conv_diagram
+
+    monkeypatch.setattr(conv_diagram, "PNG_FONTS", ("missing.ttf",) * 2)
+    conv_diagram._png_font.cache_clear()
+    try:
+        data = render_png(record_layout(RECORDS[1]), 200, 150)
+    finally:
+        conv_diagram._png_font.cache_clear()
+    assert data.startswith(b"\x89PNG\r\n\x1a\n")
@@ -0,0 +1,134 @@
+import numpy as np
+import pytest
+
+from conv_engine import (ALGORITHMS, check_winograd, conv2d, conv2d_fft,
+                         conv2d_winograd, convolve, output_shape,
+                         select_algorithm)
+from conv_tiling import convolve_tiled
+
+
+def _reference(image, kernel, stride, padding, bias=None):
+    """Plain loop convolution (cross-correlation) in float64."""
+    image = np.pad(image.astype(np.float64),
+                   ((0, 0), (0, 0), (padding, padding), (padding, padding)))
+    batch, _, height, width = image.shape
+    out_channels, _, filter_h, filter_w = kernel.shape
+    output_h = (height - filter_h) // stride + 1
+    output_w = (width - filter_w) // stride + 1
+    out = np.zeros((batch, out_channels, output_h, output_w))
+    for y in range(output_h):
+        for x in range(output_w):
+            window = image[:, :, y * stride:y * stride + filter_h,
+                           x * stride:x * stride + filter_w]
+            out[:, :, y, x] = np.tensordot(window, kernel,
+                                           axes=([1, 2, 3], [1, 2, 3]))
+    if bias is not None:
+        out += np.asarray(bias)[:, None, None]
+    return out
+
+
+def _case(rng, batch, channels, out_channels, size, filter_dim,
+          dtype=np.float64):
+    image = rng.standard_normal((batch, channels, size, size)).astype(dtype)
+    kernel = rng.standard_normal((out_channels, channels, filter_dim,
+                                  filter_dim)).astype(dtype)
+    return image, kernel
+
+
+# (size, filter, stride, padding), all valid configurations
+CONFIGS = [(8, 3, 1, 1), (9, 3, 2, 1), (10, 5, 1, 2), (12, 5, 3, 1),
+           (7, 1, 2, 0), (12, 7, 1, 3), (6, 6, 1, 0)]
+
+
+@pytest.mark.parametrize("size, filter_dim, stride, padding", CONFIGS)
+@pytest.mark.parametrize("algorithm", ["direct", "fft"])
+def test_matches_reference(algorithm, size, filter_dim, stride, padding):
+    rng = np.random.default_rng(size * 31 + filter_dim)
+    image, kernel = _case(rng, 2, 3, 4, size, filter_dim)
+    bias = rng.standard_normal(4)
+    out = ALGORITHMS[algorithm](image, kernel, stride, padding, bias)
+    np.testing.assert_allclose(out, _reference(image, kernel, stride, padding,
+                                               bias), rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("tile", [2, 4])
+@pytest.mark.parametrize("size, padding", [(8, 1), (9, 0), (13, 2), (5, 1)])
+def test_winograd_matches_direct(tile, size, padding):
+    rng = np.random.default_rng(size + tile)
+    image, kernel = _case(rng, 2, 3, 5, size, 3)
+    bias = rng.standard_normal(5)
+    np.testing.assert_allclose(
+        conv2d_winograd(image, kernel, 1, padding, bias, tile=tile),
+        conv2d(image, kernel, 1, padding, bias), rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("tile", [None, 2, 4])
+def test_winograd_float32_within_tolerance(tile):
+    rng = np.random.default_rng(0)
+    image, kernel = _case(rng, 2, 16, 8, 20, 3, np.float32)
+    check = check_winograd(image, kernel, padding=1, tile=tile)
+    assert check.ok, check
+
+
+def test_winograd_rejects_other_filters():
+    rng = np.random.default_rng(0)
+    image, kernel = _case(rng, 1, 1, 1, 8, 5)
+    with pytest.raises(ValueError):
+        conv2d_winograd(image, kernel, 1, 2)
+
+
+def test_unbatched_layouts():
+    rng = np.random.default_rng(1)
+    image = rng.standard_normal((10, 10))
+    kernel = rng.standard_normal((3, 3))
+    expected = _reference(image[None, None], kernel[None, None], 1, 1)[0, 0]
+    for algorithm in ALGORITHMS:
+        out = convolve(image, kernel, 1, 1, algorithm=algorithm)
+        assert out.shape == (10, 10)
+        np.testing.assert_allclose(out, expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("image_shape, kernel_shape, expected", [
+    ((8, 64, 56, 56), (64, 64, 3, 3), "winograd"),
+    ((1, 3, 256, 256), (8, 3, 31, 31), "fft"),
+    ((1, 3, 32, 32), (8, 3, 1, 1), "direct"),
+])
+def test_select_algorithm(image_shape, kernel_shape, expected):
+    padding = (kernel_shape[-1] - 1) // 2
+    assert select_algorithm(image_shape, kernel_shape, 1,
+                            padding).algorithm == expected
+
+
+def test_auto_matches_every_algorithm():
+    rng = np.random.default_rng(2)
+    image, kernel = _case(rng, 2, 4, 4, 16, 3)
+    out, choice = convolve(image, kernel, 1, 1, return_choice=True)
+    assert choice.algorithm in ALGORITHMS
+    for algorithm in ALGORITHMS:
+        np.testing.assert_allclose(
+            convolve(image, kernel, 1, 1, algorithm=algorithm), out,
+            rtol=1e-9, atol=1e-9)
+
+
+def test_fft_strided_matches_direct():
+    rng = np.random.default_rng(3)
+    image, kernel = _case(rng, 1, 2, 3, 33, 9)
+    np.testing.assert_allclose(conv2d_fft(image, kernel, 4, 0),
+                               conv2d(image, kernel, 4, 0),
+                               rtol=1e-9, atol=1e-9)
+
+
+def test_output_shape_rejects_invalid_configurations():
+    assert output_shape(32, 32, 3, 3, 1, 1) == (32, 32)
+    with pytest.raises(ValueError):
+        output_shape(10, 10, 3, 3, 2, 0)
+    with pytest.raises(ValueError):
+        conv2d(np.zeros((1, 1, 10, 10)), np.zeros((1, 1, 3, 3)), 2, 0)
+
+
+def test_tiled_matches_direct():
+    rng = np.random.default_rng(4)
+    image, kernel = _case(rng, 2, 3, 4, 40, 5)
+    out = convolve_tiled(image, kernel, 1, 2, memory_budget=64 * 1024)
+    np.testing.assert_allclose(out, conv2d(image, kernel, 1, 2),
+                               rtol=1e-9, atol=1e-9)
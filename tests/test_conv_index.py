@@ -0,0 +1,80 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from conv_index import ConfigIndex, build_index
+from conv_output_calculator import output_size
+
+
+BOUNDS = {"max_input": 40, "max_filter": 6, "max_stride": 4, "max_padding": 3}
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    path = tmp_path_factory.mktemp("index") / "index.npy"
+    nbytes = build_index(str(path), **BOUNDS)
+    assert nbytes == 40 * 6 * 4 * 4 * 2
+    return ConfigIndex(str(path))
+
+
+def _expected(input_dim, filter_dim, stride, padding):
+    output, remainder = output_size(input_dim, filter_dim, stride, padding)
+    return output if remainder == 0 and output > 0 else None
+
+
+def test_domain(index):
+    assert (index.max_input, index.max_filter, index.max_stride,
+            index.max_padding) == (40, 6, 4, 3)
+    assert index.covers(40, 6, 4, 3)
+    assert not index.covers(41, 1, 1, 0)
+    assert not index.covers(1, 1, 5, 0)
+    assert not index.covers(1, 1, 1, 4)
+
+
+def test_output_matches_output_size(index):
+    # Inside the domain and past every bound, where it calculates directly
+    for config in itertools.product(range(1, 46), range(1, 9), range(1, 7),
+                                    range(0, 6)):
+        assert index.output(*config) == _expected(*config)
+
+
+def test_lookup(index):
+    assert index.lookup(32, 32, 3, 3, 1, 1) == (32, 32)
+    assert index.lookup(32, 31, 3, 3, 2, 1) is None
+    assert index.lookup(64, 32, 3, 3, 2, 1) is None
+    assert index.lookup(100, 101, 3, 4, 1, 0) == (98, 98)
+
+
+@pytest.mark.parametrize("input_dim", [1, 7, 24, 40, 41, 97])
+@pytest.mark.parametrize("filter_dim", [1, 3, 6, 8])
+def test_range_queries_match_output_size(index, input_dim, filter_dim):
+    strides = range(1, index.max_stride + 1)
+    paddings = range(0, index.max_padding + 1)
+
+    for padding in list(paddings) + [5]:
+        assert index.valid_strides(input_dim, filter_dim, padding).tolist() == [
+            s for s in strides if _expected(input_dim, filter_dim, s, padding)]
+    for stride in list(strides) + [6]:
+        assert index.valid_paddings(input_dim, filter_dim, stride).tolist() == [
+            p for p in paddings if _expected(input_dim, filter_dim, stride, p)]
+
+    found = set(zip(*(np.asarray(a).tolist()
+                      for a in index.valid_configs(input_dim, filter_dim))))
+    assert found == {
+        (s, p, _expected(input_dim, filter_dim, s, p))
+        for s in strides for p in paddings
+        if _expected(input_dim, filter_dim, s, p)
+    }
+
+
+def test_opening_is_lazy(tmp_path):
+    index = ConfigIndex(str(tmp_path / "missing.npy"))
+    with pytest.raises(FileNotFoundError):
+        index.output(8, 3, 1, 1)
+
+
+def test_outputs_must_fit_the_table_dtype(tmp_path):
+    with pytest.raises(ValueError, match="don't fit"):
+        build_index(str(tmp_path / "big.npy"), max_input=70000, max_filter=1,
+                    max_stride=1, max_padding=0)
@@ -0,0 +1,103 @@
+import random
+
+import numpy as np
+import pytest
+
+from conv_lod import (average_coverage, max_coverage, plan_frame,
+                      window_count, windows_overlapping)
+
+
+def _coverage_map(padded_h, padded_w, filter_h, filter_w, stride):
+    """Number of windows covering each pixel of the padded plane."""
+    coverage = np.zeros((padded_h, padded_w), dtype=np.int64)
+    for i in range(window_count(padded_h, filter_h, stride)):
+        for j in range(window_count(padded_w, filter_w, stride)):
+            coverage[i * stride:i * stride + filter_h,
+                     j * stride:j * stride + filter_w] += 1
+    return coverage
+
+
+def _pixel_weights(lo, hi, size):
+    """Overlap of [lo, hi) with each unit pixel [k, k + 1)."""
+    k = np.arange(size)
+    return np.clip(np.minimum(hi, k + 1) - np.maximum(lo, k), 0, None)
+
+
+# (input_h, input_w, filter_h, filter_w, stride, padding)
+CONFIGS = [(40, 36, 3, 3, 1, 1), (64, 50, 5, 3, 2, 2), (30, 30, 7, 7, 3, 0),
+           (45, 60, 2, 4, 4, 3), (33, 29, 6, 1, 5, 1)]
+
+
+@pytest.mark.parametrize("config", CONFIGS)
+def test_heatmap_matches_full_resolution_coverage(config):
+    input_h, input_w, filter_h, filter_w, stride, padding = config
+    padded_h, padded_w = input_h + 2 * padding, input_w + 2 * padding
+    coverage = _coverage_map(padded_h, padded_w, filter_h, filter_w, stride)
+    peak = max_coverage(filter_h, stride) * max_coverage(filter_w, stride)
+    assert coverage.max() == peak
+
+    rng = random.Random(sum(config))
+    viewports = [(0, 0, padded_w, padded_h)] + [
+        (rng.uniform(-5, padded_w / 2), rng.uniform(-5, padded_h / 2),
+         rng.uniform(padded_w / 2 + 1, padded_w + 5),
+         rng.uniform(padded_h / 2 + 1, padded_h + 5))
+        for _ in range(5)
+    ]
+    for viewport in viewports:
+        plan = plan_frame(*config, viewport, (800, 600), max_windows=0)
+        assert plan["mode"] == "heatmap"
+        for x0, y0, x1, y1, density in plan["cells"]:
+            weights = np.outer(_pixel_weights(y0, y1, padded_h),
+                               _pixel_weights(x0, x1, padded_w))
+            expected = (weights * coverage).sum() / weights.sum() / peak
+            assert density == pytest.approx(expected, rel=1e-9, abs=1e-12)
+
+
+@pytest.mark.parametrize("config", CONFIGS)
+def test_window_mode_lists_every_intersecting_window(config):
+    input_h, input_w, filter_h, filter_w, stride, padding = config
+    padded_h, padded_w = input_h + 2 * padding, input_w + 2 * padding
+    viewport = (padded_w / 3, padded_h / 4, padded_w / 2 + 0.5,
+                padded_h / 2)
+    plan = plan_frame(*config, viewport, (800, 600), max_windows=10**6)
+    assert plan["mode"] == "windows"
+
+    x0, y0, x1, y1 = viewport
+    expected = [
+        (j * stride, i * stride, j * stride + filter_w, i * stride + filter_h)
+        for i in range(window_count(padded_h, filter_h, stride))
+        for j in range(window_count(padded_w, filter_w, stride))
+        if i * stride < y1 and i * stride + filter_h > y0
+        and j * stride < x1 and j * stride + filter_w > x0
+    ]
+    assert plan["windows"] == expected
+    assert plan["visible"] == len(expected)
+    assert plan["total"] == (window_count(padded_h, filter_h, stride)
+                             * window_count(padded_w, filter_w, stride))
+
+
+def test_average_coverage_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(300):
+        size, filter_dim, stride = (rng.randint(1, 40), rng.randint(1, 9),
+                                    rng.randint(1, 5))
+        count = window_count(size, filter_dim, stride)
+        coverage = _coverage_map(1, size, 1, filter_dim, stride)[0]
+        lo = rng.uniform(0, size)
+        hi = rng.uniform(lo, size)
+        weights = _pixel_weights(lo, hi, size)
+        expected = (weights * coverage).sum() / (hi - lo) if hi > lo else 0.0
+        assert average_coverage(lo, hi, count, filter_dim, stride) == (
+            pytest.approx(expected, rel=1e-9, abs=1e-12))
+        assert list(windows_overlapping(lo, hi, count, filter_dim, stride)) == [
+            i for i in range(count)
+            if i * stride < hi and i * stride + filter_dim > lo
+        ]
+
+
+def test_heatmap_grid_is_bounded():
+    plan = plan_frame(10**6, 10**6, 3, 3, 1, 1, (0, 0, 10**6, 10**6),
+                      (4000, 3000))
+    assert plan["mode"] == "heatmap"
+    assert plan["total"] == 10**12
+    assert len(plan["cells"]) <= 40 * 40
@@ -0,0 +1,102 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import conv_metrics
+import conv_output_calculator
+
+
+@pytest.fixture(autouse=True)
+def metrics_off():
+    conv_metrics.disable()
+    conv_metrics.reset()
+    yield
+    conv_metrics.disable()
+
+
+@pytest.fixture
+def entry_module(tmp_path, monkeypatch):
+    (tmp_path / "metrics_entry.py").write_text(
+        "import sys\n"
+        "import conv_output_calculator\n"
+        "from conv_output_calculator import calculate_output_dimension\n"
+        "def main():\n"
+        "    conv_output_calculator.calculate_output_dimension(32, 3, 1, 1)\n"
+        "    return int(sys.argv[1])\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, "argv", list(sys.argv))
+    yield "metrics_entry:main"
+    sys.modules.pop("metrics_entry", None)
+
+
+def test_disabled_metrics_leave_functions_unwrapped():
+    original = conv_output_calculator.calculate_output_dimension
+    with conv_metrics.instrumented():
+        assert conv_output_calculator.calculate_output_dimension is not original
+    assert conv_output_calculator.calculate_output_dimension is original
+
+
+def test_calls_are_counted():
+    with conv_metrics.instrumented():
+        conv_metrics.reset()
+        for _ in range(5):
+            conv_output_calculator.calculate_output_dimension(32, 3, 1, 1)
+        data = conv_metrics.snapshot()
+    stats = data["functions"]["calculate_output_dimension"]
+    assert stats["calls"] == 5
+    assert stats["buckets"]["+Inf"] == 5
+
+
+def test_exports():
+    with conv_metrics.instrumented():
+        conv_metrics.reset()
+        conv_output_calculator.calculate_output_dimension(32, 3, 1, 1)
+        document = json.loads(conv_metrics.export_json())
+        text = conv_metrics.export_prometheus()
+    assert document["functions"]["calculate_output_dimension"]["calls"] == 1
+    assert ('conv_calls_total{function="calculate_output_dimension"} 1'
+            in text.splitlines())
+
+
+@pytest.mark.parametrize("status", [0, 1])
+def test_main_returns_the_entry_point_status(entry_module, tmp_path, status):
+    out = tmp_path / "metrics.json"
+    assert conv_metrics.main(["--out", str(out), entry_module,
+                              str(status)]) == status
+    calls = json.loads(out.read_text())["functions"]
+    assert calls["calculate_output_dimension"]["calls"] == 1
+
+
+def test_references_outside_the_calculator_modules_are_kept(entry_module):
+    import conv_stream
+    import metrics_entry
+
+    original = conv_output_calculator.calculate_output_dimension
+    with conv_metrics.instrumented():
+        # Calculator modules that imported the function by name are patched
+        assert conv_stream.calculate_output_dimension is not original
+        assert metrics_entry.calculate_output_dimension is original
+    assert conv_stream.calculate_output_dimension is original
+
+
+def test_enable_does_not_import_the_gui():
+    code = ("import sys, conv_metrics; conv_metrics.enable(); "
+            "print('conv_calculator_gui' in sys.modules, "
+            "'tkinter' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                            text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(
+                                os.path.abspath(__file__))))
+    assert result.stdout.split() == ["False", "False"]
+
+
+def test_loaded_gui_is_instrumented():
+    gui = pytest.importorskip("conv_calculator_gui")
+    original = gui.ConvCalculatorGUI.update_calculation
+    with conv_metrics.instrumented():
+        assert gui.ConvCalculatorGUI.update_calculation is not original
+    assert gui.ConvCalculatorGUI.update_calculation is original
@@ -0,0 +1,151 @@
+import json
+import random
+
+import pytest
+
+from conv_model import (chain_shapes, import_model, main, model_shapes,
+                        parse_model)
+from conv_network import conv_layer, pool_layer, propagate_shapes
+
+
+RESNET_STEM = {
+    "input": [3, 225, 225],
+    "layers": [
+        {"type": "conv", "filter": 7, "stride": 2, "padding": 3,
+         "out_channels": 64},
+        {"type": "pool", "filter": 3, "stride": 2, "padding": 1,
+         "name": "pool1"},
+        {"name": "block1", "merge": "add", "branches": [
+            [{"type": "conv", "filter": 3, "padding": 1, "out_channels": 64},
+             {"type": "relu"},
+             {"type": "conv", "filter": 3, "padding": 1, "out_channels": 64}],
+            [],
+        ]},
+    ],
+}
+
+
+def _layers(count, seed):
+    rng = random.Random(seed)
+    layers = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            layers.append(pool_layer(rng.randint(1, 3)))
+        else:
+            layers.append(conv_layer(
+                rng.randint(1, 5), rng.randint(1, 5), stride=rng.randint(1, 3),
+                padding=rng.randint(0, 3), dilation=rng.randint(1, 2),
+                out_channels=rng.choice([None, 8, 16])))
+    return layers
+
+
+def test_parse_and_shapes():
+    result = model_shapes(parse_model(RESNET_STEM))
+    assert result.first_invalid is None
+    assert result.names == ["0", "pool1", "block1.0.0", "block1.0.1",
+                            "block1.0.2", "block1"]
+    assert result.shapes == [(64, 113, 113), (64, 57, 57), (64, 57, 57),
+                             (64, 57, 57), (64, 57, 57), (64, 57, 57)]
+
+
+def test_concat_adds_channels():
+    model = parse_model({"input": [3, 32, 32], "layers": [
+        {"merge": "concat", "branches": [
+            [{"type": "conv", "filter": 1, "out_channels": 16}],
+            [{"type": "conv", "filter": 3, "padding": 1, "out_channels": 8}],
+        ]},
+    ]})
+    assert model_shapes(model).shapes[-1] == (24, 32, 32)
+
+
+def test_first_invalid_layer_and_reason():
+    model = parse_model({"input": [3, 224, 224], "layers": [
+        {"type": "conv", "filter": 3, "padding": 1},
+        {"type": "conv", "filter": 7, "stride": 2, "padding": 3},
+        {"type": "relu"},
+    ]})
+    result = model_shapes(model)
+    assert result.first_invalid == 1
+    assert "not an integer" in result.reason
+    assert result.shapes[1:] == [None, None]
+
+
+def test_add_merge_needs_matching_shapes():
+    model = parse_model({"input": [3, 32, 32], "layers": [
+        {"merge": "add", "branches": [
+            [{"type": "conv", "filter": 1, "out_channels": 16}], [],
+        ]},
+    ]})
+    result = model_shapes(model)
+    assert result.first_invalid == 1
+    assert "channels" in result.reason
+
+
+@pytest.mark.parametrize("kind", ["maxpool", "avgpool", "conv2d", "rleu"])
+def test_unknown_layer_type_is_rejected(kind):
+    with pytest.raises(ValueError, match=f"1: unknown layer type '{kind}'"):
+        parse_model({"input": [3, 32, 32], "layers": [
+            {"type": "conv", "filter": 3}, {"type": kind, "filter": 2},
+        ]})
+
+
+@pytest.mark.parametrize("document", [
+    [],
+    {"input": [3, 32], "layers": []},
+    {"input": [3, 32, 32], "layers": {}},
+    {"input": [3, 32, 32], "layers": [{"type": "conv"}]},
+    {"input": [3, 32, 32], "layers": [{"type": "conv", "filter": 0}]},
+    {"input": [3, 32, 32], "layers": [{"type": "conv", "filter": 3,
+                                       "stride": 0}]},
+    {"input": [3, 32, 32], "layers": [{"filter": 3}]},
+    {"input": [3, 32, 32], "layers": [{"merge": "mul", "branches": [[]]}]},
+])
+def test_malformed_descriptions(document):
+    with pytest.raises(ValueError):
+        parse_model(document)
+
+
+def test_chain_shapes_matches_propagate_shapes():
+    for seed in range(300):
+        layers = _layers(random.Random(seed).randint(1, 12), seed)
+        input_shape = (3, 64 + seed % 17, 48 + seed % 13)
+        assert chain_shapes(input_shape, layers) == propagate_shapes(
+            input_shape, layers)[1:]
+
+
+def test_import_model_cache(tmp_path):
+    path = tmp_path / "model.json"
+    path.write_text(json.dumps(RESNET_STEM))
+    cache_dir = tmp_path / "cache"
+    first = import_model(str(path), cache_dir=str(cache_dir))
+    assert len(list(cache_dir.iterdir())) == 1
+    assert import_model(str(path), cache_dir=str(cache_dir)) == first
+
+
+def test_main_exit_status(tmp_path, capsys):
+    path = tmp_path / "model.json"
+    path.write_text(json.dumps({"input": [3, 10, 10], "layers": [
+        {"type": "conv", "filter": 3, "stride": 2},
+    ]}))
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(path), "--quiet", "--no-cache"])
+    assert exit_info.value.code == 1
+
+    path.write_text(json.dumps({"input": [3, 10, 10],
+                                "layers": [{"type": "maxpool"}]}))
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(path), "--no-cache"])
+    assert exit_info.value.code == 2
+    assert "unknown layer type" in capsys.readouterr().err
+
+
+def test_import_yaml(tmp_path):
+    yaml = pytest.importorskip("yaml")
+    path = tmp_path / "model.yaml"
+    path.write_text(yaml.safe_dump(RESNET_STEM))
+    result = import_model(str(path), cache_dir=None)
+    assert result == model_shapes(parse_model(RESNET_STEM))
+
+    path.write_text("input: [3, 32, 32\nlayers: [")
+    with pytest.raises(ValueError, match="invalid YAML"):
+        import_model(str(path), cache_dir=None)
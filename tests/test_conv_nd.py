@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from conv_nd import nd_calculate, nd_output_shape
+from conv_output_calculator import output_size
+
+
+def test_matches_scalar_core_per_axis():
+    rng = np.random.default_rng(0)
+    for axes in (1, 2, 3):
+        sizes = rng.integers(1, 200, (500, axes))
+        kernel = rng.integers(1, 8, (500, axes))
+        stride = rng.integers(1, 4, (500, axes))
+        padding = rng.integers(0, 4, (500, axes))
+        dilation = rng.integers(1, 3, (500, axes))
+        result = nd_calculate(sizes, kernel, stride, padding, dilation)
+
+        for i in range(500):
+            axis_results = [output_size(*map(int, values)) for values in zip(
+                sizes[i], kernel[i], stride[i], padding[i], dilation[i])]
+            assert result["output"][i].tolist() == [o for o, _ in axis_results]
+            valid = all(r == 0 and o > 0 for o, r in axis_results)
+            assert result["valid"][i] == valid
+            expected = int(np.prod([o for o, _ in axis_results])) if valid else 0
+            assert result["features"][i] == expected
+
+
+def test_examples():
+    assert nd_output_shape(16000, 400, 160, 120) == (100,)
+    assert nd_output_shape((16, 112, 112), 3, padding=1) == (16, 112, 112)
+    assert nd_output_shape((16, 112, 112), (1, 2, 2), kind="max") == (16, 56, 56)
+    assert nd_output_shape((16, 112, 112), (3, 7, 7), (1, 2, 2),
+                           (1, 3, 3)) is None
+
+
+def test_pooling_rules():
+    # Padding may be at most half the kernel, as in PyTorch
+    assert nd_output_shape(8, 2, kind="max", padding=1) == (5,)
+    assert nd_output_shape(8, 2, kind="max", padding=2) is None
+    # Ceil mode keeps a partial last window
+    assert nd_output_shape((16, 56, 56), (1, 3, 3), (1, 2, 2), (0, 1, 1),
+                           kind="max") is None
+    assert nd_output_shape((16, 56, 56), (1, 3, 3), (1, 2, 2), (0, 1, 1),
+                           kind="max", ceil_mode=True) == (16, 29, 29)
+    with pytest.raises(ValueError):
+        nd_calculate(8, 2, dilation=2, kind="avg")
+
+
+def test_same_padding():
+    assert nd_output_shape((7, 9), 3, stride=2, padding="same") == (4, 5)
+
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        nd_calculate(8, 2, kind="lp")
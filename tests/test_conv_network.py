@@ -0,0 +1,118 @@
+import random
+
+import pytest
+
+from conv_network import (ConvNetwork, conv_layer, pool_layer,
+                          propagate_shapes)
+from conv_receptive import receptive_fields
+
+
+def _network():
+    return ConvNetwork((3, 32, 32), [conv_layer(3) for _ in range(3)])
+
+
+def _assert_fresh(network):
+    assert network.shapes() == propagate_shapes(network.input_shape,
+                                                network.layers)
+    assert network.receptive_fields() == receptive_fields(network.layers,
+                                                          network.input_shape)
+
+
+def test_shapes():
+    network = ConvNetwork((3, 32, 32), [
+        conv_layer(3, padding=1, out_channels=16),
+        pool_layer(2),
+        conv_layer(3, out_channels=32),
+    ])
+    assert network.shapes() == [(3, 32, 32), (16, 32, 32), (16, 16, 16),
+                                (32, 14, 14)]
+
+
+def test_invalid_layer_propagates_none():
+    network = ConvNetwork((3, 10, 10), [conv_layer(3, stride=2), conv_layer(1)])
+    assert network.shapes()[1:] == [None, None]
+    assert network.first_invalid_layer() == 0
+
+
+@pytest.mark.parametrize("index", [-1, -2, -3, -10, 0, 1, 3, 10])
+def test_insert_invalidates_cached_shapes(index):
+    network = _network()
+    network.shapes()
+    network.receptive_fields()
+    network.insert(index, pool_layer(2))
+    _assert_fresh(network)
+
+
+def test_insert_negative_index_example():
+    network = _network()
+    network.shapes()
+    network.insert(-1, pool_layer(2))
+    assert network.shapes()[-2:] == [(3, 14, 14), (3, 12, 12)]
+
+
+@pytest.mark.parametrize("index", [-1, -2, -3, 0, 1, 2])
+def test_remove_invalidates_cached_shapes(index):
+    network = ConvNetwork((3, 32, 32), [conv_layer(3), pool_layer(2),
+                                        conv_layer(3)])
+    network.shapes()
+    network.receptive_fields()
+    network.remove(index)
+    _assert_fresh(network)
+
+
+@pytest.mark.parametrize("index", [-1, -3, 0, 2])
+def test_set_layer_invalidates_cached_shapes(index):
+    network = _network()
+    network.shapes()
+    network.receptive_fields()
+    network.set_layer(index, pool_layer(2))
+    _assert_fresh(network)
+
+
+def test_set_input_shape_keeps_receptive_fields():
+    network = _network()
+    fields = network.receptive_fields()
+    network.set_input_shape((3, 16, 16))
+    _assert_fresh(network)
+    assert network.receptive_fields() == fields
+
+
+def test_random_edits_match_fresh_propagation():
+    rng = random.Random(0)
+    choices = [conv_layer(3, padding=1), conv_layer(3), conv_layer(1, stride=2),
+               pool_layer(2), conv_layer(3, padding=2, dilation=2)]
+    network = ConvNetwork((3, 64, 64), [conv_layer(3, padding=1)] * 4)
+    for _ in range(500):
+        network.shapes()
+        network.receptive_fields()
+        size = len(network)
+        action = rng.choice(["insert", "remove", "set", "append"])
+        if action == "insert" or not size:
+            network.insert(rng.randint(-size - 2, size + 2), rng.choice(choices))
+        elif action == "remove":
+            network.remove(rng.randint(-size, size - 1))
+        elif action == "set":
+            network.set_layer(rng.randint(-size, size - 1), rng.choice(choices))
+        else:
+            network.append(rng.choice(choices))
+        _assert_fresh(network)
+
+
+def test_receptive_fields_same_and_pair_padding():
+    layers = [conv_layer(3, stride=2, padding="same"),
+              conv_layer(3, padding=(2, 0))]
+    network = ConvNetwork((3, 32, 32), layers)
+    fields = network.receptive_fields()
+    # "same" pads 32 → 16 with one row and column after the input only
+    assert fields == receptive_fields(
+        [conv_layer(3, stride=2, padding=(0, 1)), layers[1]])
+    assert (fields[1].start_h, fields[2].start_h) == (1.0, -1.0)
+    assert fields == receptive_fields(layers, network.input_shape)
+
+    # On an odd input "same" pads both sides, so the fields change
+    network.set_input_shape((3, 31, 31))
+    assert network.receptive_fields()[1].start_h == 0.0
+    _assert_fresh(network)
+
+    with pytest.raises(ValueError, match="same"):
+        receptive_fields(layers)
@@ -0,0 +1,180 @@
+import io
+import random
+
+import numpy as np
+import pytest
+
+from conv_batch import calculate_output_dimensions, output_sizes
+from conv_output_calculator import (FilterPositions,
+                                    calculate_output_dimension, is_valid_output,
+                                    output_size, resolve_padding,
+                                    transposed_output_size,
+                                    visualize_calculation)
+
+
+def _random_configs(count, seed=0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield (rng.randint(1, 512), rng.randint(1, 15), rng.randint(1, 8),
+               rng.randint(0, 10))
+
+
+def test_calculate_output_dimension_returns_float():
+    output = calculate_output_dimension(32, 3, 1, 1)
+    assert type(output) is float
+    assert output == 32.0
+    assert output.is_integer()
+    assert calculate_output_dimension(10, 3, 2, 0) == 4.5
+    assert calculate_output_dimension(2, 5, 1, 0) == -2.0
+
+
+def test_integer_core_matches_float_formula():
+    for input_dim, filter_dim, stride, padding in _random_configs(3000):
+        output, remainder = output_size(input_dim, filter_dim, stride, padding)
+        expected = ((input_dim - filter_dim + 2 * padding) / stride) + 1
+        assert output == (input_dim - filter_dim + 2 * padding) // stride + 1
+        assert (remainder == 0) == (expected == int(expected))
+        assert is_valid_output(input_dim, filter_dim, stride, padding) == (
+            expected > 0 and expected == int(expected))
+        assert calculate_output_dimension(input_dim, filter_dim, stride,
+                                          padding) == expected
+
+
+def test_integer_core_is_exact_for_large_inputs():
+    input_dim = 2**64 + 1
+    output, remainder = output_size(input_dim, 3, stride=2, padding=1)
+    assert (output, remainder) == (2**63 + 1, 0)
+
+
+def test_batch_matches_scalar_element_for_element():
+    configs = np.array(list(_random_configs(3000, seed=1)))
+    batch = calculate_output_dimensions(*configs.T)
+    scalar = [calculate_output_dimension(*map(int, c)) for c in configs]
+    assert batch.tolist() == scalar
+
+    sizes, remainders = output_sizes(*configs.T)
+    assert [tuple(r) for r in zip(sizes.tolist(), remainders.tolist())] == [
+        output_size(*map(int, c)) for c in configs]
+
+
+def test_output_size_options():
+    assert output_size(224, 3, stride=2, padding=1) == (112, 1)
+    assert output_size(224, 3, stride=2, padding=1, ceil_mode=True) == (113, 1)
+    assert output_size(64, 3, padding=2, dilation=2) == (64, 0)
+    assert output_size(7, 3, stride=2, padding="same") == (4, 0)
+    assert output_size(7, 3, padding="valid") == (5, 0)
+    assert output_size(10, 4, padding=(1, 2)) == (10, 0)
+
+
+def test_ceil_mode_last_window_starts_inside_input():
+    # PyTorch: MaxPool2d(2, stride=2, padding=1, ceil_mode=True) on 5 gives 3
+    assert output_size(5, 2, stride=2, padding=1, ceil_mode=True)[0] == 3
+
+
+def test_transposed_output_size():
+    assert transposed_output_size(16, 4, stride=2, padding=1) == 32
+    assert transposed_output_size(16, 3, stride=2, padding=1,
+                                  output_padding=1) == 32
+    with pytest.raises(ValueError):
+        transposed_output_size(16, 3, stride=2, output_padding=2)
+
+
+def test_resolve_padding_accepts_numpy_integers():
+    assert resolve_padding(np.int64(1), 10, 3) == (1, 1)
+    assert output_size(10, 3, 1, np.int64(1)) == (10, 0)
+
+
+@pytest.mark.parametrize("padding", ["SAME", "full", (1,), (1, 2, 3), 1.5])
+def test_resolve_padding_rejects_unknown_modes(padding):
+    with pytest.raises(ValueError):
+        resolve_padding(padding, 10, 3)
+
+
+def test_visualize_calculation_prints_float_breakdown():
+    out = io.StringIO()
+    result = visualize_calculation(32, 32, 3, 3, 1, 1, out=out)
+    assert result == (32.0, 32.0)
+    assert all(type(v) is float for v in result)
+    report = out.getvalue()
+    assert "  Output Height = 32.0\n" in report
+    assert "✓ Output Image Dimensions: 32 × 32" in report
+
+
+def _all_positions(input_h, input_w, filter_h, filter_w, stride, padding):
+    """Every filter position, built eagerly as index.html does."""
+    padded_h, padded_w = input_h + 2 * padding, input_w + 2 * padding
+    return [
+        (i, j, y, x, y + filter_h, x + filter_w)
+        for i, y in enumerate(range(0, padded_h - filter_h + 1, stride))
+        for j, x in enumerate(range(0, padded_w - filter_w + 1, stride))
+    ]
+
+
+POSITION_CONFIGS = [(8, 8, 3, 3, 1, 1), (10, 7, 3, 2, 2, 0),
+                    (9, 12, 4, 5, 3, 2), (5, 5, 7, 7, 1, 0),
+                    (6, 4, 2, 2, 4, 1)]
+
+
+@pytest.mark.parametrize("config", POSITION_CONFIGS)
+def test_filter_positions_match_eager_list(config):
+    positions = FilterPositions(*config)
+    expected = _all_positions(*config)
+    assert len(positions) == len(expected)
+    assert list(positions) == expected
+    assert [positions[i] for i in range(-len(expected), len(expected))] == (
+        expected + expected)
+    for i, position in enumerate(expected):
+        assert positions.index(position) == i
+        assert position in positions
+        assert positions.window(position[0], position[1]) == position
+    with pytest.raises(IndexError):
+        positions[len(expected)]
+
+
+@pytest.mark.parametrize("config", POSITION_CONFIGS)
+@pytest.mark.parametrize("window", [slice(None, None, 3), slice(2, -1),
+                                    slice(None, None, -2), slice(5, 1, -1),
+                                    slice(-4, None)])
+def test_filter_positions_slices_round_trip(config, window):
+    positions = FilterPositions(*config)
+    expected = _all_positions(*config)[window]
+    sliced = positions[window]
+    assert isinstance(sliced, FilterPositions)
+    assert list(sliced) == expected
+    assert list(sliced[::2]) == expected[::2]
+    for i, position in enumerate(expected):
+        assert sliced[i] == position
+        assert sliced.index(position) == i
+    for position in set(_all_positions(*config)) - set(expected):
+        assert position not in sliced
+        with pytest.raises(ValueError):
+            sliced.index(position)
+
+
+@pytest.mark.parametrize("config", POSITION_CONFIGS)
+def test_filter_positions_covering_matches_brute_force(config):
+    input_h, input_w, _, _, _, padding = config
+    positions = FilterPositions(*config)
+    subsets = [positions, positions[1::2]]
+    for subset in subsets:
+        for y in range(input_h + 2 * padding):
+            for x in range(input_w + 2 * padding):
+                assert subset.covering(y, x) == [
+                    p for p in subset
+                    if p.start_y <= y < p.end_y and p.start_x <= x < p.end_x
+                ]
+
+
+def test_filter_positions_index_checks_the_window():
+    positions = FilterPositions(8, 8, 3, 3, 1, 1)
+    assert positions.index((2, 3, 2, 3, 5, 6)) == 2 * 8 + 3
+    for wrong in [(2, 3, 2, 3, 5, 7), (8, 0, 8, 0, 11, 3), (-1, 0, 0, 0, 3, 3)]:
+        assert wrong not in positions
+    # start and stop work as for list.index, negative ones included
+    assert positions.index((2, 3, 2, 3, 5, 6), 19, 20) == 19
+    assert positions.index((2, 3, 2, 3, 5, 6), -64, -44) == 19
+    for start, stop in [(20, None), (0, 19), (-44, None), (0, -45)]:
+        with pytest.raises(ValueError):
+            positions.index((2, 3, 2, 3, 5, 6), start, stop)
+    with pytest.raises(IndexError):
+        positions.window(8, 0)
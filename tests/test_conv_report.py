@@ -0,0 +1,69 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from conv_batch import batch_calculate
+from conv_output_calculator import visualize_calculation
+from conv_report import REPORT_FORMATS, render_report, report_record
+from conv_stream import calculate_record
+
+
+def test_report_record_matches_calculate_record():
+    for config in [(227, 227, 11, 11, 4, 0), (27, 27, 4, 4, 2, 1),
+                   (5, 5, 7, 7, 1, 0), (224, 200, 3, 5, 1, 1)]:
+        record = report_record(*config)
+        expected = calculate_record(dict(zip(
+            ["input_h", "input_w", "filter_h", "filter_w", "stride",
+             "padding"], config)))
+        assert record == expected
+
+
+def test_negative_padding_is_still_reported():
+    out = io.StringIO()
+    assert visualize_calculation(32, 32, 3, 3, 1, -1, out=out) == (28.0, 28.0)
+    report = out.getvalue()
+    assert "  • Padding:                 -1" in report
+    assert "✓ Total output features:   784" in report
+
+
+def test_non_positive_output_report():
+    out = io.StringIO()
+    visualize_calculation(2, 2, 5, 5, 1, 0, out=out)
+    assert "Output dimensions are negative or zero: -2.0 × -2.0" in out.getvalue()
+
+
+def test_non_integer_output_report():
+    out = io.StringIO()
+    visualize_calculation(10, 10, 3, 3, 2, 0, out=out)
+    report = out.getvalue()
+    assert "✗ Output Dimensions: 4.5 × 4.5" in report
+    assert "not integers" in report
+
+
+@pytest.mark.parametrize("format", REPORT_FORMATS)
+def test_formats_render_many_records(format):
+    records = [report_record(227, 227, 11, 11, 4, 0),
+               report_record(27, 27, 4, 4, 2, 1)]
+    report = render_report(records, format)
+    if format == "json":
+        assert [r["valid"] for r in json.loads(report)] == [True, False]
+    elif format == "quiet":
+        assert report == "55 × 55\n✗ 13.5 × 13.5\n"
+    else:
+        assert "55 × 55" in report and "13.5 × 13.5" in report
+
+
+def test_render_batch_columns():
+    columns = {"input_h": np.array([227, 28]), "input_w": np.array([227, 28]),
+               "filter_h": 11, "filter_w": 11, "stride": np.array([4, 2]),
+               "padding": 0}
+    columns.update(batch_calculate(columns["input_h"], columns["input_w"],
+                                   11, 11, columns["stride"], 0))
+    assert render_report(columns, "quiet") == "55 × 55\n✗ 9.5 × 9.5\n"
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        render_report([], "html")
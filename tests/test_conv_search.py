@@ -0,0 +1,70 @@
+import itertools
+
+import pytest
+
+from conv_output_calculator import output_size
+from conv_search import search
+
+
+BOUNDS = {"max_filter": 3, "max_stride": 3, "max_padding": 1}
+
+
+def _layer_options(size):
+    for f, s, p in itertools.product(range(1, BOUNDS["max_filter"] + 1),
+                                     range(1, BOUNDS["max_stride"] + 1),
+                                     range(0, BOUNDS["max_padding"] + 1)):
+        output, remainder = output_size(size, f, s, p)
+        if remainder == 0 and output > 0:
+            yield (f, s, p), output
+
+
+def _brute_force_front(size, target, depth, in_channels, channels):
+    best = {}
+    stacks = [((), size, 0)]
+    for d in range(1, depth + 1):
+        grown = []
+        for stack, current, flops in stacks:
+            channels_in = in_channels if not stack else channels
+            for layer, output in _layer_options(current):
+                total = flops + (2 * output * output * layer[0] ** 2
+                                 * channels_in * channels)
+                grown.append((stack + (layer,), output, total))
+                if output == target:
+                    best[d] = min(best.get(d, total), total)
+        stacks = grown
+
+    front = []
+    for d in sorted(best):
+        if not front or best[d] < front[-1][1]:
+            front.append((d, best[d]))
+    return front
+
+
+@pytest.mark.parametrize("size, target", [(12, 4), (9, 3), (8, 8), (10, 1)])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_search_matches_brute_force(size, target, workers):
+    result = search(size, size, target, target, in_channels=3, channels=4,
+                    max_depth=3, workers=workers, **BOUNDS)
+    assert result.complete
+    assert [(a.depth, a.flops) for a in result.front] == _brute_force_front(
+        size, target, 3, 3, 4)
+
+    for arch in result.front:
+        height = size
+        for layer in arch.layers:
+            height, remainder = output_size(height, layer.filter_h,
+                                            layer.stride, layer.padding)
+            assert remainder == 0
+        assert height == target
+
+
+def test_search_flops_budget():
+    result = search(12, 12, 4, 4, in_channels=3, channels=4, max_depth=3,
+                    max_flops=0, workers=1, **BOUNDS)
+    assert result.front == []
+
+
+def test_search_time_limit():
+    result = search(512, 512, 7, 7, max_depth=8, time_limit=0.05, workers=1)
+    assert not result.complete
+
@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import pytest
+
+import conv_server
+from conv_server import HTTPError, cost_batch, route, shape_batch
+
+
+LAYER = {"input_h": 32, "input_w": 32, "filter_h": 3, "filter_w": 3,
+         "stride": 1, "padding": 1, "in_channels": 16, "out_channels": 32}
+
+
+def test_shape_batch_reports_invalid_entries():
+    results = shape_batch([LAYER, {"input_h": 32}, [1, 2]])
+    assert results[0]["output_h"] == 32
+    assert results[1] == {"error": "missing input_w"}
+    assert results[2] == {"error": "expected a JSON object"}
+
+
+def test_cost_batch():
+    results = cost_batch([LAYER, dict(LAYER, dtype="float16", batch=2)])
+    assert results[0]["macs"] == 32 * 32 * 3 * 3 * 16 * 32
+    assert results[1]["macs"] == 2 * results[0]["macs"]
+    assert results[1]["output_bytes"] == results[0]["output_bytes"]
+
+
+@pytest.mark.parametrize("dtype", [["float32"], {"name": "int8"}, 4, "fp32"])
+def test_cost_batch_bad_dtype_is_an_entry_error(dtype):
+    results = cost_batch([LAYER, dict(LAYER, dtype=dtype)])
+    assert "macs" in results[0]
+    assert results[1] == {"error": f"unknown dtype: {dtype!r}"}
+
+
+@pytest.mark.parametrize("field, value", [
+    ("input_h", float("inf")), ("stride", 1e400), ("padding", -1),
+    ("in_channels", 2**63), ("out_channels", 2.7), ("batch", 0),
+    ("batch", 2.5), ("input_w", 2**62),
+])
+def test_cost_batch_bad_entries_do_not_fail_the_batch(field, value):
+    results = cost_batch([LAYER, dict(LAYER, **{field: value}), LAYER])
+    assert results[0] == results[2]
+    assert "macs" in results[0]
+    assert set(results[1]) == {"error"}
+
+
+def test_shape_batch_non_finite_values():
+    results = shape_batch([LAYER, dict(LAYER, input_h=float("inf"))])
+    assert results[0]["output_h"] == 32
+    assert set(results[1]) == {"error"}
+
+
+def test_route_errors():
+    with pytest.raises(HTTPError) as error:
+        route("POST", "/cost", json.dumps({"input_h": 1}).encode())
+    assert error.value.status == 400
+    with pytest.raises(HTTPError) as error:
+        route("GET", "/nowhere", b"")
+    assert error.value.status == 404
+
+
+def test_internal_errors_are_not_echoed(monkeypatch, capsys):
+    def fail(method, target, body):
+        raise RuntimeError("secret detail")
+
+    monkeypatch.setattr(conv_server, "route", fail)
+
+    async def request():
+        server = await conv_server.start_server(port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /shape HTTP/1.1\r\nConnection: close\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return response
+
+    response = asyncio.run(request())
+    assert response.startswith(b"HTTP/1.1 500 ")
+    assert b"secret detail" not in response
+    assert response.endswith(b'{"error": "internal server error"}')
+    assert "secret detail" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("length", ["-1", "abc"])
+def test_invalid_content_length(length):
+    async def request():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"POST /shape HTTP/1.1\r\nContent-Length: "
+                         + length.encode() + b"\r\n\r\n{}")
+        reader.feed_eof()
+        return await conv_server._read_request(reader)
+
+    with pytest.raises(HTTPError) as error:
+        asyncio.run(request())
+    assert error.value.status == 400
@@ -0,0 +1,79 @@
+import itertools
+
+import pytest
+
+from conv_output_calculator import output_size
+from conv_solver import solve, solve_dimension
+
+
+def _brute_force(input_dim, max_filter=15, max_stride=8, max_padding=10):
+    """Map every reachable output to its set of (filter, stride, padding)."""
+    solutions = {}
+    for f, s, p in itertools.product(range(1, max_filter + 1),
+                                     range(1, max_stride + 1),
+                                     range(max_padding + 1)):
+        output, remainder = output_size(input_dim, f, s, p)
+        if remainder == 0 and output > 0:
+            solutions.setdefault(output, set()).add((f, s, p))
+    return solutions
+
+
+def test_solve_dimension_matches_brute_force():
+    for input_dim in range(1, 40):
+        expected = _brute_force(input_dim)
+        for output_dim in range(1, 40):
+            assert set(solve_dimension(input_dim, output_dim)) == (
+                expected.get(output_dim, set()))
+
+
+@pytest.mark.parametrize("bounds", [
+    {"max_filter": 1, "max_stride": 1, "max_padding": 0},
+    {"max_filter": 4, "max_stride": 3, "max_padding": 0},
+    {"max_filter": 7, "max_stride": 5, "max_padding": 3},
+])
+def test_solve_dimension_bounds_match_brute_force(bounds):
+    for input_dim in range(1, 25):
+        expected = _brute_force(input_dim, **bounds)
+        for output_dim in range(1, 30):
+            assert set(solve_dimension(input_dim, output_dim, **bounds)) == (
+                expected.get(output_dim, set()))
+
+
+@pytest.mark.parametrize("square_filter", [False, True])
+def test_solve_matches_brute_force(square_filter):
+    bounds = {"max_filter": 7, "max_stride": 4, "max_padding": 3}
+    for input_h, input_w in itertools.product(range(1, 14), range(1, 14)):
+        expected_h = _brute_force(input_h, **bounds)
+        expected_w = _brute_force(input_w, **bounds)
+        for output_h, output_w in itertools.product(range(1, 16), repeat=2):
+            expected = {
+                (f_h, f_w, s, p)
+                for f_h, s, p in expected_h.get(output_h, ())
+                for f_w, s_w, p_w in expected_w.get(output_w, ())
+                if (s, p) == (s_w, p_w) and (f_h == f_w or not square_filter)
+            }
+            solutions = list(solve(input_h, input_w, output_h, output_w,
+                                   square_filter=square_filter, **bounds))
+            assert len(solutions) == len(set(solutions))
+            assert set(solutions) == expected
+
+
+def test_solve_order():
+    solutions = list(solve(224, 224, 56, 56))
+    assert solutions
+    assert solutions == sorted(solutions, key=lambda s: (s[2], s[3]))
+
+
+def test_solve_shares_stride_and_padding():
+    solutions = list(solve(32, 24, 16, 12))
+    assert solutions
+    for filter_h, filter_w, stride, padding in solutions:
+        assert output_size(32, filter_h, stride, padding) == (16, 0)
+        assert output_size(24, filter_w, stride, padding) == (12, 0)
+    assert all(fh == fw for fh, fw, _, _ in solve(32, 32, 16, 16,
+                                                  square_filter=True))
+
+
+def test_no_solutions_for_non_positive_sizes():
+    assert list(solve_dimension(0, 5)) == []
+    assert list(solve(8, 8, 0, 4)) == []
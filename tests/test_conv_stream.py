@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+
+import pytest
+
+from conv_output_calculator import calculate_output_dimension
+from conv_stream import (RESULT_FIELDS, calculate_record, run_batch,
+                         stream_results)
+
+
+def test_stream_results_csv_with_header():
+    lines = ["input_h,input_w,filter_h,filter_w,stride,padding\n",
+             "32,32,3,3,1,1\n", "\n", "32,32,4,4,3,0\n", "1,2\n"]
+    results = list(stream_results(lines, "csv"))
+    assert len(results) == 3
+    assert results[0]["output_h"] == 32 and results[0]["valid"]
+    assert not results[1]["valid"] and results[1]["features"] == 0
+    assert results[1]["output_h"] == calculate_output_dimension(32, 4, 3, 0)
+    assert results[2]["error"] == "line 5: expected 6 columns, got 2"
+
+
+@pytest.mark.parametrize("line, message", [
+    ('{"input_h": Infinity}', "input_h is not an integer"),
+    ('{"input_h": 1e400}', "input_h is not an integer"),
+    ('{"input_h": NaN}', "input_h is not an integer"),
+    ('{"input_h": 3.5}', "input_h is not an integer"),
+    ('{"input_h": true}', "input_h is not an integer"),
+    ('{"input_h": 0}', "input_h must be a positive integer"),
+    ('[1, 2]', "expected a JSON object"),
+    ('{"input_h": ', "invalid JSON"),
+])
+def test_stream_results_jsonl_errors(line, message):
+    fields = {"input_w": 8, "filter_h": 3, "filter_w": 3, "stride": 1,
+              "padding": 0}
+    if line.startswith('{"input_h": ') and line.endswith("}"):
+        line = line[:-1] + ", " + json.dumps(fields)[1:]
+    good = json.dumps(dict(fields, input_h=8))
+    results = list(stream_results([good, line, good], "jsonl"))
+    assert results[0] == results[2]
+    assert results[0]["output_h"] == 6
+    assert results[1]["error"].startswith("line 2: " + message)
+
+
+def test_calculate_record_negative_padding():
+    with pytest.raises(ValueError, match="padding must be a non-negative"):
+        calculate_record({"input_h": 8, "input_w": 8, "filter_h": 3,
+                          "filter_w": 3, "stride": 1, "padding": -1})
+
+
+def test_run_batch_csv(tmp_path):
+    source = tmp_path / "configs.csv"
+    source.write_text("32,32,3,3,1,1\n32,32,4,4,3,0\n32,x,3,3,1,1\n")
+    out = io.StringIO()
+    assert run_batch(str(source), "csv", out=out) == (3, 1)
+
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert list(rows[0]) == RESULT_FIELDS
+    assert [row["valid"] for row in rows[:2]] == ["true", "false"]
+    # output_h and output_w have the same type on valid and invalid rows
+    assert rows[0]["output_h"] == "32.0"
+    assert float(rows[1]["output_w"]) == calculate_output_dimension(32, 4, 3, 0)
+    assert rows[2]["output_h"] == ""
+    assert rows[2]["error"] == "line 3: input_w is not an integer: 'x'"
+
+
+def test_run_batch_jsonl(tmp_path):
+    source = tmp_path / "configs.jsonl"
+    source.write_text('{"input_h": 8, "input_w": 8, "filter_h": 3, '
+                      '"filter_w": 3, "stride": 1, "padding": 0}\n'
+                      '{"input_h": Infinity}\n')
+    out = io.StringIO()
+    assert run_batch(str(source), "jsonl", out=out) == (2, 1)
+
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert results[0]["features"] == 36
+    assert results[1]["error"].startswith("line 2: input_h is not an integer")
+
+
+def test_unknown_formats():
+    with pytest.raises(ValueError, match="unknown input format"):
+        list(stream_results([], "xml"))
+    with pytest.raises(ValueError, match="unknown output format"):
+        run_batch(__file__, "csv", "xml", out=io.StringIO())
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from conv_batch import batch_calculate
+from conv_sweep import RESULT_DTYPE, sweep
+
+
+AXES = {"input_h": range(1, 24), "input_w": [7, 16, 33],
+        "filter_h": range(1, 6), "filter_w": 3,
+        "stride": range(1, 4), "padding": range(0, 3)}
+
+
+def test_parallel_sweep_matches_single_process():
+    progress = []
+    parallel = sweep(**AXES, workers=3, chunk_size=97,
+                     progress=lambda done, total: progress.append(
+                         (done, total)))
+    single = sweep(**AXES, workers=1, chunk_size=97)
+    assert parallel.dtype == RESULT_DTYPE
+    assert parallel.shape == (23, 3, 5, 1, 3, 3)
+    np.testing.assert_array_equal(parallel, single)
+
+    total = parallel.size
+    assert [done for done, _ in progress] == sorted(done for done, _ in progress)
+    assert progress[-1] == (total, total)
+    assert len(progress) == -(-total // 97)
+
+
+def test_sweep_matches_batch_calculate():
+    result = sweep(**AXES, workers=1, chunk_size=50)
+    grid = np.meshgrid(*(np.atleast_1d(np.asarray(values))
+                         for values in AXES.values()), indexing="ij")
+    expected = batch_calculate(*grid)
+    for name in RESULT_DTYPE.names:
+        np.testing.assert_array_equal(result[name], expected[name])
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_sweep_to_file(tmp_path, workers):
+    path = str(tmp_path / "sweep.npy")
+    result = sweep(**AXES, workers=workers, chunk_size=128, out=path)
+    assert isinstance(result, np.memmap)
+    stored = np.load(path).reshape(result.shape)
+    np.testing.assert_array_equal(stored, sweep(**AXES, workers=1))
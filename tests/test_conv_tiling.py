@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from conv_engine import conv2d
+from conv_tiling import (convolve_tiled, iter_tiles, plan_tiles, tile_count,
+                         tile_memory)
+
+
+def _case(seed, batch, channels, out_channels, height, width, filter_dim):
+    rng = np.random.default_rng(seed)
+    image = rng.standard_normal((batch, channels, height, width))
+    kernel = rng.standard_normal((out_channels, channels, filter_dim,
+                                  filter_dim))
+    return image, kernel
+
+
+# (height, width, filter, stride, padding), including padding >= filter
+CONFIGS = [(20, 17, 3, 1, 1), (21, 21, 5, 2, 2), (16, 16, 1, 3, 0),
+           (8, 8, 2, 1, 3), (9, 7, 3, 2, 4), (6, 6, 1, 1, 5)]
+
+
+@pytest.mark.parametrize("height, width, filter_dim, stride, padding",
+                         CONFIGS)
+@pytest.mark.parametrize("rows", [1, 2, 3])
+def test_matches_conv2d_under_small_budgets(height, width, filter_dim, stride,
+                                           padding, rows):
+    image, kernel = _case(height + padding, 1, 2, 3, height, width,
+                          filter_dim)
+    expected = conv2d(image, kernel, stride, padding)
+    budget = tile_memory(rows, expected.shape[-1], filter_dim, filter_dim,
+                         stride, 1, 2, 3, 8, "auto")
+    out = convolve_tiled(image, kernel, stride, padding,
+                         memory_budget=budget)
+    np.testing.assert_allclose(out, expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("height, width, filter_dim, stride, padding",
+                         CONFIGS)
+def test_square_tiles(height, width, filter_dim, stride, padding):
+    image, kernel = _case(1, 2, 1, 2, height, width, filter_dim)
+    expected = conv2d(image, kernel, stride, padding)
+    budget = tile_memory(1, 2, filter_dim, filter_dim, stride, 2, 1, 2, 8,
+                         "auto")
+    plan = plan_tiles(image.shape, kernel.shape, stride, padding, budget,
+                      np.float64)
+    assert plan.tile_w < expected.shape[-1]
+    out = convolve_tiled(image, kernel, stride, padding, memory_budget=budget)
+    np.testing.assert_allclose(out, expected, rtol=1e-9, atol=1e-9)
+
+
+def test_tiles_inside_the_padding():
+    # 8×8 input, 2×2 kernel, padding 3: the first and last output rows
+    # read nothing but padding
+    plan = plan_tiles((1, 1, 8, 8), (1, 1, 2, 2), 1, 3,
+                      tile_memory(1, 13, 2, 2, 1, 1, 1, 1, 4), "float32",
+                      "direct")
+    tiles = list(iter_tiles(plan))
+    assert len(tiles) == tile_count(plan) == 13
+    for tile in tiles:
+        assert 0 <= tile.in_y0 <= tile.in_y1 <= 8
+        assert tile.pad_top >= 0 and tile.pad_bottom >= 0
+        assert (tile.in_y1 - tile.in_y0 + tile.pad_top + tile.pad_bottom
+                == (tile.out_y1 - tile.out_y0 - 1) + 2)
+    assert tiles[0][4:6] == (0, 0) and tiles[0].pad_top == 2
+    assert tiles[-1][4:6] == (8, 8) and tiles[-1].pad_bottom == 2
+
+
+def test_memory_mapped_input_and_output(tmp_path):
+    image, kernel = _case(2, 1, 3, 4, 24, 24, 3)
+    np.save(tmp_path / "image.npy", image)
+    out = convolve_tiled(str(tmp_path / "image.npy"), kernel, 1, 1,
+                         out=str(tmp_path / "out.npy"),
+                         memory_budget=64 * 1024)
+    np.testing.assert_allclose(np.load(tmp_path / "out.npy"),
+                               conv2d(image, kernel, 1, 1), rtol=1e-9,
+                               atol=1e-9)
+    assert out.shape == (1, 4, 24, 24)
+
+
+def test_budget_too_small():
+    with pytest.raises(ValueError, match="too small"):
+        plan_tiles((1, 1, 8, 8), (1, 1, 3, 3), 1, 1, memory_budget=1)